@@ -0,0 +1,57 @@
+"""Recall-vs-latency benchmark of the IVF episodic index against exact search."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from noema.core.ann import IVFIndex
+from noema.core.memory import EMBEDDING_DIM, EmbeddingMatrix
+
+
+def _clustered(count: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.normal(size=(clusters, EMBEDDING_DIM))
+    labels = rng.integers(0, clusters, size=count)
+    return (centres[labels] + 0.35 * rng.normal(size=(count, EMBEDDING_DIM))).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--episodes", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = EmbeddingMatrix(capacity=args.episodes)
+    matrix.extend(_clustered(args.episodes, 256, rng))
+    queries = _clustered(args.queries, 256, rng)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    started = time.perf_counter()
+    index = IVFIndex(EMBEDDING_DIM)
+    index.train(matrix.rows)
+    print(f"trained {len(index.centroids)} lists in {time.perf_counter() - started:.2f}s")
+
+    # Exact search is timed one query at a time, like the IVF searches below.
+    started = time.perf_counter()
+    exact = np.concatenate([matrix.top_k(query, args.k)[0] for query in queries])
+    exact_ms = (time.perf_counter() - started) * 1000 / args.queries
+    print(f"{'nprobe':>8} {'recall@k':>10} {'ms/query':>10}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>10.3f}")
+    for nprobe in args.nprobe:
+        hits = 0
+        started = time.perf_counter()
+        for query, truth in zip(queries, exact):
+            found, _ = index.search(matrix.rows, query, args.k, nprobe=nprobe)
+            hits += len(set(found.tolist()) & set(truth.tolist()))
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.queries
+        recall = hits / (args.k * args.queries)
+        print(f"{nprobe:>8} {recall:>10.3f} {elapsed_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
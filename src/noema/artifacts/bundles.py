@@ -1,71 +1,494 @@
-"""Utilities for persisting and replaying Noema runs."""
+"""Utilities for persisting and replaying Noema runs.
+
+Bundles are zip archives. ``config.json`` is written when a bundle is opened,
+traces are appended while the run executes as gzip-compressed JSON Lines
+segments under ``traces/``, and ``manifest.json`` plus ``report.html`` are
+added on close. Each segment is flushed to disk as soon as it is complete,
+so :func:`recover_bundle` can salvage a bundle whose writer died mid-run.
+Since format version 3, each segment's tick numbers, metrics and broadcasts
+live in a columnar ``columns/`` member (see :mod:`noema.artifacts.columns`)
+rather than in the JSON lines. Bundles written before segments existed keep
+every trace in ``traces.json``; :func:`replay` reads both layouts.
+"""
 
 from __future__ import annotations
 
+import bisect
+import gzip
 import json
+import os
+import struct
 import uuid
 import zipfile
-from dataclasses import asdict
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.types import TickTrace
+from ..reporting.html_report import ReportBuilder
+from ..tasks.evaluations import EvalReport, aggregate_from_traces
+from .columns import ColumnBuffer, attach_columns, decode_columns, metric_series
+from .traces import serialise_trace
+
+FORMAT_VERSION = 3
+SEGMENT_PREFIX = "traces/"
+COLUMNS_PREFIX = "columns/"
+REPORT_PAGES_PREFIX = "report/"
+RECORDING_PREFIX = "recording/"
+
+
+def _segment_name(index: int) -> str:
+    return f"{SEGMENT_PREFIX}{index:06d}.jsonl.gz"
+
+
+def _columns_name(segment_name: str) -> str:
+    stem = segment_name[len(SEGMENT_PREFIX) :].split(".", 1)[0]
+    return f"{COLUMNS_PREFIX}{stem}.npz"
+
+
+class BundleWriter:
+    """Append-only bundle writer that persists traces while a run executes.
+
+    Traces are buffered until ``segment_ticks`` have accumulated and then
+    written as one compressed segment and flushed (``fsync=True`` also forces
+    it to stable storage). Only the current segment is held in memory.
+    :meth:`close` writes the trailing partial segment, the manifest and the
+    HTML report, and makes the archive a regular, complete zip file. With a
+    ``recorder`` (e.g. :meth:`RecordingBackend.drain_calls`) the model calls
+    made since the previous segment are written under ``recording/`` next to
+    each segment.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        config: Dict[str, Any],
+        *,
+        model: str = "unknown",
+        seed: Optional[int] = None,
+        segment_ticks: int = 256,
+        fsync: bool = False,
+        recorder: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.segment_ticks = max(1, segment_ticks)
+        self.fsync = fsync
+        self.run_id = str(uuid.uuid4())
+        self.model = model
+        self.seed = seed
+        self.ticks = 0
+        self.segments: List[Dict[str, int | str]] = []
+        self.recorder = recorder
+        self.recorded_calls = 0
+        self._recording_parts = 0
+        self._pending: List[bytes] = []
+        self._columns = ColumnBuffer()
+        self._report = ReportBuilder(
+            sink=lambda name, script: self._write(
+                REPORT_PAGES_PREFIX + name, script, zipfile.ZIP_DEFLATED
+            ),
+            page_prefix=REPORT_PAGES_PREFIX,
+        )
+        self._file: Optional[IO[bytes]] = open(self.path, "wb")
+        self._archive: Optional[zipfile.ZipFile] = zipfile.ZipFile(self._file, "w")
+        self._write("config.json", json.dumps(config, indent=2), zipfile.ZIP_DEFLATED)
+        self._sync()
+
+    @property
+    def closed(self) -> bool:
+        return self._archive is None
+
+    def append(self, trace: TickTrace) -> None:
+        if self._archive is None:
+            raise RuntimeError(f"bundle {self.path} is closed")
+        self._report.add(trace)
+        data = serialise_trace(trace)
+        self._columns.add(trace.tick, data.pop("metrics"), data.pop("broadcast"))
+        line = json.dumps(data, separators=(",", ":"))
+        self._pending.append(line.encode("utf-8") + b"\n")
+        self.ticks += 1
+        if len(self._pending) >= self.segment_ticks:
+            self._flush_segment()
+
+    def _flush_segment(self) -> None:
+        if not self._pending:
+            return
+        name = _segment_name(len(self.segments))
+        columns = _columns_name(name)
+        # Columns go first: a segment is only complete once its JSON lines exist.
+        self._write(columns, self._columns.encode(), zipfile.ZIP_STORED)
+        payload = gzip.compress(b"".join(self._pending), compresslevel=6, mtime=0)
+        self._flush_recording()
+        self._write(name, payload, zipfile.ZIP_STORED)
+        self.segments.append(
+            {
+                "name": name,
+                "columns": columns,
+                "first_tick": self._columns.ticks[0],
+                "last_tick": self._columns.ticks[-1],
+                "count": len(self._pending),
+            }
+        )
+        self._pending = []
+        self._columns = ColumnBuffer()
+        self._sync()
+
+    def _flush_recording(self) -> None:
+        if self.recorder is None:
+            return
+        calls = self.recorder()
+        if not calls:
+            return
+        lines = b"".join(
+            json.dumps(call, separators=(",", ":")).encode("utf-8") + b"\n" for call in calls
+        )
+        name = f"{RECORDING_PREFIX}{self._recording_parts:06d}.jsonl.gz"
+        self._write(name, gzip.compress(lines, compresslevel=6, mtime=0), zipfile.ZIP_STORED)
+        self._recording_parts += 1
+        self.recorded_calls += len(calls)
 
-from ..reporting.html_report import render_report
-from ..tasks.evaluations import aggregate_from_traces
+    def _write(self, name: str, data: str | bytes, compression: int) -> None:
+        assert self._archive is not None
+        self._archive.writestr(name, data, compress_type=compression)
 
+    def _sync(self) -> None:
+        assert self._file is not None
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
 
-def _serialise_coalition(coalition) -> Dict[str, Any]:
-    return coalition.model_dump() if coalition else None
+    def close(self, report: Optional[EvalReport] = None) -> str:
+        """Finish the bundle; with ``report`` also write ``report.html``.
 
+        The report's curves, timeline and detail pages were accumulated as
+        traces were appended, so it covers the whole run.
+        """
 
-def _serialise_action(action) -> Dict[str, Any] | None:
-    if action is None:
-        return None
-    return action.model_dump()
+        if self._archive is None:
+            return str(self.path)
+        self._flush_segment()
+        self._flush_recording()
+        manifest = {
+            "run_id": self.run_id,
+            "model": self.model,
+            "seed": self.seed,
+            "format_version": FORMAT_VERSION,
+            "ticks": self.ticks,
+            "segments": self.segments,
+        }
+        if self.recorder is not None:
+            manifest["recorded_calls"] = self.recorded_calls
+        if report is not None:
+            manifest["metrics"] = report.metrics
+            self._write("report.html", self._report.finish(report), zipfile.ZIP_DEFLATED)
+        self._write("manifest.json", json.dumps(manifest, indent=2), zipfile.ZIP_DEFLATED)
+        self._archive.close()
+        self._archive = None
+        assert self._file is not None
+        self._sync()
+        self._file.close()
+        self._file = None
+        return str(self.path)
+
+
+def writer_for_loop(path: str | Path, loop, **kwargs: Any) -> BundleWriter:
+    """Create a :class:`BundleWriter` stamped with ``loop``'s config and model."""
+
+    return BundleWriter(
+        path,
+        loop.config.model_dump(),
+        model=getattr(loop.backend, "name", "unknown"),
+        seed=loop.config.seed,
+        **{"recorder": getattr(loop.backend, "drain_calls", None), **kwargs},
+    )
 
 
 def create_bundle(path: str | Path, loop) -> str:
-    from ..core.types import TickTrace
-
-    traces = getattr(loop, "traces", [])
-    config = loop.config.model_dump()
-    report = aggregate_from_traces(traces)
-    html = render_report(traces, report)
-    run_id = str(uuid.uuid4())
-    manifest = {
-        "run_id": run_id,
-        "model": getattr(loop.backend, "name", "unknown"),
-        "seed": loop.config.seed,
-    }
-    tmp_path = Path(path)
-    tmp_path.parent.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(tmp_path, "w") as archive:
-        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
-        archive.writestr("config.json", json.dumps(config, indent=2))
-        archive.writestr("report.html", html)
-        serialised_traces = []
-        for trace in traces:
-            serialised_traces.append(
+    """Write every trace currently held by ``loop`` to a new bundle."""
+
+    traces = list(getattr(loop, "traces", []))
+    report = loop.eval() if hasattr(loop, "eval") else aggregate_from_traces(traces)
+    writer = writer_for_loop(path, loop)
+    for trace in traces:
+        writer.append(trace)
+    return writer.close(report=report)
+
+
+def _read_segment(archive: zipfile.ZipFile, name: str) -> List[Dict[str, Any]]:
+    with archive.open(name) as raw, gzip.open(raw, "rt", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+class BundleReader:
+    """Lazy, random-access view over a bundle's traces.
+
+    Opening a bundle reads only the zip directory and ``manifest.json``,
+    whose segment list doubles as a tick index: ``bundle[tick]`` and
+    :meth:`ticks` locate segments by bisection and decompress just those, and
+    iteration streams one segment at a time. Legacy bundles that store every
+    trace in ``traces.json`` are loaded whole on first access.
+    """
+
+    def __init__(self, path: str | Path, cache_segments: int = 2) -> None:
+        self.path = Path(path)
+        self._archive = zipfile.ZipFile(self.path, "r")
+        self.manifest: Dict[str, Any] = json.loads(self._archive.read("manifest.json"))
+        self._cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.cache_segments = max(1, cache_segments)
+        self.segments: List[Dict[str, Any]] = list(self.manifest.get("segments", []))
+        self._legacy: Optional[List[Dict[str, Any]]] = None
+        if not self.segments:
+            self._index_legacy()
+        self._first_ticks = [int(segment["first_tick"]) for segment in self.segments]
+
+    def _index_legacy(self) -> None:
+        if "traces.json" not in self._archive.namelist():
+            return
+        self._legacy = json.loads(self._archive.read("traces.json"))
+        if self._legacy:
+            self.segments = [
                 {
-                    "tick": trace.tick,
-                    "broadcast": _serialise_coalition(trace.broadcast.coalition)
-                    if trace.broadcast
-                    else None,
-                    "workspace_state": [c.model_dump() for c in trace.workspace_state],
-                    "processes": {k.value: [c.model_dump() for c in v] for k, v in trace.processes_considered.items()},
-                    "action": _serialise_action(trace.action),
-                    "metrics": trace.metrics,
+                    "name": "traces.json",
+                    "first_tick": self._legacy[0]["tick"],
+                    "last_tick": self._legacy[-1]["tick"],
+                    "count": len(self._legacy),
                 }
+            ]
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return json.loads(self._archive.read("config.json"))
+
+    def __len__(self) -> int:
+        return sum(int(segment["count"]) for segment in self.segments)
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        return self._first_ticks[0] if self.segments else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        return int(self.segments[-1]["last_tick"]) if self.segments else None
+
+    def _segment(self, position: int) -> List[Dict[str, Any]]:
+        if self._legacy is not None:
+            return self._legacy
+        name = str(self.segments[position]["name"])
+        cached = self._cache.get(name)
+        if cached is not None:
+            self._cache.move_to_end(name)
+            return cached
+        items = _read_segment(self._archive, name)
+        columns = self.segments[position].get("columns")
+        if columns:
+            attach_columns(items, decode_columns(self._archive.read(columns)))
+        self._cache[name] = items
+        while len(self._cache) > self.cache_segments:
+            self._cache.popitem(last=False)
+        return items
+
+    def __getitem__(self, tick: int) -> Dict[str, Any]:
+        position = bisect.bisect_right(self._first_ticks, tick) - 1
+        if position >= 0 and tick <= int(self.segments[position]["last_tick"]):
+            for item in self._segment(position):
+                if item["tick"] == tick:
+                    return item
+        raise KeyError(tick)
+
+    def ticks(
+        self, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield traces with ``start <= tick < stop`` in order, one segment at a time."""
+
+        first = 0
+        if start is not None:
+            first = max(0, bisect.bisect_right(self._first_ticks, start) - 1)
+        for position in range(first, len(self.segments)):
+            if stop is not None and self._first_ticks[position] >= stop:
+                return
+            if start is not None and int(self.segments[position]["last_tick"]) < start:
+                continue
+            for item in self._segment(position):
+                tick = item["tick"]
+                if start is not None and tick < start:
+                    continue
+                if stop is not None and tick >= stop:
+                    return
+                yield item
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.ticks()
+
+    def metric_series(self) -> Dict[str, np.ndarray]:
+        """Per-tick arrays: ``tick``, broadcast ``salience``/``confidence`` and each metric.
+
+        Columnar bundles are read without touching the JSON lines; older
+        bundles fall back to parsing their traces.
+        """
+
+        if self.segments and all(segment.get("columns") for segment in self.segments):
+            return metric_series(
+                decode_columns(self._archive.read(segment["columns"]))
+                for segment in self.segments
             )
-        archive.writestr("traces.json", json.dumps(serialised_traces, indent=2))
-    return str(tmp_path)
+        buffer = ColumnBuffer()
+        for item in self:
+            buffer.add(item["tick"], item.get("metrics") or {}, item.get("broadcast"))
+        return metric_series([decode_columns(buffer.encode())] if len(buffer) else [])
+
+    def close(self) -> None:
+        self._archive.close()
+        self._cache.clear()
+
+    def __enter__(self) -> "BundleReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
 
 
 def replay(path: str | Path) -> Dict[str, Any]:
-    with zipfile.ZipFile(Path(path), "r") as archive:
-        manifest = json.loads(archive.read("manifest.json"))
-        traces = json.loads(archive.read("traces.json"))
-        config = json.loads(archive.read("config.json"))
-    return {"manifest": manifest, "traces": traces, "config": config}
+    with BundleReader(path) as bundle:
+        return {"manifest": bundle.manifest, "traces": list(bundle), "config": bundle.config}
+
+
+def read_recording(path: str | Path) -> List[Dict[str, Any]]:
+    """Model calls recorded into a bundle by a ``RecordingBackend``, in call order."""
+
+    calls: List[Dict[str, Any]] = []
+    with zipfile.ZipFile(path, "r") as archive:
+        for name in sorted(archive.namelist()):
+            if name.startswith(RECORDING_PREFIX):
+                calls.extend(_read_segment(archive, name))
+    return calls
+
+
+def read_metrics(path: str | Path) -> Dict[str, np.ndarray]:
+    """Load a bundle's per-tick metric series (see :meth:`BundleReader.metric_series`)."""
+
+    with BundleReader(path) as bundle:
+        return bundle.metric_series()
+
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+
+
+def _complete_entries(handle: IO[bytes]) -> Iterator[Tuple[str, bytes, int]]:
+    """Yield ``(name, data, compression)`` for each intact local file entry.
+
+    Scanning stops at the first entry that is truncated, uses a data
+    descriptor or fails its CRC check, i.e. at the point the writer died.
+    """
+
+    while True:
+        header = handle.read(_LOCAL_HEADER.size)
+        if len(header) < _LOCAL_HEADER.size:
+            return
+        (
+            signature,
+            _version,
+            flags,
+            method,
+            _time,
+            _date,
+            crc,
+            compressed_size,
+            _size,
+            name_length,
+            extra_length,
+        ) = _LOCAL_HEADER.unpack(header)
+        if signature != b"PK\x03\x04" or flags & 0x08:
+            return
+        name = handle.read(name_length).decode("utf-8")
+        handle.read(extra_length)
+        data = handle.read(compressed_size)
+        if len(data) < compressed_size:
+            return
+        try:
+            if method == zipfile.ZIP_STORED:
+                content = data
+            elif method == zipfile.ZIP_DEFLATED:
+                content = zlib.decompress(data, -15)
+            else:
+                return
+        except zlib.error:
+            return
+        if zlib.crc32(content) != crc:
+            return
+        yield name, content, method
+
+
+def recover_bundle(path: str | Path, output: str | Path | None = None) -> str:
+    """Rebuild a bundle left unfinished by a crash, up to its last segment.
+
+    Complete entries are copied into a fresh archive at ``output`` (default:
+    ``<path>.recovered``) together with a manifest flagged ``"recovered"``.
+    Bundles that already open cleanly are copied unchanged.
+    """
+
+    source = Path(path)
+    target = Path(output) if output is not None else source.with_name(source.name + ".recovered")
+    with open(source, "rb") as handle:
+        entries = list(_complete_entries(handle))
+    names = {name for name, _, _ in entries}
+    if "manifest.json" in names:
+        target.write_bytes(source.read_bytes())
+        return str(target)
+    segments: List[Dict[str, int | str]] = []
+    config: Dict[str, Any] = {}
+    columns = {
+        name: (content, method)
+        for name, content, method in entries
+        if name.startswith(COLUMNS_PREFIX)
+    }
+    with zipfile.ZipFile(target, "w") as archive:
+        for name, content, method in entries:
+            if name.startswith(COLUMNS_PREFIX):
+                # Copied together with their segment below; orphans are dropped.
+                continue
+            archive.writestr(name, content, compress_type=method)
+            if name == "config.json":
+                config = json.loads(content)
+            if not name.startswith(SEGMENT_PREFIX):
+                continue
+            lines = gzip.decompress(content).splitlines()
+            ticks = [json.loads(line)["tick"] for line in (lines[0], lines[-1])]
+            segment: Dict[str, int | str] = {
+                "name": name,
+                "first_tick": ticks[0],
+                "last_tick": ticks[1],
+                "count": len(lines),
+            }
+            columns_name = _columns_name(name)
+            if columns_name in columns:
+                column_bytes, column_method = columns[columns_name]
+                archive.writestr(columns_name, column_bytes, compress_type=column_method)
+                segment["columns"] = columns_name
+            segments.append(segment)
+        manifest = {
+            "run_id": str(uuid.uuid4()),
+            "seed": config.get("seed"),
+            "format_version": FORMAT_VERSION,
+            "ticks": sum(int(segment["count"]) for segment in segments),
+            "segments": segments,
+            "recovered": True,
+        }
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return str(target)
 
 
-__all__ = ["create_bundle", "replay"]
+__all__ = [
+    "BundleReader",
+    "BundleWriter",
+    "FORMAT_VERSION",
+    "create_bundle",
+    "read_metrics",
+    "read_recording",
+    "recover_bundle",
+    "replay",
+    "writer_for_loop",
+]
@@ -0,0 +1,214 @@
+"""Binary checkpoints and copy-on-write forks of a running loop.
+
+A checkpoint is a pickle of the whole :class:`~noema.core.loop.ConsciousLoop`
+(controller tick, workspace, working memory, episodic store, metacognition,
+narrative, per-process state, evaluator and traces) plus an optional task,
+so a run can resume at its exact position. Objects that cannot or should not
+be serialised are written as references via ``persistent_id`` and rebuilt on
+load: the backend is supplied by the caller, embedding services are
+reopened from their cache path, the proposal thread pool is recreated
+lazily, and attached bundle writers or trace spills are detached. SQLite
+and DuckDB episodic stores are snapshotted into the checkpoint and restored
+to a fresh database file, so writes made by the original loop after the
+checkpoint never leak into the restored one.
+
+Loading a checkpoint unpickles it, which can run arbitrary code: only load
+checkpoint files you created or otherwise trust.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import io
+import os
+import pickle
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Tuple
+
+from ..core.backends.base import LLMBackend
+from ..core.embeddings import EmbeddingService, default_embeddings
+from ..core.memory import DuckDBEpisodic, SqliteEpisodic
+from ..tasks.evaluations import evaluation_embeddings
+from .bundles import BundleWriter
+from .traces import TraceSpill
+
+if TYPE_CHECKING:
+    from ..core.loop import ConsciousLoop
+
+CHECKPOINT_MAGIC = b"NOEMA-CHECKPOINT\x01\n"
+
+
+class Restored(NamedTuple):
+    loop: ConsciousLoop
+    task: Any = None
+
+
+class _CheckpointPickler(pickle.Pickler):
+    def __init__(self, file: IO[bytes], loop: ConsciousLoop) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.loop = loop
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[Any, ...]]:
+        if obj is self.loop.backend:
+            return ("backend",)
+        if isinstance(obj, EmbeddingService):
+            return ("embeddings", *_embeddings_ref(obj, self.loop.backend))
+        if isinstance(obj, Executor | BundleWriter | TraceSpill | asyncio.Lock):
+            return ("detached",)
+        if isinstance(obj, SqliteEpisodic | DuckDBEpisodic):
+            service = _embeddings_ref(obj.embeddings, self.loop.backend)
+            return ("episodic", type(obj).__name__, str(obj.path), obj.snapshot(), *service)
+        return None
+
+
+def _embeddings_ref(service: EmbeddingService, backend: LLMBackend) -> Tuple[Any, ...]:
+    if service is default_embeddings():
+        return ("default", None)
+    if service is evaluation_embeddings():
+        return ("evaluation", None)
+    if service.backend is not None and service.backend is not backend:
+        raise ValueError("cannot checkpoint an embedding service bound to another backend")
+    return ("backend" if service.backend is not None else "hash", service.cache_path)
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(
+        self, file: IO[bytes], backend: LLMBackend, episodic_path: Optional[str | Path] = None
+    ) -> None:
+        super().__init__(file)
+        self.backend = backend
+        self.episodic_path = episodic_path
+        self._services: Dict[Tuple[Any, ...], EmbeddingService] = {}
+
+    def _embeddings(self, kind: str, cache_path: Optional[str]) -> EmbeddingService:
+        if kind == "default":
+            return default_embeddings()
+        if kind == "evaluation":
+            return evaluation_embeddings()
+        key = (kind, cache_path)
+        if key not in self._services:
+            backend = self.backend if kind == "backend" else None
+            self._services[key] = EmbeddingService(backend, cache_path=cache_path)
+        return self._services[key]
+
+    def persistent_load(self, pid: Tuple[Any, ...]) -> Any:
+        tag = pid[0]
+        if tag == "backend":
+            return self.backend
+        if tag == "embeddings":
+            return self._embeddings(*pid[1:])
+        if tag == "detached":
+            return None
+        if tag == "episodic":
+            store, path, snapshot, kind, cache_path = pid[1:]
+            cls = SqliteEpisodic if store == "SqliteEpisodic" else DuckDBEpisodic
+            target = Path(self.episodic_path) if self.episodic_path else _restore_path(path)
+            if target.exists():
+                raise FileExistsError(f"refusing to overwrite episodic store {target}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(snapshot)
+            return cls(target, embeddings=self._embeddings(kind, cache_path))
+        raise pickle.UnpicklingError(f"unknown checkpoint reference {pid!r}")
+
+
+def _restore_path(original: str) -> Path:
+    """First free ``<stem>.restored-<n><suffix>`` next to ``original``."""
+
+    source = Path(original)
+    n = 1
+    while True:
+        candidate = source.with_name(f"{source.stem}.restored-{n}{source.suffix}")
+        if not candidate.exists():
+            return candidate
+        n += 1
+
+
+def dumps_checkpoint(loop: ConsciousLoop, task: Any = None) -> bytes:
+    """Serialise ``loop`` (and optionally the task feeding it) to bytes."""
+
+    buffer = io.BytesIO()
+    buffer.write(CHECKPOINT_MAGIC)
+    _CheckpointPickler(buffer, loop).dump({"loop": loop, "task": task})
+    return buffer.getvalue()
+
+
+def loads_checkpoint(
+    data: bytes, backend: LLMBackend, *, episodic_path: Optional[str | Path] = None
+) -> Restored:
+    """Rebuild a loop from :func:`dumps_checkpoint` output, driving ``backend``.
+
+    A snapshotted SQLite/DuckDB episodic store is written to ``episodic_path``
+    (default: a fresh ``.restored-<n>`` file next to the original) and the
+    restored loop's ``config.episodic_path`` points at it.
+    """
+
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError("not a Noema checkpoint")
+    buffer = io.BytesIO(data)
+    buffer.seek(len(CHECKPOINT_MAGIC))
+    payload = _CheckpointUnpickler(buffer, backend, episodic_path).load()
+    loop = payload["loop"]
+    episodic = loop.controller.episodic
+    if isinstance(episodic, SqliteEpisodic | DuckDBEpisodic):
+        loop.config.episodic_path = str(episodic.path)
+    return Restored(loop, payload["task"])
+
+
+def save_checkpoint(path: str | Path, loop: ConsciousLoop, task: Any = None) -> str:
+    """Atomically write a checkpoint of ``loop`` (and ``task``) to ``path``."""
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(dumps_checkpoint(loop, task))
+    os.replace(tmp, target)
+    return str(target)
+
+
+def load_checkpoint(
+    path: str | Path, backend: LLMBackend, *, episodic_path: Optional[str | Path] = None
+) -> Restored:
+    """Read a checkpoint written by :func:`save_checkpoint`; trusted files only."""
+
+    return loads_checkpoint(Path(path).read_bytes(), backend, episodic_path=episodic_path)
+
+
+def fork_loop(
+    loop: ConsciousLoop, task: Any = None, backend: Optional[LLMBackend] = None
+) -> Restored:
+    """Clone a live loop in memory without re-running its history.
+
+    Traces are shared (they are never mutated), the episodic store is forked
+    copy-on-write and everything else is deep-copied. The fork reuses the
+    parent's backend unless ``backend`` is given (embedding services stay
+    shared with the parent), and starts detached from
+    any bundle or trace spill. Disk-backed episodic stores cannot be forked
+    (their ``fork`` raises ``NotImplementedError``); checkpoint those instead.
+    """
+
+    controller = loop.controller
+    memo: Dict[int, Any] = {
+        id(loop.backend): backend if backend is not None else loop.backend,
+        id(controller.episodic): controller.episodic.fork(),
+    }
+    for service in (*controller._embedding_services(), default_embeddings()):
+        memo[id(service)] = service
+    for attached in (controller._executor, loop._spill, loop._bundle, loop._async_lock):
+        if attached is not None:
+            memo[id(attached)] = None
+    for trace in loop.traces:
+        memo[id(trace)] = trace
+    return Restored(copy.deepcopy(loop, memo), copy.deepcopy(task))
+
+
+__all__ = [
+    "CHECKPOINT_MAGIC",
+    "Restored",
+    "dumps_checkpoint",
+    "fork_loop",
+    "load_checkpoint",
+    "loads_checkpoint",
+    "save_checkpoint",
+]
@@ -0,0 +1,143 @@
+"""Columnar encoding of per-tick numeric trace fields.
+
+A segment's tick numbers, metrics and broadcast confidence/salience are stored
+as NumPy arrays in one compressed ``.npz`` member; broadcast summaries, texts
+and sources go into a deduplicated UTF-8 string table referenced by index.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_COALITION_NUMERIC = ("salience", "confidence")
+_COALITION_STRINGS = ("summary", "full_text", "source")
+
+
+class ColumnBuffer:
+    """Accumulates one segment's numeric fields before encoding."""
+
+    def __init__(self) -> None:
+        self.ticks: List[int] = []
+        self.metrics: List[Dict[str, float]] = []
+        self.broadcasts: List[Optional[Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def add(
+        self, tick: int, metrics: Dict[str, float], broadcast: Optional[Dict[str, Any]]
+    ) -> None:
+        self.ticks.append(tick)
+        self.metrics.append(metrics)
+        self.broadcasts.append(broadcast)
+
+    def encode(self) -> bytes:
+        count = len(self.ticks)
+        names = sorted({name for metrics in self.metrics for name in metrics})
+        first_keys = list(self.metrics[0]) if self.metrics else []
+        if all(list(metrics) == first_keys for metrics in self.metrics):
+            # Common case: every tick reports the same metrics in the same order.
+            rows = np.asarray([list(m.values()) for m in self.metrics], dtype=np.float64)
+            order = [first_keys.index(name) for name in names]
+            matrix = rows.reshape(count, len(first_keys))[:, order]
+        else:
+            matrix = np.full((count, len(names)), np.nan)
+            column = {name: idx for idx, name in enumerate(names)}
+            for row, metrics in enumerate(self.metrics):
+                for name, value in metrics.items():
+                    matrix[row, column[name]] = value
+
+        table: Dict[str, int] = {}
+        string_ids = np.full((count, len(_COALITION_STRINGS)), -1, dtype=np.int32)
+        numeric = np.full((count, len(_COALITION_NUMERIC)), np.nan)
+        for row, broadcast in enumerate(self.broadcasts):
+            if broadcast is None:
+                continue
+            for col, key in enumerate(_COALITION_STRINGS):
+                string_ids[row, col] = table.setdefault(broadcast[key], len(table))
+            numeric[row] = [broadcast[key] for key in _COALITION_NUMERIC]
+        encoded = [text.encode("utf-8") for text in table]
+        offsets = np.cumsum([0] + [len(item) for item in encoded], dtype=np.int64)
+
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            tick=np.asarray(self.ticks, dtype=np.int64),
+            metric_names=np.asarray(names, dtype=np.str_),
+            metrics=matrix,
+            broadcast_numeric=numeric,
+            broadcast_strings=string_ids,
+            string_bytes=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            string_offsets=offsets,
+        )
+        return buffer.getvalue()
+
+
+def decode_columns(payload: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(payload)) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _strings(columns: Dict[str, np.ndarray]) -> List[str]:
+    blob = columns["string_bytes"].tobytes()
+    offsets = columns["string_offsets"].tolist()
+    return [blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def attach_columns(items: Sequence[Dict[str, Any]], columns: Dict[str, np.ndarray]) -> None:
+    """Restore ``metrics`` and ``broadcast`` on decoded trace dicts in place."""
+
+    names = columns["metric_names"].tolist()
+    strings = _strings(columns)
+    metrics = columns["metrics"].tolist()
+    numeric = columns["broadcast_numeric"].tolist()
+    string_ids = columns["broadcast_strings"].tolist()
+    for row, item in enumerate(items):
+        item["metrics"] = {
+            name: value for name, value in zip(names, metrics[row]) if value == value
+        }
+        if string_ids[row][0] < 0:
+            item["broadcast"] = None
+            continue
+        summary, full_text, source = (strings[idx] for idx in string_ids[row])
+        salience, confidence = numeric[row]
+        item["broadcast"] = {
+            "summary": summary,
+            "full_text": full_text,
+            "salience": salience,
+            "source": source,
+            "confidence": confidence,
+        }
+
+
+def metric_series(columns: Iterable[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate segments into ``{"tick": ..., "confidence": ..., metric: ...}``.
+
+    Metrics missing from a segment are filled with NaN.
+    """
+
+    parts = list(columns)
+    names = sorted({name for part in parts for name in part["metric_names"].tolist()})
+    if not parts:
+        return {"tick": np.empty(0, dtype=np.int64)}
+    series: Dict[str, np.ndarray] = {
+        "tick": np.concatenate([part["tick"] for part in parts]),
+        "salience": np.concatenate([part["broadcast_numeric"][:, 0] for part in parts]),
+        "confidence": np.concatenate([part["broadcast_numeric"][:, 1] for part in parts]),
+    }
+    for name in names:
+        chunks = []
+        for part in parts:
+            local = part["metric_names"].tolist()
+            if name in local:
+                chunks.append(part["metrics"][:, local.index(name)])
+            else:
+                chunks.append(np.full(len(part["tick"]), np.nan))
+        series[name] = np.concatenate(chunks)
+    return series
+
+
+__all__ = ["ColumnBuffer", "attach_columns", "decode_columns", "metric_series"]
@@ -0,0 +1,161 @@
+"""Trace serialisation and append-only trace spill files."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from ..core.types import (
+    Action,
+    Broadcast,
+    Coalition,
+    ProcessName,
+    ScheduleDecision,
+    TickTrace,
+    WorkspaceDelta,
+)
+from ..core.workspace import replay_deltas
+
+
+def serialise_delta(delta: WorkspaceDelta) -> Dict[str, Any]:
+    return {
+        "keyframe": delta.keyframe,
+        "added": [[key, coalition.model_dump()] for key, coalition in delta.added],
+        "removed": list(delta.removed),
+    }
+
+
+def deserialise_delta(data: Dict[str, Any]) -> WorkspaceDelta:
+    return WorkspaceDelta(
+        keyframe=bool(data["keyframe"]),
+        added=tuple((int(key), Coalition(**item)) for key, item in data["added"]),
+        removed=tuple(int(key) for key in data["removed"]),
+    )
+
+
+def serialise_trace(trace: TickTrace) -> Dict[str, Any]:
+    """JSON-ready dict for one trace, as stored in bundles and spill files.
+
+    Delta-encoded traces store only ``workspace_delta`` (keyframes included,
+    since a keyframe delta already lists every coalition); ``workspace_state``
+    is written for traces that carry no delta. Scheduling decisions are
+    included only for runs with adaptive scheduling.
+    """
+
+    if trace.workspace_delta is not None:
+        workspace_state = None
+        workspace_delta = serialise_delta(trace.workspace_delta)
+    else:
+        workspace_state = [c.model_dump() for c in trace.workspace_state or ()]
+        workspace_delta = None
+    data = {
+        "tick": trace.tick,
+        "broadcast": trace.broadcast.coalition.model_dump() if trace.broadcast else None,
+        "workspace_state": workspace_state,
+        "workspace_delta": workspace_delta,
+        "processes": {
+            name.value: [c.model_dump() for c in coalitions]
+            for name, coalitions in trace.processes_considered.items()
+        },
+        "action": trace.action.model_dump() if trace.action is not None else None,
+        "metrics": trace.metrics,
+    }
+    if trace.schedule:
+        data["schedule"] = {name.value: asdict(item) for name, item in trace.schedule.items()}
+    return data
+
+
+def deserialise_trace(data: Dict[str, Any]) -> TickTrace:
+    """Inverse of :func:`serialise_trace`."""
+
+    tick = int(data["tick"])
+    broadcast = data.get("broadcast")
+    state = data.get("workspace_state")
+    delta = data.get("workspace_delta")
+    action = data.get("action")
+    return TickTrace(
+        tick=tick,
+        broadcast=Broadcast(coalition=Coalition(**broadcast), tick=tick) if broadcast else None,
+        workspace_state=tuple(Coalition(**c) for c in state) if state is not None else None,
+        processes_considered={
+            ProcessName(name): [Coalition(**c) for c in coalitions]
+            for name, coalitions in data.get("processes", {}).items()
+        },
+        action=Action(**action) if action is not None else None,
+        metrics=dict(data.get("metrics", {})),
+        workspace_delta=deserialise_delta(delta) if delta is not None else None,
+        schedule={
+            ProcessName(name): ScheduleDecision(**item)
+            for name, item in data.get("schedule", {}).items()
+        },
+    )
+
+
+def serialised_workspace_states(
+    traces: Iterable[Dict[str, Any]],
+) -> Iterator[Tuple[Coalition, ...]]:
+    """Rebuild the full workspace state of each serialised trace, in order."""
+
+    def deltas() -> Iterator[WorkspaceDelta]:
+        for item in traces:
+            if item.get("workspace_delta") is not None:
+                yield deserialise_delta(item["workspace_delta"])
+            else:
+                state = [Coalition(**c) for c in item.get("workspace_state") or []]
+                yield WorkspaceDelta(keyframe=True, added=tuple(enumerate(state)))
+
+    return replay_deltas(deltas())
+
+
+class TraceSpill:
+    """Append-only JSON Lines file receiving traces evicted from RAM.
+
+    Each trace is written as one compact line the moment it is appended, so
+    the file is readable (up to its last complete line) while a run is
+    still executing.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[IO[str]] = open(self.path, "a", encoding="utf-8")
+        self.count = 0
+
+    def append(self, trace: TickTrace) -> None:
+        if self._handle is None:
+            raise RuntimeError(f"trace spill {self.path} is closed")
+        self._handle.write(json.dumps(serialise_trace(trace), separators=(",", ":")))
+        self._handle.write("\n")
+        self.count += 1
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def read_spill(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Yield serialised traces from a spill file, skipping a torn last line."""
+
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.endswith("\n"):
+                break
+            yield json.loads(line)
+
+
+__all__ = [
+    "TraceSpill",
+    "deserialise_delta",
+    "deserialise_trace",
+    "read_spill",
+    "serialise_delta",
+    "serialise_trace",
+    "serialised_workspace_states",
+]
@@ -2,19 +2,19 @@
 
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 import typer
 import yaml
 
 from .core.backends.dummy import DummyBackend
 from .core.loop import ConsciousLoop
-from .core.types import Percept, ProcessName, RunConfig
+from .core.types import Percept, ProcessName, RunConfig, TickTrace
 from .reporting.html_report import save_report
 from .tasks import microworlds
 from .tasks.ablations import apply_ablation
-from .tasks.evaluations import aggregate_from_traces
 
 app = typer.Typer(add_completion=False)
 eval_app = typer.Typer(help="Evaluation suite")
@@ -30,20 +30,38 @@ def _load_config(path: Optional[Path]) -> RunConfig:
     return RunConfig.model_validate(data)
 
 
+def _config_from_bundle(path: Path) -> RunConfig:
+    from .artifacts.bundles import BundleReader
+
+    with BundleReader(path) as bundle:
+        data = bundle.config
+    for key in ("process_budgets", "process_temperature", "proposal_ttl"):
+        if key in data:
+            data[key] = {ProcessName(name): value for name, value in data[key].items()}
+    return RunConfig.model_validate(data)
+
+
 def _backend_from_name(
     name: str,
     seed: int,
     openai_api_key: Optional[str] = None,
     openai_base_url: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
 ):
     name = name.lower()
     if name == "dummy":
-        return DummyBackend(seed=seed)
-    if name == "openai":
+        backend = DummyBackend(seed=seed)
+    elif name == "openai":
         from .core.backends.openai_backend import OpenAIBackend
 
-        return OpenAIBackend(api_key=openai_api_key, base_url=openai_base_url)
-    raise typer.BadParameter(f"Unknown model {name}")
+        backend = OpenAIBackend(api_key=openai_api_key, base_url=openai_base_url)
+    else:
+        raise typer.BadParameter(f"Unknown model {name}")
+    if cache_dir is not None:
+        from .core.backends.cache import CachingBackend
+
+        return CachingBackend(backend, Path(cache_dir) / "responses.sqlite")
+    return backend
 
 
 def _task_from_name(name: str):
@@ -66,6 +84,31 @@ def run(
     bundle: Optional[Path] = typer.Option(None, help="Bundle output path"),
     config: Optional[Path] = typer.Option(None, help="Config override"),
     disable_reflector: bool = typer.Option(False, help="Disable reflector process"),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        help="Directory for a persistent generate() response cache",
+    ),
+    stream: bool = typer.Option(
+        False,
+        help="Constant-memory mode: keep only recent traces and evaluate incrementally",
+    ),
+    spill: Optional[Path] = typer.Option(
+        None,
+        help="With --stream, append evicted traces to this JSONL file",
+    ),
+    record: bool = typer.Option(
+        False,
+        help="Record every model call and response into the --bundle for later replay",
+    ),
+    replay_from: Optional[Path] = typer.Option(
+        None,
+        "--replay",
+        help="Serve model calls from a bundle recorded with --record instead of the model",
+    ),
+    fallthrough: bool = typer.Option(
+        False,
+        help="With --replay, send calls missing from the recording to --model",
+    ),
     openai_api_key: Optional[str] = typer.Option(
         None,
         help="OpenAI API key for the openai backend",
@@ -77,14 +120,38 @@ def run(
         envvar="OPENAI_BASE_URL",
     ),
 ) -> None:
-    run_config = _load_config(config)
-    backend = _backend_from_name(
-        model,
-        run_config.seed,
-        openai_api_key=openai_api_key,
-        openai_base_url=openai_base_url,
-    )
+    if replay_from is not None and config is None:
+        run_config = _config_from_bundle(replay_from)
+    else:
+        run_config = _load_config(config)
+    if stream:
+        run_config.streaming = True
+        run_config.trace_spill_path = str(spill) if spill else None
+    if record and bundle is None:
+        raise typer.BadParameter("--record needs --bundle to store the recording")
+    if run_config.streaming and report is not None and not run_config.trace_spill_path:
+        raise typer.BadParameter("--report with --stream needs --spill to cover every tick")
+    if replay_from is not None and not fallthrough:
+        backend = None
+    else:
+        backend = _backend_from_name(
+            model,
+            run_config.seed,
+            openai_api_key=openai_api_key,
+            openai_base_url=openai_base_url,
+            cache_dir=cache_dir,
+        )
+    if replay_from is not None:
+        from .core.backends.recording import ReplayBackend
+
+        backend = ReplayBackend.from_bundle(replay_from, live=backend, strict=not fallthrough)
+    if record:
+        from .core.backends.recording import RecordingBackend
+
+        backend = RecordingBackend(backend)
     loop = ConsciousLoop(backend, run_config)
+    if bundle is not None:
+        loop.open_bundle(bundle)
     env = _task_from_name(task)
     if disable_reflector:
         apply_ablation(loop.controller, [ProcessName.REFLECTOR])
@@ -95,21 +162,55 @@ def run(
         result = loop.run_workflow(percept)
         env.apply_action(result.action)
     report_data = loop.eval()
+    # Closing a streaming loop appends its ring buffer, completing the spill.
+    loop.close()
+    close_backend = getattr(loop.backend, "close", None)
+    if callable(close_backend):
+        close_backend()
     if report is not None:
-        save_report(loop.traces, report_data, report)
+        traces: Iterable[TickTrace] = loop.traces
+        if run_config.streaming and run_config.trace_spill_path:
+            from .artifacts.traces import deserialise_trace, read_spill
+
+            spilled = read_spill(run_config.trace_spill_path)
+            traces = (deserialise_trace(item) for item in spilled)
+        save_report(traces, report_data, report)
         typer.echo(f"Report written to {report}")
     if bundle is not None:
-        path = loop.save_bundle(bundle)
-        typer.echo(f"Bundle saved to {path}")
+        typer.echo(f"Bundle saved to {bundle}")
     typer.echo(f"Run metrics: {report_data.metrics}")
 
 
 @app.command()
-def replay(path: Path) -> None:
+def replay(
+    path: Path,
+    from_tick: Optional[int] = typer.Option(None, "--from", help="First tick to print"),
+    to_tick: Optional[int] = typer.Option(None, "--to", help="Last tick to print (inclusive)"),
+) -> None:
+    from .artifacts.bundles import BundleReader
+
+    with BundleReader(path) as bundle:
+        if from_tick is not None or to_tick is not None:
+            stop = to_tick + 1 if to_tick is not None else None
+            for item in bundle.ticks(from_tick, stop):
+                broadcast = item.get("broadcast") or {}
+                typer.echo(f"Tick {item['tick']}: {broadcast.get('summary', 'None')}")
+        typer.echo(f"Replayed {bundle.manifest['run_id']} with {len(bundle)} ticks")
+
+
+@app.command()
+def recover(
+    path: Path,
+    output: Optional[Path] = typer.Option(None, help="Recovered bundle path"),
+) -> None:
+    """Salvage an unfinished bundle up to its last complete trace segment."""
+
+    from .artifacts.bundles import recover_bundle
     from .artifacts.bundles import replay as replay_bundle
 
-    data = replay_bundle(path)
-    typer.echo(f"Replayed {data['manifest']['run_id']} with {len(data['traces'])} ticks")
+    recovered = recover_bundle(path, output)
+    data = replay_bundle(recovered)
+    typer.echo(f"Recovered {len(data['traces'])} ticks into {recovered}")
 
 
 @eval_app.command("battery")
@@ -117,6 +218,16 @@ def eval_battery(
     model: str = typer.Option("dummy", help="Backend model to use"),
     ticks: int = typer.Option(100, help="Number of workflow cycles to execute"),
     config: Optional[Path] = typer.Option(None, help="Config override"),
+    seeds: int = typer.Option(1, help="Number of seeds per task, starting at the config seed"),
+    tasks: str = typer.Option(
+        "interruption_count",
+        help="Comma-separated tasks (interruption_count, nback, change_blindness)",
+    ),
+    workers: int = typer.Option(1, help="Worker processes running seeds in parallel"),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        help="Directory for a persistent generate() response cache",
+    ),
     openai_api_key: Optional[str] = typer.Option(
         None,
         help="OpenAI API key for the openai backend",
@@ -128,23 +239,39 @@ def eval_battery(
         envvar="OPENAI_BASE_URL",
     ),
 ) -> None:
+    from .tasks.battery import format_summary, run_battery, summarise_battery
+
     run_config = _load_config(config)
-    backend = _backend_from_name(
+    task_names = [name.strip() for name in tasks.split(",") if name.strip()]
+    for name in task_names:
+        try:
+            microworlds.make_task(name, 1, run_config.seed)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    backend_factory = partial(
+        _backend_from_name,
         model,
-        run_config.seed,
         openai_api_key=openai_api_key,
         openai_base_url=openai_base_url,
+        cache_dir=cache_dir,
     )
-    loop = ConsciousLoop(backend, run_config)
-    env = microworlds.InterruptionCountingTask(length=ticks, interruption_rate=0.3)
-    for _ in range(ticks):
-        percept = env.next_percept()
-        if percept is None:
-            break
-        result = loop.run_workflow(percept)
-        env.apply_action(result.action)
-    report = aggregate_from_traces(loop.traces, backend)
-    typer.echo(f"Battery summary: {report.metrics}")
+
+    def progress(result, done: int, total: int) -> None:
+        typer.echo(f"[{done}/{total}] {result.task} seed={result.seed} ticks={result.ticks}")
+
+    results = run_battery(
+        task_names,
+        range(run_config.seed, run_config.seed + max(1, seeds)),
+        ticks,
+        workers=workers,
+        config=run_config,
+        backend_factory=backend_factory,
+        on_result=progress,
+    )
+    if len(results) == 1:
+        typer.echo(f"Battery summary: {results[0].metrics}")
+    else:
+        typer.echo(format_summary(summarise_battery(results)))
 
 
 @app.command()
@@ -180,6 +307,18 @@ def ablate(
         help="Processes to disable (e.g. reflector, planner)",
     ),
     ticks: int = typer.Option(50, help="Workflow cycles to simulate"),
+    sweep: bool = typer.Option(
+        False,
+        help="Compare every subset of processes (or of --disable) against the full model",
+    ),
+    subset: Optional[list[str]] = typer.Option(
+        None,
+        "--subset",
+        help="Comma-separated processes forming one ablation of a sweep; repeatable",
+    ),
+    task: str = typer.Option("interruption_count", help="Task providing the percept stream"),
+    seeds: int = typer.Option(1, help="Number of model seeds per ablation in a sweep"),
+    workers: int = typer.Option(1, help="Worker processes running the sweep in parallel"),
     openai_api_key: Optional[str] = typer.Option(
         None,
         help="OpenAI API key for the openai backend",
@@ -192,6 +331,47 @@ def ablate(
     ),
 ) -> None:
     run_config = _load_config(None)
+    if sweep or subset:
+        from .tasks.ablations import (
+            ablation_subsets,
+            ablation_table,
+            format_ablation_table,
+            run_ablation_sweep,
+        )
+
+        try:
+            if subset:
+                subsets = [
+                    [ProcessName(item.strip()) for item in entry.split(",") if item.strip()]
+                    for entry in subset
+                ]
+            else:
+                subsets = ablation_subsets([ProcessName(item) for item in disable or []] or None)
+            microworlds.make_task(task, 1, run_config.seed)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+
+        def progress(result, done: int, total: int) -> None:
+            label = ",".join(name.value for name in result.disabled) or "(full model)"
+            typer.echo(f"[{done}/{total}] {label} seed={result.seed}")
+
+        results = run_ablation_sweep(
+            subsets,
+            range(run_config.seed, run_config.seed + max(1, seeds)),
+            ticks,
+            task=task,
+            workers=workers,
+            config=run_config,
+            backend_factory=partial(
+                _backend_from_name,
+                "dummy",
+                openai_api_key=openai_api_key,
+                openai_base_url=openai_base_url,
+            ),
+            on_result=progress,
+        )
+        typer.echo(format_ablation_table(ablation_table(results)))
+        return
     backend = _backend_from_name(
         "dummy",
         run_config.seed,
@@ -209,7 +389,7 @@ def ablate(
             break
         result = loop.run_workflow(percept)
         env.apply_action(result.action)
-    report = aggregate_from_traces(loop.traces)
+    report = loop.eval()
     typer.echo(f"Ablation metrics: {report.metrics}")
 
 
@@ -0,0 +1,167 @@
+"""Approximate nearest-neighbour index for episodic memory."""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def spherical_kmeans(
+    data: np.ndarray,
+    k: int,
+    iterations: int = 10,
+    seed: int = 0,
+) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity and return unit centroids."""
+
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, len(data)))
+    centroids = data[rng.choice(len(data), size=k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        empty = np.bincount(assign, minlength=k) == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        centroids = _unit(sums).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index: rows are bucketed under their nearest k-means centroid.
+
+    The index stores only centroids and per-list row ids; vectors stay in the
+    caller's matrix. A search scores the query against the centroids, scans the
+    ``nprobe`` closest lists exactly and returns the best rows among them.
+    Raising ``nprobe`` trades latency for recall; ``nprobe >= nlist`` is exact.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        min_train_size: int = 1024,
+        seed: int = 0,
+    ) -> None:
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = max(1, nprobe)
+        self.min_train_size = min_train_size
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._lists: List[List[int]] = []
+        self._arrays: List[Optional[np.ndarray]] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def needs_training(self, size: int) -> bool:
+        """True once enough rows exist to (re)build centroids.
+
+        Retraining happens each time the collection quadruples, which keeps
+        the amortised training cost per insert bounded.
+        """
+
+        if size < self.min_train_size:
+            return False
+        return not self.is_trained or size >= 4 * self.trained_size
+
+    def train(self, rows: np.ndarray) -> None:
+        """Fit centroids on ``rows`` (a sample if large) and reassign every row."""
+
+        nlist = self.nlist or int(math.sqrt(len(rows)))
+        nlist = max(1, min(nlist, len(rows)))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(rows), max(64 * nlist, 10_000))
+        sample = rows
+        if sample_size < len(rows):
+            sample = rows[rng.choice(len(rows), sample_size, replace=False)]
+        self.centroids = spherical_kmeans(sample, nlist, seed=self.seed)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._arrays = [None for _ in range(len(self.centroids))]
+        self.trained_size = len(rows)
+        self.add(rows, start=0)
+
+    def add(self, vectors: np.ndarray, start: int) -> None:
+        """Assign ``vectors`` (row ids ``start..``) to their nearest lists."""
+
+        if self.centroids is None or not len(vectors):
+            return
+        for offset in range(0, len(vectors), 65_536):
+            chunk = vectors[offset : offset + 65_536]
+            assign = np.argmax(chunk @ self.centroids.T, axis=1)
+            for row, bucket in enumerate(assign.tolist(), start=start + offset):
+                self._lists[bucket].append(row)
+                self._arrays[bucket] = None
+
+    def _members(self, bucket: int) -> np.ndarray:
+        cached = self._arrays[bucket]
+        if cached is None:
+            cached = np.asarray(self._lists[bucket], dtype=np.int64)
+            self._arrays[bucket] = cached
+        return cached
+
+    def search(
+        self,
+        rows: np.ndarray,
+        query: np.ndarray,
+        limit: int,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(row_ids, scores)`` for one unit ``query``, best first."""
+
+        assert self.centroids is not None, "index must be trained before search"
+        probes = min(len(self.centroids), nprobe or self.nprobe)
+        centroid_scores = self.centroids @ query
+        if probes < len(centroid_scores):
+            buckets = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        else:
+            buckets = np.arange(len(centroid_scores))
+        candidates = np.concatenate([self._members(int(b)) for b in buckets])
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+        scores = rows[candidates] @ query
+        k = min(limit, len(candidates))
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))
+        return candidates[order], scores[order]
+
+    def state(self) -> dict:
+        """Arrays needed to rebuild the index without retraining."""
+
+        if self.centroids is None:
+            return {}
+        bucket_of = np.full(sum(len(members) for members in self._lists), -1, dtype=np.int32)
+        for bucket, members in enumerate(self._lists):
+            bucket_of[members] = bucket
+        return {
+            "ivf_centroids": self.centroids,
+            "ivf_assign": bucket_of,
+            "ivf_trained_size": np.asarray(self.trained_size),
+        }
+
+    def load_state(self, state: dict) -> None:
+        if "ivf_centroids" not in state:
+            return
+        self.centroids = np.asarray(state["ivf_centroids"], dtype=np.float32)
+        self.trained_size = int(state["ivf_trained_size"])
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._arrays = [None for _ in range(len(self.centroids))]
+        for row, bucket in enumerate(np.asarray(state["ivf_assign"]).tolist()):
+            self._lists[bucket].append(row)
+
+
+__all__ = ["IVFIndex", "spherical_kmeans"]
@@ -3,64 +3,88 @@
 from __future__ import annotations
 
 import hashlib
-import math
-import random
-from typing import Iterable, List
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
 
-from .types import Coalition
-
-
-def _embedding(text: str) -> List[float]:
-    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
-    rng = random.Random(seed)
-    return [rng.uniform(-1.0, 1.0) for _ in range(32)]
+import numpy as np
 
-
-def _novelty(candidate: Coalition, ws_state: Iterable[Coalition]) -> float:
-    if not ws_state:
-        return 1.0
-    cand_vec = _embedding(candidate.summary)
-    sims = []
-    for coalition in ws_state:
-        vec = _embedding(coalition.summary)
-        sims.append(_cosine(cand_vec, vec))
-    if not sims:
-        return 1.0
-    avg_sim = sum(sims) / len(sims)
-    return max(0.1, 1.0 - avg_sim)
+from .embeddings import EmbeddingService, default_embeddings
+from .types import Coalition
 
 
-def _tie_break(value: float, text: str, seed: int = 0) -> float:
+def _jitter(text: str, seed: int = 0) -> float:
     digest = hashlib.md5((text + str(seed)).encode("utf-8")).digest()
-    jitter = int.from_bytes(digest[:4], "big") / 2**32
-    return value + jitter * 1e-3
-
-
-def _cosine(a: List[float], b: List[float]) -> float:
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    return int.from_bytes(digest[:4], "big") / 2**32 * 1e-3
 
 
 class Attention:
-    """Implements salience competition with novelty and tie-breaking."""
-
-    def __init__(self, seed: int = 0) -> None:
+    """Implements salience competition with novelty and tie-breaking.
+
+    Each candidate scores ``bounded_salience * novelty`` where novelty is one
+    minus its mean cosine similarity to the workspace (floored at 0.1); a small
+    deterministic jitter breaks ties. Unit embeddings and jitter are cached per
+    summary so a tick costs one candidates x workspace matrix product.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        cache_size: int = 4096,
+        embeddings: EmbeddingService | None = None,
+    ) -> None:
         self.seed = seed
-
-    def select(self, candidates: List[Coalition], ws_state: List[Coalition]) -> Coalition:
+        self.embeddings = embeddings or default_embeddings()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._ws_state: Optional[Sequence[Coalition]] = None
+        self._ws_matrix: Optional[np.ndarray] = None
+
+    def _features(self, summary: str) -> Tuple[np.ndarray, float]:
+        cached = self._cache.get(summary)
+        if cached is not None:
+            self._cache.move_to_end(summary)
+            return cached
+        vector = self.embeddings.embed_one(summary)
+        norm = float(np.linalg.norm(vector))
+        unit = vector / norm if norm else vector
+        cached = (unit, _jitter(summary, self.seed))
+        self._cache[summary] = cached
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return cached
+
+    def _workspace_matrix(self, ws_state: Sequence[Coalition]) -> np.ndarray:
+        # Workspace snapshots are shared between calls until the workspace
+        # changes, so identity is enough to reuse the previous matrix.
+        if ws_state is not self._ws_state or self._ws_matrix is None:
+            self._ws_matrix = np.stack([self._features(c.summary)[0] for c in ws_state])
+            self._ws_state = ws_state
+        return self._ws_matrix
+
+    def scores(self, candidates: Sequence[Coalition], ws_state: Sequence[Coalition]) -> np.ndarray:
+        """Return the salience x novelty score of every candidate."""
+
+        salience = np.fromiter(
+            (c.bounded_salience for c in candidates), dtype=np.float64, count=len(candidates)
+        )
+        if not ws_state:
+            return salience
+        cand = np.stack([self._features(c.summary)[0] for c in candidates])
+        similarity = cand @ self._workspace_matrix(ws_state).T
+        novelty = np.maximum(0.1, 1.0 - similarity.mean(axis=1))
+        return salience * novelty
+
+    def select(self, candidates: List[Coalition], ws_state: Sequence[Coalition]) -> Coalition:
         if not candidates:
             raise ValueError("No candidates to select from")
-        scored = []
-        for coalition in candidates:
-            novelty = _novelty(coalition, ws_state)
-            score = coalition.bounded_salience * novelty
-            scored.append((score, coalition))
-        scored.sort(key=lambda item: _tie_break(item[0], item[1].summary, self.seed), reverse=True)
-        return scored[0][1]
+        jitter = np.fromiter(
+            (self._features(c.summary)[1] for c in candidates),
+            dtype=np.float64,
+            count=len(candidates),
+        )
+        keys = self.scores(candidates, ws_state) + jitter
+        # argmax returns the first maximum, matching the stable sort it replaces.
+        return candidates[int(np.argmax(keys))]
 
 
 __all__ = ["Attention"]
@@ -2,7 +2,34 @@
 
 from __future__ import annotations
 
-from typing import Protocol
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Protocol, Sequence
+
+
+@dataclass(frozen=True, slots=True)
+class GenerateRequest:
+    """Arguments of a single ``generate`` call, batchable across processes."""
+
+    prompt: str
+    system: str | None = None
+    temperature: float = 0.2
+    max_tokens: int = 512
+
+    def as_kwargs(self) -> dict[str, Any]:
+        return {
+            "prompt": self.prompt,
+            "system": self.system,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    def fingerprint(self) -> str:
+        """Stable content hash of the request."""
+
+        material = json.dumps(self.as_kwargs(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
 
 class LLMBackend(Protocol):
@@ -19,11 +46,40 @@ class LLMBackend(Protocol):
     ) -> dict:
         """Return a structured response."""
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        """Async counterpart of :meth:`generate`."""
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> list[dict]:
+        """Return one structured response per request, in request order."""
+
     def embed(self, texts: list[str]) -> list[list[float]]:
         """Return deterministic embeddings for the provided texts."""
 
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        """Async counterpart of :meth:`embed`."""
+
     def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
         """Estimate cost of a call (USD)."""
 
 
-__all__ = ["LLMBackend"]
+def generate_batch(backend: LLMBackend, requests: Sequence[GenerateRequest]) -> list[dict]:
+    """Send ``requests`` through ``backend.generate_batch`` when available.
+
+    Backends predating the batch API are called once per request instead.
+    """
+
+    if not requests:
+        return []
+    batch = getattr(backend, "generate_batch", None)
+    if batch is None:
+        return [backend.generate(**request.as_kwargs()) for request in requests]
+    return list(batch(requests))
+
+
+__all__ = ["GenerateRequest", "LLMBackend", "generate_batch"]
@@ -0,0 +1,248 @@
+"""Content-addressed response cache wrapping another backend."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+
+from .base import GenerateRequest, LLMBackend, generate_batch
+
+
+def _model_id(backend: Any) -> str:
+    model = getattr(backend, "model", None)
+    if model is not None:
+        return str(model)
+    seed = getattr(backend, "seed", None)
+    return "" if seed is None else f"seed={seed}"
+
+
+class CachingBackend:
+    """Serve repeated ``generate`` calls from an LRU backed by SQLite.
+
+    Entries are keyed on backend name, model, system prompt, prompt,
+    temperature and ``max_tokens``. ``max_entries`` bounds the on-disk store
+    (least recently used rows go first) and ``max_age`` expires entries older
+    than the given number of seconds. Without ``path`` only the in-memory LRU
+    is used.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        path: str | Path | None = None,
+        *,
+        memory_items: int = 1024,
+        max_entries: Optional[int] = 100_000,
+        max_age: Optional[float] = None,
+    ) -> None:
+        self.backend = backend
+        self.name = getattr(backend, "name", "unknown")
+        self.model = _model_id(backend)
+        self.memory_items = max(0, memory_items)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows = 0
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            # WAL and a busy timeout let battery workers share one cache file.
+            self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)"
+            )
+            self._conn.commit()
+            self.prune()
+
+    def key(
+        self,
+        prompt: str,
+        system: str | None,
+        temperature: float | None,
+        max_tokens: int,
+    ) -> str:
+        material = json.dumps(
+            [self.name, self.model, system, prompt, temperature, max_tokens],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def generate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        key = self.key(prompt, system, temperature, max_tokens)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        resp = self.backend.generate(
+            prompt=prompt, system=system, temperature=temperature, max_tokens=max_tokens
+        )
+        self._put(key, resp)
+        return resp
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        key = self.key(prompt, system, temperature, max_tokens)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        agenerate = getattr(self.backend, "agenerate", None)
+        if agenerate is not None:
+            resp = await agenerate(
+                prompt=prompt, system=system, temperature=temperature, max_tokens=max_tokens
+            )
+        else:
+            resp = self.backend.generate(
+                prompt=prompt, system=system, temperature=temperature, max_tokens=max_tokens
+            )
+        self._put(key, resp)
+        return resp
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> List[dict]:
+        keys = [
+            self.key(req.prompt, req.system, req.temperature, req.max_tokens) for req in requests
+        ]
+        results: List[Optional[dict]] = [self._get(key) for key in keys]
+        missing = [idx for idx, resp in enumerate(results) if resp is None]
+        fetched = generate_batch(self.backend, [requests[idx] for idx in missing])
+        for idx, resp in zip(missing, fetched):
+            self._put(keys[idx], resp)
+            results[idx] = resp
+        return cast(List[dict], results)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.backend.embed(texts)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        aembed = getattr(self.backend, "aembed", None)
+        if aembed is None:
+            return self.backend.embed(texts)
+        return await aembed(texts)
+
+    def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
+        return self.backend.cost_estimator(tokens_in, tokens_out)
+
+    def stats(self) -> Dict[str, float]:
+        """Return cumulative hit/miss counters for trace metrics."""
+
+        return {"cache_hits": float(self.hits), "cache_misses": float(self.misses)}
+
+    def prune(self) -> None:
+        """Drop expired rows and trim the store to ``max_entries``."""
+
+        if self._conn is None:
+            return
+        with self._lock:
+            if self.max_age is not None:
+                cutoff = time.time() - self.max_age
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            if self.max_entries is not None:
+                self._trim(self.max_entries)
+            self._rows = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.commit()
+                self._conn.close()
+            self._conn = None
+        close = getattr(self.backend, "close", None)
+        if callable(close):
+            close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.max_age is not None and now - created_at > self.max_age
+
+    def _get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and self._expired(entry[1], now):
+                del self._lru[key]
+                entry = None
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[1], now):
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+                # Never hold the write lock between calls; other processes share the file.
+                self._conn.commit()
+            if entry is None:
+                self.misses += 1
+                return None
+            if key in self._lru:
+                self._lru.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[0])
+
+    def _put(self, key: str, resp: dict) -> None:
+        payload = json.dumps(resp, sort_keys=True)
+        now = time.time()
+        with self._lock:
+            self._remember(key, (payload, now))
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, payload, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._rows += 1
+            # Trim with some slack so eviction cost is amortised over many inserts.
+            if self.max_entries is not None and self._rows > self.max_entries * 1.1:
+                self._trim(self.max_entries)
+                self._rows = self.max_entries
+            self._conn.commit()
+
+    def _trim(self, keep: int) -> None:
+        assert self._conn is not None
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (keep,),
+        )
+
+    def _remember(self, key: str, entry: Tuple[str, float]) -> None:
+        if self.memory_items == 0:
+            return
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+
+__all__ = ["CachingBackend"]
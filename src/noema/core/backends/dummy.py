@@ -5,9 +5,9 @@ from __future__ import annotations
 import hashlib
 import json
 import random
-from typing import List
+from typing import List, Sequence
 
-from .base import LLMBackend
+from .base import GenerateRequest, LLMBackend
 
 
 class DummyBackend:
@@ -25,12 +25,27 @@ class DummyBackend:
         temperature: float = 0.2,
         max_tokens: int = 256,
     ) -> dict:
+        return self._respond(prompt, system)
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> List[dict]:
+        return [self._respond(req.prompt, req.system) for req in requests]
+
+    def _respond(self, prompt: str, system: str | None) -> dict:
         digest = hashlib.sha256((prompt + (system or "") + str(self.seed)).encode()).hexdigest()
         conf = (int(digest[:4], 16) % 100) / 100
         rationale = f"deterministic rationale {digest[4:20]}"
         text = self._summarise(prompt)
         return {"text": text, "confidence": conf / 100 + 0.5, "rationale_short": rationale[:120]}
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 256,
+    ) -> dict:
+        return self.generate(prompt, system=system, temperature=temperature, max_tokens=max_tokens)
+
     def _summarise(self, prompt: str) -> str:
         try:
             data = json.loads(prompt)
@@ -54,6 +69,9 @@ class DummyBackend:
             embeddings.append([rng.uniform(-1.0, 1.0) for _ in range(32)])
         return embeddings
 
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed(texts)
+
     def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
         return 0.0
 
@@ -3,14 +3,15 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
 
 try:
-    from openai import BadRequestError, OpenAI
+    from openai import AsyncOpenAI, BadRequestError, OpenAI
 except ImportError as exc:  # pragma: no cover - optional dependency
     raise ImportError("openai extra required: pip install noema[openai]") from exc
 
-from .base import LLMBackend
+from .base import GenerateRequest, LLMBackend
 
 
 class OpenAIBackend:
@@ -22,6 +23,7 @@ class OpenAIBackend:
         temperature: float = 0.2,
         api_key: str | None = None,
         base_url: str | None = None,
+        batch_concurrency: int = 8,
     ) -> None:
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -31,8 +33,12 @@ class OpenAIBackend:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        self._client_kwargs = client_kwargs
+        self._async_client: AsyncOpenAI | None = None
         self.model = model
         self.default_temperature = temperature
+        self.batch_concurrency = max(1, batch_concurrency)
+        self._pool: ThreadPoolExecutor | None = None
 
     def generate(
         self,
@@ -41,10 +47,7 @@ class OpenAIBackend:
         temperature: float | None = None,
         max_tokens: int = 512,
     ) -> dict:
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._messages(prompt, system)
         response_format = self._response_format()
         try:
             completion = self._create_completion(
@@ -71,6 +74,71 @@ class OpenAIBackend:
         content = completion.choices[0].message.content or "{}"
         return self._ensure_json(content)
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float | None = None,
+        max_tokens: int = 512,
+    ) -> dict:
+        messages = self._messages(prompt, system)
+        response_format = self._response_format()
+        client = self._aclient()
+        try:
+            completion = await client.chat.completions.create(
+                **self._completion_kwargs(messages, temperature, max_tokens, response_format)
+            )
+        except BadRequestError as exc:  # pragma: no cover - network
+            if "response_format" in str(exc).lower() and response_format.get("type") != "text":
+                try:
+                    completion = await client.chat.completions.create(
+                        **self._completion_kwargs(
+                            messages, temperature, max_tokens, {"type": "text"}
+                        )
+                    )
+                except Exception as fallback_exc:  # pragma: no cover - network
+                    raise RuntimeError(f"OpenAI error: {fallback_exc}") from fallback_exc
+            else:
+                raise RuntimeError(f"OpenAI error: {exc}") from exc
+        except Exception as exc:  # pragma: no cover - network
+            raise RuntimeError(f"OpenAI error: {exc}") from exc
+        content = completion.choices[0].message.content or "{}"
+        return self._ensure_json(content)
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> List[dict]:
+        """Answer several prompts at once, preserving request order.
+
+        Requests are pipelined over the client's shared connection pool by a
+        worker pool that lives until :meth:`close`.
+        """
+
+        if not requests:
+            return []
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.batch_concurrency, thread_name_prefix="noema-openai"
+            )
+        return list(self._pool.map(lambda req: self.generate(**req.as_kwargs()), requests))
+
+    def close(self) -> None:
+        """Shut down the batch worker pool."""
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _aclient(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(**self._client_kwargs)
+        return self._async_client
+
+    def _messages(self, prompt: str, system: str | None) -> list[dict[str, str]]:
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
     def _ensure_json(self, payload: str) -> dict:
         import json
 
@@ -107,18 +175,38 @@ class OpenAIBackend:
         response_format: dict,
     ):
         return self.client.chat.completions.create(
-            model=self.model,
-            temperature=temperature if temperature is not None else self.default_temperature,
-            response_format=response_format,
-            max_tokens=max_tokens,
-            messages=messages,
+            **self._completion_kwargs(messages, temperature, max_tokens, response_format)
         )
 
+    def _completion_kwargs(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float | None,
+        max_tokens: int,
+        response_format: dict,
+    ) -> dict:
+        return {
+            "model": self.model,
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            "response_format": response_format,
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+
     def embed(self, texts: List[str]) -> List[List[float]]:
         try:
             response = self.client.embeddings.create(model="text-embedding-3-small", input=texts)
         except Exception as exc:  # pragma: no cover - network
-            raise RuntimeError(f"OpenAI embed error: {exc}")
+            raise RuntimeError(f"OpenAI embed error: {exc}") from exc
+        return [list(item.embedding) for item in response.data]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        try:
+            response = await self._aclient().embeddings.create(
+                model="text-embedding-3-small", input=texts
+            )
+        except Exception as exc:  # pragma: no cover - network
+            raise RuntimeError(f"OpenAI embed error: {exc}") from exc
         return [list(item.embedding) for item in response.data]
 
     def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
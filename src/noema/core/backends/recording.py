@@ -0,0 +1,249 @@
+"""Record model calls during a run and replay them without the model."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, cast
+
+from .base import GenerateRequest, LLMBackend, generate_batch
+from .cache import _model_id
+
+
+def call_key(kind: str, request: Dict[str, Any]) -> str:
+    """Content hash identifying a ``generate`` or ``embed`` call."""
+
+    material = json.dumps([kind, request], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _generate_request(
+    prompt: str, system: str | None, temperature: float, max_tokens: int
+) -> Dict[str, Any]:
+    return {
+        "prompt": prompt,
+        "system": system,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+
+class RecordingBackend:
+    """Pass-through wrapper logging every ``generate``/``embed`` call.
+
+    Each call is stored as ``{"seq", "kind", "key", "request", "response"}``
+    in call order; batched requests are logged one call per request so a
+    recording replays under either proposal mode. Bundles opened on a loop
+    driving this backend pick the calls up via :meth:`drain_calls` as each
+    trace segment is written; drained calls are released, so ``calls`` only
+    holds those not yet drained while ``recorded`` counts every call.
+    """
+
+    def __init__(self, backend: LLMBackend) -> None:
+        self.backend = backend
+        self.name = getattr(backend, "name", "unknown")
+        self.model = _model_id(backend)
+        self.calls: List[Dict[str, Any]] = []
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def _record(self, kind: str, request: Dict[str, Any], response: Any) -> None:
+        with self._lock:
+            self.calls.append(
+                {
+                    "seq": self.recorded,
+                    "kind": kind,
+                    "key": call_key(kind, request),
+                    "request": request,
+                    "response": copy.deepcopy(response),
+                }
+            )
+            self.recorded += 1
+
+    def drain_calls(self) -> List[Dict[str, Any]]:
+        """Return the calls recorded since the previous drain."""
+
+        with self._lock:
+            fresh, self.calls = self.calls, []
+        return fresh
+
+    def generate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        request = _generate_request(prompt, system, temperature, max_tokens)
+        resp = self.backend.generate(**request)
+        self._record("generate", request, resp)
+        return resp
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        request = _generate_request(prompt, system, temperature, max_tokens)
+        agenerate = getattr(self.backend, "agenerate", None)
+        resp = await agenerate(**request) if agenerate else self.backend.generate(**request)
+        self._record("generate", request, resp)
+        return resp
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> List[dict]:
+        responses = generate_batch(self.backend, requests)
+        for req, resp in zip(requests, responses):
+            self._record("generate", req.as_kwargs(), resp)
+        return responses
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.backend.embed(texts)
+        self._record("embed", {"texts": list(texts)}, vectors)
+        return vectors
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        aembed = getattr(self.backend, "aembed", None)
+        vectors = await aembed(texts) if aembed else self.backend.embed(texts)
+        self._record("embed", {"texts": list(texts)}, vectors)
+        return vectors
+
+    def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
+        return self.backend.cost_estimator(tokens_in, tokens_out)
+
+    def stats(self) -> Dict[str, float]:
+        inner = getattr(self.backend, "stats", None)
+        return dict(inner()) if callable(inner) else {}
+
+    def close(self) -> None:
+        close = getattr(self.backend, "close", None)
+        if callable(close):
+            close()
+
+
+class ReplayDivergenceError(RuntimeError):
+    """A replayed run made a call that is not in the recording."""
+
+
+class ReplayBackend:
+    """Serve recorded responses so a run re-executes without the model.
+
+    Calls are matched by content hash; identical calls are served in the
+    order they were recorded, so replay is insensitive to the interleaving
+    of concurrent proposals. An unmatched call raises
+    :class:`ReplayDivergenceError` in strict mode; otherwise it falls through
+    to ``live``, the only backend that is then actually called.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        calls: Iterable[Dict[str, Any]],
+        *,
+        live: Optional[LLMBackend] = None,
+        strict: bool = True,
+    ) -> None:
+        if not strict and live is None:
+            raise ValueError("fallthrough replay requires a live backend")
+        self.live = live
+        self.strict = strict
+        self.replayed = 0
+        self.live_calls = 0
+        self._queues: Dict[str, Deque[Any]] = {}
+        for call in sorted(calls, key=lambda item: item["seq"]):
+            self._queues.setdefault(call["key"], deque()).append(call["response"])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bundle(cls, path: str | Path, **kwargs: Any) -> "ReplayBackend":
+        from ...artifacts.bundles import read_recording
+
+        return cls(read_recording(path), **kwargs)
+
+    @property
+    def remaining(self) -> int:
+        """Recorded calls not yet served."""
+
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _take(self, kind: str, request: Dict[str, Any]) -> Optional[Any]:
+        with self._lock:
+            queue = self._queues.get(call_key(kind, request))
+            if queue:
+                self.replayed += 1
+                return copy.deepcopy(queue.popleft())
+            if self.strict:
+                detail = request.get("prompt", request.get("texts"))
+                raise ReplayDivergenceError(
+                    f"no recorded {kind} call matches {str(detail)[:120]!r}"
+                )
+            self.live_calls += 1
+            return None
+
+    def generate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        request = _generate_request(prompt, system, temperature, max_tokens)
+        resp = self._take("generate", request)
+        if resp is None:
+            return cast(LLMBackend, self.live).generate(**request)
+        return resp
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+    ) -> dict:
+        request = _generate_request(prompt, system, temperature, max_tokens)
+        resp = self._take("generate", request)
+        if resp is None:
+            agenerate = getattr(self.live, "agenerate", None)
+            live = cast(LLMBackend, self.live)
+            return await agenerate(**request) if agenerate else live.generate(**request)
+        return resp
+
+    def generate_batch(self, requests: Sequence[GenerateRequest]) -> List[dict]:
+        results = [self._take("generate", req.as_kwargs()) for req in requests]
+        missing = [idx for idx, resp in enumerate(results) if resp is None]
+        if missing:
+            fetched = generate_batch(
+                cast(LLMBackend, self.live), [requests[idx] for idx in missing]
+            )
+            for idx, resp in zip(missing, fetched):
+                results[idx] = resp
+        return cast(List[dict], results)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._take("embed", {"texts": list(texts)})
+        if vectors is None:
+            return cast(LLMBackend, self.live).embed(texts)
+        return vectors
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._take("embed", {"texts": list(texts)})
+        if vectors is None:
+            aembed = getattr(self.live, "aembed", None)
+            live = cast(LLMBackend, self.live)
+            return await aembed(texts) if aembed else live.embed(texts)
+        return vectors
+
+    def cost_estimator(self, tokens_in: int, tokens_out: int) -> float:
+        return 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"replayed_calls": float(self.replayed), "live_calls": float(self.live_calls)}
+
+
+__all__ = ["RecordingBackend", "ReplayBackend", "ReplayDivergenceError", "call_key"]
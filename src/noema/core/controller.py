@@ -2,34 +2,82 @@
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, cast
+from typing import Dict, List, Optional, Sequence, Tuple, cast
 
 from ..instruments.metacog import MetacogTracker
 from ..instruments.narrative import NarrativeStream
+from ..tasks.evaluations import evaluation_embeddings
 from .attention import Attention
+from .backends.base import GenerateRequest, generate_batch
+from .embeddings import EmbeddingService, default_embeddings
 from .memory import (
     DuckDBEpisodic,
     EpisodicStore,
     InMemoryEpisodic,
+    IVFEpisodic,
     SqliteEpisodic,
     WorkingMemory,
 )
-from .processes import Critic, Perception, Planner, Process, Reflector, SelfModel
-from .types import Action, Broadcast, Coalition, ProcessName, RunConfig, TickTrace
+from .processes import (
+    Critic,
+    GenerativeProcess,
+    Perception,
+    Planner,
+    Process,
+    Reflector,
+    SelfModel,
+)
+from .scheduler import ProcessScheduler
+from .types import (
+    Action,
+    Broadcast,
+    Coalition,
+    ProcessName,
+    RunConfig,
+    ScheduleDecision,
+    TickTrace,
+)
 from .workspace import Workspace
 
+# Default in-memory episodic cap when streaming without ``episodic_max_items``.
+STREAMING_EPISODIC_ITEMS = 65_536
+
+
+def _hash_embeddings(config: RunConfig) -> EmbeddingService:
+    if config.embedding_cache_path:
+        return EmbeddingService(cache_path=config.embedding_cache_path)
+    return default_embeddings()
+
+
+def _backend_embeddings(backend, config: RunConfig) -> Optional[EmbeddingService]:
+    if callable(getattr(backend, "embed", None)):
+        return EmbeddingService(backend, cache_path=config.embedding_cache_path)
+    return None
 
-def _episodic_for_config(config: RunConfig) -> EpisodicStore:
+
+def _episodic_for_config(config: RunConfig, embeddings: EmbeddingService) -> EpisodicStore:
     if config.episodic_backend == "sqlite":
         if not config.episodic_path:
             raise ValueError("episodic_path required for sqlite backend")
-        return SqliteEpisodic(config.episodic_path)
+        return SqliteEpisodic(config.episodic_path, embeddings=embeddings)
     if config.episodic_backend == "duckdb":
         if not config.episodic_path:
             raise ValueError("episodic_path required for duckdb backend")
-        return DuckDBEpisodic(config.episodic_path)
-    return InMemoryEpisodic()
+        return DuckDBEpisodic(config.episodic_path, embeddings=embeddings)
+    if config.episodic_backend == "ivf":
+        return IVFEpisodic(
+            config.episodic_path,
+            nprobe=config.ann_nprobe,
+            nlist=config.ann_nlist,
+            embeddings=embeddings,
+        )
+    max_items = config.episodic_max_items
+    if max_items is None and config.streaming:
+        max_items = STREAMING_EPISODIC_ITEMS
+    return InMemoryEpisodic(embeddings, max_items=max_items)
 
 
 @dataclass
@@ -38,6 +86,31 @@ class ControllerState:
     last_broadcast: Optional[Broadcast] = None
 
 
+class ProposalMemo:
+    """Last proposals of each process, reused while its input fingerprint holds.
+
+    An entry stays valid for ``ttl[name]`` ticks after the tick that produced
+    it; processes without a positive TTL are never memoised.
+    """
+
+    def __init__(self, ttl: Dict[ProcessName, int]) -> None:
+        self.ttl = {name: int(value) for name, value in ttl.items() if value and value > 0}
+        self.reused = 0
+        self._entries: Dict[ProcessName, Tuple[str, int, List[Coalition]]] = {}
+
+    def lookup(self, name: ProcessName, fingerprint: str, tick: int) -> Optional[List[Coalition]]:
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != fingerprint or tick - entry[1] >= self.ttl[name]:
+            return None
+        self.reused += 1
+        return list(entry[2])
+
+    def store(
+        self, name: ProcessName, fingerprint: str, tick: int, proposals: List[Coalition]
+    ) -> None:
+        self._entries[name] = (fingerprint, tick, list(proposals))
+
+
 class Controller:
     """Coordinates processes within the global workspace loop."""
 
@@ -46,11 +119,32 @@ class Controller:
         self.config = config
         self.workspace = Workspace(capacity=config.workspace_capacity)
         self.working_memory = WorkingMemory(config.working_memory_items, config.working_memory_decay)
-        self.episodic = _episodic_for_config(config)
-        self.metacog = MetacogTracker()
-        self.narrative = NarrativeStream(redactions=config.redaction_rules)
-        self.attention = Attention(seed=config.seed)
+        # Attention always scores with deterministic hash vectors; evaluations
+        # embed through the backend when it can, episodic memory only on request.
+        self.embeddings = _hash_embeddings(config)
+        backend_embeddings = _backend_embeddings(backend, config)
+        self.eval_embeddings = (
+            evaluation_embeddings() if backend_embeddings is None else backend_embeddings
+        )
+        self.memory_embeddings = self.embeddings
+        if config.episodic_embeddings == "backend":
+            if backend_embeddings is None:
+                raise ValueError("episodic_embeddings='backend' requires a backend with embed()")
+            self.memory_embeddings = backend_embeddings
+        self.episodic = _episodic_for_config(config, self.memory_embeddings)
+        self.metacog = MetacogTracker(window=config.metacog_window)
+        narrative_cap = config.narrative_max_entries
+        if narrative_cap is None and config.streaming:
+            narrative_cap = config.trace_buffer
+        self.narrative = NarrativeStream(
+            redactions=config.redaction_rules, max_entries=narrative_cap
+        )
+        self.attention = Attention(seed=config.seed, embeddings=self.embeddings)
         self.state = ControllerState()
+        self.memo = ProposalMemo(config.proposal_ttl)
+        self._reused: List[ProcessName] = []
+        self._schedule: Dict[ProcessName, ScheduleDecision] = {}
+        self._executor: Optional[Executor] = None
         self.processes: Dict[ProcessName, Process] = {
             ProcessName.PERCEPTION: Perception(
                 backend=self.backend,
@@ -78,20 +172,193 @@ class Controller:
                 budget=config.process_budgets[ProcessName.CRITIC],
             ),
         }
+        self.scheduler: Optional[ProcessScheduler] = None
+        self._workspace_key: Optional[frozenset] = None
+        if config.adaptive_scheduling:
+            # Perception and the critic make no backend calls, so they always run.
+            scheduled = [
+                name
+                for name, process in self.processes.items()
+                if isinstance(process, GenerativeProcess)
+            ]
+            self.scheduler = ProcessScheduler.from_config(scheduled, config)
 
     def perception(self) -> Perception:
         return cast(Perception, self.processes[ProcessName.PERCEPTION])
 
+    def _proposal_executor(self) -> Optional[Executor]:
+        if self.config.proposal_workers <= 1:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.proposal_workers,
+                thread_name_prefix="noema-propose",
+            )
+        return self._executor
+
+    def _active_processes(self) -> Dict[ProcessName, Process]:
+        """Processes proposing this tick; all of them unless the scheduler backs some off."""
+
+        if self.scheduler is None:
+            self._schedule = {}
+            return dict(self.processes)
+        key = frozenset((c.source, c.summary) for c in self.workspace.state())
+        changed = self._workspace_key is not None and key != self._workspace_key
+        self._workspace_key = key
+        self._schedule = self.scheduler.plan(self.state.tick, changed)
+        return {
+            name: process
+            for name, process in self.processes.items()
+            if name not in self._schedule or self._schedule[name].run
+        }
+
+    def _memoised(
+        self,
+        active: Dict[ProcessName, Process],
+        workspace_state: Sequence[Coalition],
+        last: Optional[Broadcast],
+    ) -> Tuple[Dict[ProcessName, List[Coalition]], Dict[ProcessName, str]]:
+        """Split processes into memo hits and fingerprints of those that must run."""
+
+        hits: Dict[ProcessName, List[Coalition]] = {}
+        fingerprints: Dict[ProcessName, str] = {}
+        for name, process in active.items():
+            if name not in self.memo.ttl:
+                continue
+            fingerprint = process.fingerprint(workspace_state, self.working_memory, last)
+            if fingerprint is None:
+                continue
+            cached = self.memo.lookup(name, fingerprint, self.state.tick)
+            if cached is None:
+                fingerprints[name] = fingerprint
+            else:
+                hits[name] = cached
+        return hits, fingerprints
+
+    def _merge_memoised(
+        self,
+        hits: Dict[ProcessName, List[Coalition]],
+        fingerprints: Dict[ProcessName, str],
+        fresh: Dict[ProcessName, List[Coalition]],
+    ) -> Dict[ProcessName, List[Coalition]]:
+        for name, fingerprint in fingerprints.items():
+            self.memo.store(name, fingerprint, self.state.tick, fresh[name])
+        self._reused = list(hits)
+        return {
+            name: hits[name] if name in hits else fresh.get(name, []) for name in self.processes
+        }
+
+    def _collect_proposals(
+        self,
+        workspace_state: Sequence[Coalition],
+        last: Optional[Broadcast],
+    ) -> Dict[ProcessName, List[Coalition]]:
+        """Gather proposals from every process keyed in registration order.
+
+        Processes backed off by the adaptive scheduler propose nothing, and
+        those whose input fingerprint matches a live memo entry reuse their
+        previous proposals instead of running. With ``batch_generate`` the
+        prompts of the remaining generative processes go to the backend as one
+        batch. Otherwise, with ``proposal_workers > 1`` the ``propose`` calls
+        are issued concurrently. Either way results are merged in the order of
+        ``self.processes`` so attention sees exactly the same candidate list as
+        the serial path.
+        """
+
+        active = self._active_processes()
+        hits, fingerprints = self._memoised(active, workspace_state, last)
+        processes = {name: p for name, p in active.items() if name not in hits}
+        if self.config.batch_generate:
+            fresh = self._batched_proposals(processes, workspace_state, last)
+            return self._merge_memoised(hits, fingerprints, fresh)
+        executor = self._proposal_executor()
+        if executor is None:
+            fresh = {
+                name: process.propose(workspace_state, self.working_memory, last)
+                for name, process in processes.items()
+            }
+            return self._merge_memoised(hits, fingerprints, fresh)
+        futures = {
+            name: executor.submit(process.propose, workspace_state, self.working_memory, last)
+            for name, process in processes.items()
+        }
+        fresh = {name: future.result() for name, future in futures.items()}
+        return self._merge_memoised(hits, fingerprints, fresh)
+
+    def _batched_proposals(
+        self,
+        processes: Dict[ProcessName, Process],
+        workspace_state: Sequence[Coalition],
+        last: Optional[Broadcast],
+    ) -> Dict[ProcessName, List[Coalition]]:
+        proposals: Dict[ProcessName, List[Coalition]] = {}
+        requests: Dict[ProcessName, GenerateRequest] = {}
+        for name, process in processes.items():
+            if isinstance(process, GenerativeProcess) and process.backend is self.backend:
+                request = process.prepare(workspace_state, self.working_memory, last)
+                proposals[name] = []
+                if request is not None:
+                    requests[name] = request
+            else:
+                proposals[name] = process.propose(workspace_state, self.working_memory, last)
+        responses = generate_batch(self.backend, list(requests.values()))
+        for name, resp in zip(requests, responses):
+            process = cast(GenerativeProcess, self.processes[name])
+            proposals[name] = process.complete(resp)
+        return proposals
+
+    async def _acollect_proposals(
+        self,
+        workspace_state: Sequence[Coalition],
+        last: Optional[Broadcast],
+    ) -> Dict[ProcessName, List[Coalition]]:
+        active = self._active_processes()
+        hits, fingerprints = self._memoised(active, workspace_state, last)
+        names = [name for name in active if name not in hits]
+        results = await asyncio.gather(
+            *(
+                self.processes[name].apropose(workspace_state, self.working_memory, last)
+                for name in names
+            )
+        )
+        return self._merge_memoised(hits, fingerprints, dict(zip(names, results)))
+
+    def _embedding_services(self) -> Tuple[EmbeddingService, ...]:
+        return (self.embeddings, self.eval_embeddings, self.memory_embeddings)
+
+    def close(self) -> None:
+        """Release the proposal worker pool and flush the episodic store."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.episodic.close()
+        shared = {id(default_embeddings()), id(evaluation_embeddings())}
+        for service in {id(s): s for s in self._embedding_services()}.values():
+            if id(service) not in shared:
+                service.close()
+
     def tick(self) -> TickTrace:
         self.state.tick += 1
-        proposals: Dict[ProcessName, List[Coalition]] = {}
-        all_candidates: List[Coalition] = []
         workspace_state = self.workspace.state()
-        last = self.state.last_broadcast
+        proposals = self._collect_proposals(workspace_state, self.state.last_broadcast)
+        return self._resolve_tick(workspace_state, proposals)
+
+    async def atick(self) -> TickTrace:
+        """Async counterpart of :meth:`tick` awaiting all proposals concurrently."""
 
-        for name, process in self.processes.items():
-            candidate_list = process.propose(workspace_state, self.working_memory, last)
-            proposals[name] = candidate_list
+        self.state.tick += 1
+        workspace_state = self.workspace.state()
+        proposals = await self._acollect_proposals(workspace_state, self.state.last_broadcast)
+        return self._resolve_tick(workspace_state, proposals)
+
+    def _resolve_tick(
+        self,
+        workspace_state: Sequence[Coalition],
+        proposals: Dict[ProcessName, List[Coalition]],
+    ) -> TickTrace:
+        all_candidates: List[Coalition] = []
+        for candidate_list in proposals.values():
             all_candidates.extend(candidate_list)
 
         if not all_candidates:
@@ -111,8 +378,12 @@ class Controller:
         for process in self.processes.values():
             process.after_broadcast(broadcast, self.working_memory)
 
+        if self.scheduler is not None:
+            ran = [name for name, decision in self._schedule.items() if decision.run]
+            self.scheduler.observe(self.state.tick, ran, proposals, selected.source)
+
         actual = 1.0 if selected.confidence > 0.5 else 0.0
-        self.metacog.observe(selected.confidence, actual)
+        self.metacog.observe(selected.confidence, actual, source=selected.source)
         self.narrative.append(f"Tick {self.state.tick}: {selected.summary}")
 
         actions = []
@@ -124,16 +395,25 @@ class Controller:
 
         metrics = self.metacog.metrics()
         metrics_with_actual = {**metrics, "actual": actual}
+        if self.memo.ttl:
+            metrics_with_actual["proposals_reused"] = float(len(self._reused))
+        backend_stats = getattr(self.backend, "stats", None)
+        if callable(backend_stats):
+            metrics_with_actual.update(backend_stats())
+        interval = max(1, self.config.workspace_keyframe_interval)
+        keyframe = (self.state.tick - 1) % interval == 0
         trace = TickTrace(
             tick=self.state.tick,
             broadcast=broadcast,
-            workspace_state=self.workspace.state(),
+            workspace_state=self.workspace.state() if keyframe else None,
             processes_considered=proposals,
             action=chosen_action,
             metrics=metrics_with_actual,
+            workspace_delta=self.workspace.take_delta(keyframe=keyframe),
+            schedule=self._schedule,
         )
         self.state.last_broadcast = broadcast
         return trace
 
 
-__all__ = ["Controller", "ControllerState"]
+__all__ = ["Controller", "ControllerState", "ProposalMemo"]
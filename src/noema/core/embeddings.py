@@ -0,0 +1,188 @@
+"""Shared embedding service used by attention, memory and evaluations."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+HASH_DIM = 32
+
+
+def hash_embedding(text: str, dim: int = HASH_DIM) -> List[float]:
+    """Deterministic pseudo-embedding seeded from SHA-256 of ``text``.
+
+    Unlike ``hash()``, the seed does not depend on the interpreter's hash
+    salt, so every process produces the same vector for the same text.
+    """
+
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+
+class EmbeddingService:
+    """Batched, content-addressed embedding lookups.
+
+    Without a backend, vectors come from :func:`hash_embedding`. With one,
+    cache misses are deduplicated and sent to ``backend.embed`` in chunks of
+    ``batch_size``; texts longer than ``max_chars`` are split, embedded piece
+    by piece and averaged by length. Results are memoised in an in-memory LRU
+    and, with ``cache_path``, in a SQLite file keyed by a SHA-256 of the
+    namespace and text so several processes can share it.
+    """
+
+    def __init__(
+        self,
+        backend: Any = None,
+        cache_path: str | Path | None = None,
+        *,
+        batch_size: int = 256,
+        max_chars: int = 8000,
+        memory_items: int = 8192,
+    ) -> None:
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_chars = max(1, max_chars)
+        self.memory_items = memory_items
+        self.cache_path = str(cache_path) if cache_path is not None else None
+        self._dim: Optional[int] = HASH_DIM if backend is None else None
+        if backend is None:
+            self.namespace = f"hash-{HASH_DIM}"
+        else:
+            model = getattr(backend, "model", None) or getattr(backend, "seed", "")
+            self.namespace = f"{getattr(backend, 'name', 'backend')}:{model}"
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if cache_path is not None:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(cache_path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @property
+    def dim(self) -> int:
+        """Vector width; a backend's is probed with one embedding on first use."""
+
+        if self._dim is None:
+            self._dim = int(self.embed_one("dimension probe").shape[0])
+        return self._dim
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode()).hexdigest()
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), dim)`` float64 array of embeddings."""
+
+        if not texts:
+            return np.empty((0, HASH_DIM if self.backend is None else 0))
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing and self._conn is not None:
+            found.update(self._load(list(missing)))
+            missing = {key: text for key, text in missing.items() if key not in found}
+        if missing:
+            computed = self._compute(list(missing.values()))
+            fresh = dict(zip(missing, computed))
+            self._store(fresh)
+            found.update(fresh)
+        with self._lock:
+            for key in keys:
+                self._remember(key, found[key])
+        return np.stack([found[key] for key in keys])
+
+    def _compute(self, texts: List[str]) -> List[np.ndarray]:
+        if self.backend is None:
+            return [np.asarray(hash_embedding(text), dtype=np.float64) for text in texts]
+        pieces: List[str] = []
+        owners: List[int] = []
+        for idx, text in enumerate(texts):
+            chunks = [text[i : i + self.max_chars] for i in range(0, len(text), self.max_chars)]
+            for chunk in chunks or [""]:
+                pieces.append(chunk)
+                owners.append(idx)
+        vectors: List[List[float]] = []
+        for start in range(0, len(pieces), self.batch_size):
+            vectors.extend(self.backend.embed(pieces[start : start + self.batch_size]))
+        matrix = np.asarray(vectors, dtype=np.float64)
+        weights = np.asarray([max(1, len(piece)) for piece in pieces], dtype=np.float64)
+        owner_idx = np.asarray(owners)
+        sums = np.zeros((len(texts), matrix.shape[1]))
+        np.add.at(sums, owner_idx, matrix * weights[:, None])
+        totals = np.bincount(owner_idx, weights=weights, minlength=len(texts))
+        return list(sums / totals[:, None])
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        assert self._conn is not None
+        loaded: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                marks = ",".join("?" for _ in chunk)
+                sql = f"SELECT key, vector FROM embeddings WHERE key IN ({marks})"  # noqa: S608
+                rows = self._conn.execute(sql, chunk).fetchall()
+                for key, blob in rows:
+                    loaded[key] = np.frombuffer(blob, dtype=np.float64)
+        return loaded
+
+    def _store(self, vectors: Dict[str, np.ndarray]) -> None:
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings(key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float64).tobytes())
+                    for key, vector in vectors.items()
+                ],
+            )
+            self._conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.memory_items <= 0:
+            return
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+_DEFAULT: Optional[EmbeddingService] = None
+
+
+def default_embeddings() -> EmbeddingService:
+    """Process-wide hash embedding service used when none is configured."""
+
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = EmbeddingService()
+    return _DEFAULT
+
+
+__all__ = ["EmbeddingService", "HASH_DIM", "default_embeddings", "hash_embedding"]
@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Deque, Iterable, List
+from typing import Any, Deque, Iterable, List, MutableSequence, Optional
 
 import yaml
 
-from ..artifacts import bundles
+from ..artifacts import bundles, checkpoints
+from ..artifacts.traces import TraceSpill
 from ..core.backends.base import LLMBackend
-from ..tasks.evaluations import EvalReport
+from ..tasks.evaluations import EvalReport, IncrementalEvaluator
 from .controller import Controller
 from .types import Action, Broadcast, Percept, ProcessName, RunConfig, TickTrace
 
@@ -50,18 +52,35 @@ def _load_config(config: RunConfig | str | Path) -> RunConfig:
         data["process_budgets"] = {ProcessName(k): v for k, v in data["process_budgets"].items()}
     if "process_temperature" in data:
         data["process_temperature"] = {ProcessName(k): v for k, v in data["process_temperature"].items()}
+    if "proposal_ttl" in data:
+        data["proposal_ttl"] = {ProcessName(k): v for k, v in data["proposal_ttl"].items()}
     return RunConfig.model_validate(data)
 
 
 class ConsciousLoop:
-    """Public API for running the Noema control loop."""
+    """Public API for running the Noema control loop.
+
+    Evaluation metrics are accumulated tick by tick in ``evaluator``, so
+    :meth:`eval` is O(1). With ``config.streaming`` the loop also runs in
+    constant memory: ``traces`` is a ring of the last ``trace_buffer`` ticks,
+    evicted traces are appended to ``trace_spill_path`` (when set) and the
+    narrative and in-memory episodic stores are capped.
+    """
 
     def __init__(self, backend: LLMBackend, config: RunConfig | str | Path) -> None:
         self.config = _load_config(config)
         self.backend = backend
         self.controller = Controller(backend, self.config)
         self._percepts: Deque[Percept] = deque()
-        self.traces: list[TickTrace] = []
+        self.traces: MutableSequence[TickTrace] = []
+        self.evaluator = IncrementalEvaluator(self.controller.eval_embeddings)
+        self._spill: Optional[TraceSpill] = None
+        self._bundle: Optional[bundles.BundleWriter] = None
+        self._async_lock: Optional[asyncio.Lock] = None
+        if self.config.streaming:
+            self.traces = deque(maxlen=max(1, self.config.trace_buffer))
+            if self.config.trace_spill_path:
+                self._spill = TraceSpill(self.config.trace_spill_path)
 
     @property
     def tick_id(self) -> int:
@@ -86,9 +105,35 @@ class ConsciousLoop:
 
     def tick(self) -> TickTrace:
         trace = self.controller.tick()
-        self.traces.append(trace)
+        self._record(trace)
+        return trace
+
+    async def atick(self) -> TickTrace:
+        """Async counterpart of :meth:`tick`; serialised with other async steps."""
+
+        async with self._step_lock():
+            return await self._atick()
+
+    async def _atick(self) -> TickTrace:
+        trace = await self.controller.atick()
+        self._record(trace)
         return trace
 
+    def _step_lock(self) -> asyncio.Lock:
+        # Created lazily so the loop stays picklable and binds to the running event loop.
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def _record(self, trace: TickTrace) -> None:
+        traces = self.traces
+        if isinstance(traces, deque) and len(traces) == traces.maxlen and self._spill is not None:
+            self._spill.append(traces[0])
+        traces.append(trace)
+        self.evaluator.observe(trace)
+        if self._bundle is not None:
+            self._bundle.append(trace)
+
     def run_workflow(
         self,
         percept: Percept | None = None,
@@ -106,6 +151,33 @@ class ConsciousLoop:
             ``config.workflow_ticks`` with at least one tick per pending percept.
         """
 
+        pending, planned_ticks = self._begin_workflow(percept, ticks)
+        traces = [self.tick() for _ in range(planned_ticks)]
+        return self._finish_workflow(pending, traces)
+
+    async def arun_workflow(
+        self,
+        percept: Percept | None = None,
+        *,
+        ticks: int | None = None,
+    ) -> WorkflowResult:
+        """Async counterpart of :meth:`run_workflow`.
+
+        Each tick awaits its process proposals concurrently, so a single event
+        loop can drive many loops without dedicating a thread to each.
+        Concurrent calls on the same loop run one workflow at a time.
+        """
+
+        async with self._step_lock():
+            pending, planned_ticks = self._begin_workflow(percept, ticks)
+            traces = [await self._atick() for _ in range(planned_ticks)]
+            return self._finish_workflow(pending, traces)
+
+    def _begin_workflow(
+        self,
+        percept: Percept | None,
+        ticks: int | None,
+    ) -> tuple[list[Percept], int]:
         if percept is not None:
             self.ingest(percept)
 
@@ -115,16 +187,12 @@ class ConsciousLoop:
         planned_ticks = ticks if ticks is not None else self.config.workflow_ticks
         planned_ticks = max(planned_ticks, len(pending))
         planned_ticks = max(planned_ticks, 1)
+        return pending, planned_ticks
 
-        traces: list[TickTrace] = []
-        actions: list[Action] = []
-
-        for _ in range(planned_ticks):
-            trace = self.tick()
-            traces.append(trace)
-            if trace.action and trace.action.kind != "none":
-                actions.append(trace.action)
-
+    def _finish_workflow(self, pending: list[Percept], traces: list[TickTrace]) -> WorkflowResult:
+        actions = [
+            trace.action for trace in traces if trace.action and trace.action.kind != "none"
+        ]
         chosen = max(actions, key=lambda action: action.confidence, default=Action())
         narrative = self.controller.narrative.last(self.config.workflow_narrative_window)
 
@@ -135,18 +203,76 @@ class ConsciousLoop:
             narrative=narrative,
         )
 
+    def close(self) -> None:
+        """Release resources held by the controller (workers, episodic store).
+
+        An attached bundle is finalised with the run's evaluation report. In
+        streaming mode the traces still buffered in RAM are appended to the
+        spill file first, so it then holds the complete run.
+        """
+
+        if self._bundle is not None:
+            self._bundle.close(report=self.eval())
+            self._bundle = None
+        if self._spill is not None:
+            for trace in self.traces:
+                self._spill.append(trace)
+            self._spill.close()
+            self._spill = None
+        self.controller.close()
+
     def act(self) -> Action:
         if not self.traces:
             return Action()
         return self.traces[-1].action or Action()
 
     def eval(self) -> EvalReport:
-        from ..tasks.evaluations import aggregate_from_traces
+        """Snapshot of the running evaluation metrics."""
 
-        return aggregate_from_traces(self.traces)
+        return self.evaluator.report()
 
     def save_bundle(self, path: str | Path) -> str:
         return bundles.create_bundle(path, self)
 
+    def checkpoint(self, path: str | Path, task: Any = None) -> str:
+        """Write a binary snapshot of the loop (and optionally its task) to ``path``.
+
+        See :mod:`noema.artifacts.checkpoints` for what is stored by reference.
+        """
+
+        return checkpoints.save_checkpoint(path, self, task)
+
+    @classmethod
+    def restore(
+        cls, path: str | Path, backend: LLMBackend, *, episodic_path: str | Path | None = None
+    ) -> checkpoints.Restored:
+        """Load ``(loop, task)`` from a checkpoint, continuing with ``backend``.
+
+        A disk-backed episodic store is restored into ``episodic_path``.
+        """
+
+        return checkpoints.load_checkpoint(path, backend, episodic_path=episodic_path)
+
+    def fork(self, backend: Optional[LLMBackend] = None) -> "ConsciousLoop":
+        """Cheap in-memory clone that continues independently from this tick.
+
+        Use :func:`noema.artifacts.checkpoints.fork_loop` to fork a task too.
+        """
+
+        return checkpoints.fork_loop(self, backend=backend).loop
+
+    def open_bundle(self, path: str | Path, **kwargs) -> bundles.BundleWriter:
+        """Stream every subsequent trace into a bundle at ``path``.
+
+        Traces are written in compressed segments while the run executes;
+        :meth:`close` finalises the manifest and report. Keyword arguments go
+        to :class:`~noema.artifacts.bundles.BundleWriter`.
+        """
+
+        if self._bundle is not None:
+            raise RuntimeError("a bundle is already attached to this loop")
+        self._bundle = bundles.writer_for_loop(path, self, **kwargs)
+        return self._bundle
+
 
 __all__ = ["ConsciousLoop", "WorkflowResult"]
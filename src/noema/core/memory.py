@@ -2,18 +2,26 @@
 
 from __future__ import annotations
 
-import math
+import copy
 import json
-import random
+import math
 import sqlite3
+import tempfile
 import time
+import weakref
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import List, Sequence, Tuple, cast
 
+import numpy as np
+
+from .ann import IVFIndex
+from .embeddings import HASH_DIM, EmbeddingService, default_embeddings
 from .types import Coalition
 
+EMBEDDING_DIM = HASH_DIM
+
 
 @dataclass
 class WorkingMemoryEntry:
@@ -67,92 +75,544 @@ class EpisodicStore(ABC):
     def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
         raise NotImplementedError
 
+    def search_many(
+        self, queries: Sequence[str], limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Answer several queries; stores override this with a batched path."""
+
+        return [self.search(query, limit) for query in queries]
+
+    def close(self) -> None:  # noqa: B027 - optional hook; in-memory stores hold nothing
+        """Flush pending state and release resources."""
+
+    def __enter__(self) -> "EpisodicStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def fork(self) -> "EpisodicStore":
+        """Independent copy sharing unchanged data with this store."""
+
+        raise NotImplementedError(f"{type(self).__name__} cannot be forked")
+
+
+class EmbeddingMatrix:
+    """Growable contiguous float32 matrix of unit-normalised embeddings.
+
+    Rows are appended in amortised O(1) by doubling the backing buffer, and
+    :meth:`top_k` scores every row against a batch of queries with one matrix
+    product followed by ``argpartition``. :meth:`fork` is copy-on-write: the
+    buffer is shared until either side next writes to it.
+    """
+
+    def __init__(self, dim: int | None = None, capacity: int = 256) -> None:
+        self.dim = dim
+        self._data = np.empty((max(1, capacity), dim or 0), dtype=np.float32)
+        self.size = 0
+        self._shared = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._data[: self.size]
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self._data) and not self._shared:
+            return
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        grown[: self.size] = self._data[: self.size]
+        self._data = grown
+        self._shared = False
+
+    def fork(self) -> "EmbeddingMatrix":
+        clone = EmbeddingMatrix.__new__(EmbeddingMatrix)
+        clone.dim = self.dim
+        clone._data = self._data
+        clone.size = self.size
+        clone._shared = self._shared = True
+        return clone
+
+    def extend(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[-1]
+            self._data = np.empty((len(self._data), self.dim), dtype=np.float32)
+        vectors = _normalise(vectors.reshape(-1, self.dim))
+        self._reserve(len(vectors))
+        self._data[self.size : self.size + len(vectors)] = vectors
+        self.size += len(vectors)
+
+    def append(self, vector: Sequence[float] | np.ndarray) -> None:
+        self.extend(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def assign(self, row: int, vector: Sequence[float] | np.ndarray) -> None:
+        """Overwrite an existing row in place."""
+
+        if not 0 <= row < self.size:
+            raise IndexError(row)
+        self._reserve(0)
+        self._data[row] = _normalise(np.asarray(vector, dtype=np.float32).reshape(1, self.dim))[0]
+
+    def top_k(self, queries: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indices, scores)`` of the ``limit`` best rows per query.
+
+        Both arrays have shape ``(len(queries), min(limit, size))`` and are
+        ordered by descending score, ties broken by insertion order.
+        """
+
+        k = min(limit, self.size)
+        if k <= 0:
+            empty = np.empty((len(np.atleast_2d(queries)), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        queries = _normalise(np.asarray(queries, dtype=np.float32).reshape(-1, self.dim))
+        scores = queries @ self.rows.T
+        if k < self.size:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(self.size), scores.shape)
+        picked = np.take_along_axis(scores, candidates, axis=1)
+        order = np.lexsort((candidates, -picked), axis=1)
+        indices = np.take_along_axis(candidates, order, axis=1)
+        return indices, np.take_along_axis(picked, order, axis=1)
+
 
 class InMemoryEpisodic(EpisodicStore):
-    def __init__(self) -> None:
-        self._items: List[Tuple[str, List[float]]] = []
+    """Episodic store keeping texts beside an :class:`EmbeddingMatrix`.
+
+    With ``max_items`` the store is a ring: once full, each add overwrites
+    the oldest episode, so memory stays fixed however long the run. Equal
+    scores are then ordered by slot rather than strictly by age.
+    """
+
+    def __init__(
+        self,
+        embeddings: EmbeddingService | None = None,
+        max_items: int | None = None,
+    ) -> None:
+        self.embeddings = embeddings or default_embeddings()
+        self.max_items = max(1, max_items) if max_items is not None else None
+        self._texts: List[str] = []
+        self._matrix = EmbeddingMatrix()
+        self._added = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
 
     def add(self, coalition: Coalition) -> None:
-        vector = _hash_embedding(coalition.full_text)
-        self._items.append((coalition.full_text, vector))
+        vector = self.embeddings.embed_one(coalition.full_text)
+        if self.max_items is not None and len(self._texts) >= self.max_items:
+            slot = self._added % self.max_items
+            self._matrix.assign(slot, vector)
+            self._texts[slot] = coalition.full_text
+        else:
+            self._matrix.append(vector)
+            self._texts.append(coalition.full_text)
+        self._added += 1
 
     def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
-        if not self._items:
-            return []
-        query_vec = _hash_embedding(query)
-        scores = [(_cosine(query_vec, vec), text) for text, vec in self._items]
-        ranked = sorted(scores, key=lambda x: x[0], reverse=True)[:limit]
-        return [(text, float(score)) for score, text in ranked]
+        return self.search_many([query], limit)[0]
 
+    def fork(self) -> "InMemoryEpisodic":
+        """Copy-on-write clone: embeddings are copied only when either side adds."""
 
-class SqliteEpisodic(EpisodicStore):
-    def __init__(self, path: str | Path) -> None:
+        clone = copy.copy(self)
+        clone._texts = list(self._texts)
+        clone._matrix = self._matrix.fork()
+        return clone
+
+    def search_many(
+        self, queries: Sequence[str], limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        if not queries:
+            return []
+        if not self._texts:
+            return [[] for _ in queries]
+        query_matrix = self.embeddings.embed(queries)
+        indices, scores = self._matrix.top_k(query_matrix, limit)
+        return [
+            [(self._texts[idx], float(score)) for idx, score in zip(row_idx, row_scores)]
+            for row_idx, row_scores in zip(indices.tolist(), scores.tolist())
+        ]
+
+
+class IVFEpisodic(InMemoryEpisodic):
+    """In-memory episodic store searched through an :class:`IVFIndex`.
+
+    Search is exact until ``min_train_size`` episodes exist; afterwards only
+    the ``nprobe`` closest inverted lists are scanned. With ``path`` the
+    texts, embeddings and index are persisted to a single ``.npz`` file on
+    :meth:`flush`/:meth:`close` and reloaded on construction.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        nprobe: int = 8,
+        nlist: int | None = None,
+        min_train_size: int = 1024,
+        embeddings: EmbeddingService | None = None,
+    ) -> None:
+        super().__init__(embeddings)
+        self.path = Path(path) if path is not None else None
+        self.index = IVFIndex(
+            self.embeddings.dim, nlist=nlist, nprobe=nprobe, min_train_size=min_train_size
+        )
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def add(self, coalition: Coalition) -> None:
+        start = len(self._matrix)
+        super().add(coalition)
+        if self.index.needs_training(len(self._matrix)):
+            self.index.train(self._matrix.rows)
+        else:
+            self.index.add(self._matrix.rows[start:], start=start)
+
+    def search_many(
+        self, queries: Sequence[str], limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        if not self.index.is_trained:
+            return super().search_many(queries, limit)
+        query_matrix = _normalise(self.embeddings.embed(queries).astype(np.float32))
+        results = []
+        for query in query_matrix:
+            indices, scores = self.index.search(self._matrix.rows, query, limit)
+            pairs = zip(indices.tolist(), scores.tolist())
+            results.append([(self._texts[idx], float(score)) for idx, score in pairs])
+        return results
+
+    def fork(self) -> "IVFEpisodic":
+        """Copy-on-write clone; the fork is not persisted (its ``path`` is None)."""
+
+        clone = cast(IVFEpisodic, super().fork())
+        clone.index = copy.deepcopy(self.index)
+        clone.path = None
+        return clone
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        encoded = [text.encode("utf-8") for text in self._texts]
+        offsets = np.cumsum([0] + [len(item) for item in encoded], dtype=np.int64)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as handle:
+            np.savez(
+                handle,
+                embeddings=self._matrix.rows,
+                text_bytes=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                text_offsets=offsets,
+                **self.index.state(),
+            )
+        tmp.replace(self.path)
+
+    def close(self) -> None:
+        self.flush()
+
+    def _load(self, path: Path) -> None:
+        with np.load(path) as data:
+            blob = data["text_bytes"].tobytes()
+            offsets = data["text_offsets"].tolist()
+            self._texts = [
+                blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)
+            ]
+            self._matrix = EmbeddingMatrix(capacity=max(256, len(self._texts)))
+            self._matrix.extend(data["embeddings"])
+            self.index.load_state({key: data[key] for key in data.files})
+
+
+class SqliteEpisodic(InMemoryEpisodic):
+    """SQLite-backed episodic store with an in-process embedding cache.
+
+    Embeddings are stored as float32 BLOBs in a WAL-mode database. Inserts
+    are committed in batches of ``commit_every`` rows or after
+    ``commit_interval`` seconds, whichever comes first; :meth:`flush` and
+    :meth:`close` commit immediately, and a store that is garbage collected
+    or still open at interpreter exit is committed and closed then. The table
+    is read once on open and searches run against the cached matrix, which
+    is extended on every add. Databases written with JSON-encoded embeddings
+    are converted in place.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        commit_every: int = 64,
+        commit_interval: float = 1.0,
+        embeddings: EmbeddingService | None = None,
+    ) -> None:
+        super().__init__(embeddings)
         self.path = str(path)
+        self.commit_every = max(1, commit_every)
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
         self._conn = sqlite3.connect(self.path)
+        self._finalizer = weakref.finalize(self, _commit_and_close, self._conn)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
         self._conn.execute(
             "CREATE TABLE IF NOT EXISTS episodes (text TEXT NOT NULL, embedding BLOB NOT NULL)"
         )
+        self._migrate_json_embeddings()
         self._conn.commit()
+        self._load()
+
+    def _migrate_json_embeddings(self) -> None:
+        rows = self._conn.execute(
+            "SELECT rowid, embedding FROM episodes WHERE typeof(embedding) = 'text'"
+        ).fetchall()
+        self._conn.executemany(
+            "UPDATE episodes SET embedding = ? WHERE rowid = ?",
+            [
+                (np.asarray(json.loads(blob), dtype=np.float32).tobytes(), rowid)
+                for rowid, blob in rows
+            ],
+        )
+
+    def _load(self) -> None:
+        rows = self._conn.execute("SELECT text, embedding FROM episodes ORDER BY rowid").fetchall()
+        if not rows:
+            return
+        self._texts = [text for text, _ in rows]
+        vectors = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32)
+        self._matrix = EmbeddingMatrix(capacity=max(256, len(rows)))
+        self._matrix.extend(vectors.reshape(len(rows), -1))
 
     def add(self, coalition: Coalition) -> None:
-        emb = _hash_embedding(coalition.full_text)
+        vector = self.embeddings.embed_one(coalition.full_text).astype(np.float32)
+        self._matrix.append(vector)
+        self._texts.append(coalition.full_text)
         self._conn.execute(
             "INSERT INTO episodes(text, embedding) VALUES (?, ?)",
-            (coalition.full_text, json.dumps(emb)),
+            (coalition.full_text, vector.tobytes()),
         )
+        self._pending += 1
+        if (
+            self._pending >= self.commit_every
+            or time.monotonic() - self._last_commit >= self.commit_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
         self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def snapshot(self) -> bytes:
+        """Consistent copy of the database, taken with the SQLite backup API."""
+
+        self.flush()
+        with tempfile.TemporaryDirectory() as tmp:
+            target_path = Path(tmp) / "snapshot.sqlite"
+            target = sqlite3.connect(target_path)
+            try:
+                self._conn.backup(target)
+            finally:
+                target.close()
+            return target_path.read_bytes()
+
+    def fork(self) -> "SqliteEpisodic":
+        raise NotImplementedError(
+            "SqliteEpisodic cannot be forked: both loops would write to the same database"
+        )
 
-    def _all(self) -> Iterable[Tuple[str, np.ndarray]]:
-        cur = self._conn.execute("SELECT text, embedding FROM episodes")
-        for text, blob in cur.fetchall():
-            yield text, json.loads(blob)
+
+class DuckDBEpisodic(EpisodicStore):
+    """Columnar episodic store backed by DuckDB.
+
+    Episodes live in an ``episodes`` table with a fixed-size ``FLOAT[dim]``
+    embedding column sized to the embedding service. Adds are buffered and
+    appended in bulk every ``batch_size`` rows, before any read, and when the
+    store is closed, collected or left open at interpreter exit. Similarity
+    search runs inside the engine via ``array_cosine_similarity`` with
+    ``ORDER BY``/``LIMIT`` pushed down, and :meth:`query` exposes the table
+    to ad-hoc SQL for analysis of the episode history.
+
+    Files written by the earlier SQLite-based implementation are moved aside
+    to ``<path>.sqlite-legacy`` and imported on first open.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        batch_size: int = 256,
+        embeddings: EmbeddingService | None = None,
+    ) -> None:
+        import duckdb
+
+        self.embeddings = embeddings or default_embeddings()
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.dim = self.embeddings.dim
+        self._buffer: List[Tuple[int, str, List[float]]] = []
+        legacy = self._move_legacy_sqlite()
+        self._conn = duckdb.connect(str(self.path))
+        self._finalizer = weakref.finalize(
+            self, _flush_and_close_duckdb, self._conn, self._buffer, self.dim
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS episodes ("
+            "seq BIGINT NOT NULL, text VARCHAR NOT NULL, "
+            f"embedding FLOAT[{self.dim}] NOT NULL, "
+            "added_at TIMESTAMP DEFAULT current_timestamp)"
+        )
+        row = self._conn.execute("SELECT coalesce(max(seq) + 1, 0) FROM episodes").fetchone()
+        self._next_seq = int(row[0]) if row else 0
+        if legacy is not None:
+            self._import_sqlite(legacy)
+
+    def _move_legacy_sqlite(self) -> Path | None:
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb") as handle:
+            if handle.read(16) != b"SQLite format 3\x00":
+                return None
+        legacy = self.path.with_name(self.path.name + ".sqlite-legacy")
+        self.path.replace(legacy)
+        return legacy
+
+    def _import_sqlite(self, legacy: Path) -> None:
+        conn = sqlite3.connect(str(legacy))
+        try:
+            for text, blob in conn.execute("SELECT text, embedding FROM episodes ORDER BY rowid"):
+                if isinstance(blob, str):
+                    vector = [float(x) for x in json.loads(blob)]
+                else:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                self._append(text, vector)
+        finally:
+            conn.close()
+        self.flush()
+
+    def __len__(self) -> int:
+        self.flush()
+        row = self._conn.execute("SELECT count(*) FROM episodes").fetchone()
+        return int(row[0]) if row else 0
+
+    def add(self, coalition: Coalition) -> None:
+        self._append(coalition.full_text, self.embeddings.embed_one(coalition.full_text).tolist())
+
+    def _append(self, text: str, vector: List[float]) -> None:
+        self._buffer.append((self._next_seq, text, vector))
+        self._next_seq += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered episodes to the table in one statement."""
+
+        _flush_duckdb(self._conn, self._buffer, self.dim)
 
     def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
-        items = list(self._all())
-        if not items:
+        self.flush()
+        # Only the integer embedding width is formatted into the SQL.
+        rows = self._conn.execute(
+            "SELECT text, array_cosine_similarity("  # noqa: S608
+            f"embedding, ?::FLOAT[{self.dim}]) AS score "
+            "FROM episodes ORDER BY score DESC, seq LIMIT ?",
+            [self.embeddings.embed_one(query).tolist(), limit],
+        ).fetchall()
+        return [(text, float(score)) for text, score in rows]
+
+    def search_many(
+        self, queries: Sequence[str], limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        if not queries:
             return []
-        query_vec = _hash_embedding(query)
-        scores = [(_cosine(query_vec, vec), text) for text, vec in items]
-        ranked = sorted(scores, key=lambda x: x[0], reverse=True)[:limit]
-        return [(text, float(score)) for score, text in ranked]
+        self.flush()
+        # Only the integer embedding width is formatted into the SQL.
+        rows = self._conn.execute(
+            f"WITH q AS (SELECT unnest(?::FLOAT[{self.dim}][]) AS vec, "  # noqa: S608
+            "unnest(range(?)) AS qid) "
+            "SELECT qid, text, array_cosine_similarity(embedding, vec) AS score "
+            "FROM q, episodes "
+            "QUALIFY row_number() OVER (PARTITION BY qid ORDER BY score DESC, seq) <= ? "
+            "ORDER BY qid, score DESC, seq",
+            [self.embeddings.embed(queries).tolist(), len(queries), limit],
+        ).fetchall()
+        results: List[List[Tuple[str, float]]] = [[] for _ in queries]
+        for qid, text, score in rows:
+            results[int(qid)].append((text, float(score)))
+        return results
+
+    def query(self, sql: str, params: Sequence[object] = ()) -> List[Tuple[object, ...]]:
+        """Run an analytical query against the ``episodes`` table."""
+
+        self.flush()
+        return self._conn.execute(sql, list(params)).fetchall()
+
+    def text_frequencies(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most frequently stored episode texts, most common first."""
+
+        rows = self.query(
+            "SELECT text, count(*) AS n FROM episodes GROUP BY text "
+            "ORDER BY n DESC, min(seq) LIMIT ?",
+            [limit],
+        )
+        return [(str(text), int(count)) for text, count in rows]
 
+    def snapshot(self) -> bytes:
+        """Consistent copy of the database file after a forced checkpoint."""
 
-class DuckDBEpisodic(EpisodicStore):
-    """Fallback DuckDB-like store implemented with SQLite for offline use."""
+        self.flush()
+        self._conn.execute("CHECKPOINT")
+        return self.path.read_bytes()
 
-    def __init__(self, path: str | Path) -> None:
-        self._sqlite = SqliteEpisodic(path)
+    def close(self) -> None:
+        self._finalizer()
 
-    def add(self, coalition: Coalition) -> None:
-        self._sqlite.add(coalition)
 
-    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
-        return self._sqlite.search(query, limit)
+def _flush_duckdb(conn, buffer: List[Tuple[int, str, List[float]]], dim: int) -> None:
+    if not buffer:
+        return
+    seqs, texts, vectors = zip(*buffer)
+    conn.execute(
+        "INSERT INTO episodes (seq, text, embedding) SELECT unnest(?::BIGINT[]), "
+        f"unnest(?::VARCHAR[]), unnest(?::FLOAT[{dim}][])",
+        [list(seqs), list(texts), list(vectors)],
+    )
+    buffer.clear()
 
 
-def _hash_embedding(text: str) -> List[float]:
-    rng = _rng_for_text(text)
-    return [rng.uniform(-1.0, 1.0) for _ in range(32)]
+def _flush_and_close_duckdb(conn, buffer: List[Tuple[int, str, List[float]]], dim: int) -> None:
+    # Must not reference the store, or its finalizer would keep it alive.
+    _flush_duckdb(conn, buffer, dim)
+    conn.close()
 
 
-def _rng_for_text(text: str) -> random.Random:
-    return random.Random(hash(text) & 0xFFFFFFFF)
+def _commit_and_close(conn: sqlite3.Connection) -> None:
+    # Must not reference the store, or its finalizer would keep it alive.
+    conn.commit()
+    conn.close()
 
 
-def _cosine(a: List[float], b: List[float]) -> float:
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
 
 
 __all__ = [
     "WorkingMemory",
     "WorkingMemoryEntry",
+    "EMBEDDING_DIM",
+    "EmbeddingMatrix",
     "EpisodicStore",
     "InMemoryEpisodic",
+    "IVFEpisodic",
     "SqliteEpisodic",
     "DuckDBEpisodic",
 ]
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from ..core.backends.base import LLMBackend
+from ..core.backends.base import GenerateRequest, LLMBackend
 from ..instruments.narrative import NarrativeStream
 from .memory import WorkingMemory
 from .types import Action, Broadcast, Coalition, Percept, ProcessName
@@ -18,6 +19,13 @@ def _require_backend(backend: LLMBackend | None) -> LLMBackend:
     return backend
 
 
+async def _agenerate(backend: LLMBackend, **kwargs: Any) -> Dict[str, Any]:
+    agenerate = getattr(backend, "agenerate", None)
+    if agenerate is None:
+        return await asyncio.to_thread(backend.generate, **kwargs)
+    return await agenerate(**kwargs)
+
+
 def _ensure_structured(resp: Dict[str, Any]) -> tuple[str, float, str]:
     text = str(resp.get("text", "")).strip()
     try:
@@ -45,19 +53,100 @@ class Process(ABC):
     @abstractmethod
     def propose(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
     ) -> List[Coalition]:
         raise NotImplementedError
 
+    async def apropose(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> List[Coalition]:
+        """Async counterpart of :meth:`propose`; defaults to the synchronous path."""
+
+        return self.propose(workspace, memory, last_broadcast)
+
+    def fingerprint(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> Optional[str]:
+        """Digest of every input :meth:`propose` depends on.
+
+        While it is unchanged the controller may reuse the previous proposals
+        (see ``RunConfig.proposal_ttl``). ``None`` means never reuse.
+        """
+
+        return None
+
     def after_broadcast(self, broadcast: Broadcast, memory: WorkingMemory) -> None:
         pass
 
-    def act(self, workspace: List[Coalition], memory: WorkingMemory) -> Action:
+    def act(self, workspace: Sequence[Coalition], memory: WorkingMemory) -> Action:
         return Action()
 
 
+class GenerativeProcess(Process):
+    """Process whose proposals come from a single ``backend.generate`` call.
+
+    Subclasses split their work into :meth:`prepare`, which builds the request
+    from the current inputs, and :meth:`complete`, which turns the structured
+    response into coalitions. The sync and async paths share both halves.
+    """
+
+    @abstractmethod
+    def prepare(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> Optional[GenerateRequest]:
+        """Return the backend request for this tick, or ``None`` to skip it."""
+
+    @abstractmethod
+    def complete(self, resp: Dict[str, Any]) -> List[Coalition]:
+        """Convert a backend response into proposals and update local state."""
+
+    def fingerprint(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> Optional[str]:
+        """Hash of the request :meth:`prepare` would send this tick."""
+
+        request = self.prepare(workspace, memory, last_broadcast)
+        return "skip" if request is None else request.fingerprint()
+
+    def propose(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> List[Coalition]:
+        request = self.prepare(workspace, memory, last_broadcast)
+        if request is None:
+            return []
+        backend = _require_backend(self.backend)
+        return self.complete(backend.generate(**request.as_kwargs()))
+
+    async def apropose(
+        self,
+        workspace: Sequence[Coalition],
+        memory: WorkingMemory,
+        last_broadcast: Optional[Broadcast],
+    ) -> List[Coalition]:
+        request = self.prepare(workspace, memory, last_broadcast)
+        if request is None:
+            return []
+        backend = _require_backend(self.backend)
+        return self.complete(await _agenerate(backend, **request.as_kwargs()))
+
+
 class Perception(Process):
     name = ProcessName.PERCEPTION
 
@@ -70,7 +159,7 @@ class Perception(Process):
 
     def propose(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
     ) -> List[Coalition]:
@@ -90,7 +179,7 @@ class Perception(Process):
         return coalitions
 
 
-class Planner(Process):
+class Planner(GenerativeProcess):
     name = ProcessName.PLANNER
 
     def __init__(self, backend: LLMBackend, temperature: float = 0.1, budget: int = 512) -> None:
@@ -98,24 +187,25 @@ class Planner(Process):
         self._goal: str = "Maintain coherent dialogue"
         self._last_plan: Optional[str] = None
 
-    def propose(
+    def prepare(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
-    ) -> List[Coalition]:
+    ) -> Optional[GenerateRequest]:
         prompt = {
             "goal": self._goal,
             "last": last_broadcast.coalition.summary if last_broadcast else None,
             "workspace": [c.summary for c in workspace],
         }
-        backend = _require_backend(self.backend)
-        resp = backend.generate(
+        return GenerateRequest(
             prompt=json.dumps(prompt),
             system="You plan next steps. Respond JSON with text/confidence/rationale_short.",
             temperature=self.temperature,
             max_tokens=self.budget,
         )
+
+    def complete(self, resp: Dict[str, Any]) -> List[Coalition]:
         text, conf, rationale = _ensure_structured(resp)
         coalition = Coalition(
             summary=f"Plan: {text[:80]}",
@@ -127,34 +217,35 @@ class Planner(Process):
         self._last_plan = text
         return [coalition]
 
-    def act(self, workspace: List[Coalition], memory: WorkingMemory) -> Action:
+    def act(self, workspace: Sequence[Coalition], memory: WorkingMemory) -> Action:
         if not self._last_plan:
             return Action(kind="none", payload=None, confidence=0.0)
         return Action(kind="say", payload=self._last_plan, confidence=0.7)
 
 
-class Reflector(Process):
+class Reflector(GenerativeProcess):
     name = ProcessName.REFLECTOR
 
-    def propose(
+    def prepare(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
-    ) -> List[Coalition]:
+    ) -> Optional[GenerateRequest]:
         if not last_broadcast:
-            return []
+            return None
         prompt = {
             "last": last_broadcast.coalition.full_text,
             "confidence": last_broadcast.coalition.confidence,
         }
-        backend = _require_backend(self.backend)
-        resp = backend.generate(
+        return GenerateRequest(
             prompt=json.dumps(prompt),
             system="You critique plans. Return JSON text/confidence/rationale_short.",
             temperature=self.temperature,
             max_tokens=self.budget,
         )
+
+    def complete(self, resp: Dict[str, Any]) -> List[Coalition]:
         text, conf, rationale = _ensure_structured(resp)
         coalition = Coalition(
             summary=f"Reflection: {text[:80]}",
@@ -166,33 +257,34 @@ class Reflector(Process):
         return [coalition]
 
 
-class SelfModel(Process):
+class SelfModel(GenerativeProcess):
     name = ProcessName.SELF_MODEL
 
     def __init__(self, backend: LLMBackend, temperature: float = 0.05, budget: int = 384) -> None:
         super().__init__(backend, temperature, budget)
         self.identity = "Noema Agent"
         self.constraints = "Functional simulation; not sentient."
-        self._narrative = NarrativeStream(redactions=[])
+        self._narrative = NarrativeStream(redactions=[], max_entries=64)
 
-    def propose(
+    def prepare(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
-    ) -> List[Coalition]:
+    ) -> Optional[GenerateRequest]:
         state = {
             "identity": self.identity,
             "constraints": self.constraints,
             "workspace": [c.summary for c in workspace[-3:]],
         }
-        backend = _require_backend(self.backend)
-        resp = backend.generate(
+        return GenerateRequest(
             prompt=json.dumps(state),
             system="Maintain identity. Return JSON text/confidence/rationale_short.",
             temperature=self.temperature,
             max_tokens=self.budget,
         )
+
+    def complete(self, resp: Dict[str, Any]) -> List[Coalition]:
         text, conf, rationale = _ensure_structured(resp)
         self.identity = self.identity if not text else text
         coalition = Coalition(
@@ -211,7 +303,7 @@ class Critic(Process):
 
     def propose(
         self,
-        workspace: List[Coalition],
+        workspace: Sequence[Coalition],
         memory: WorkingMemory,
         last_broadcast: Optional[Broadcast],
     ) -> List[Coalition]:
@@ -236,6 +328,7 @@ class Critic(Process):
 
 __all__ = [
     "Process",
+    "GenerativeProcess",
     "Perception",
     "Planner",
     "Reflector",
@@ -0,0 +1,111 @@
+"""Adaptive scheduling of cognitive processes by their broadcast value."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping
+
+from .types import Coalition, ProcessName, RunConfig, ScheduleDecision
+
+
+@dataclass
+class _ProcessStats:
+    win_rate: float = 0.0
+    marginal: float = 0.0
+    interval: int = 1
+    next_due: int = 0
+
+
+class ProcessScheduler:
+    """Decides each tick which processes propose, backing off low-value ones.
+
+    For every process that runs, the scheduler keeps exponential moving
+    averages (weight ``alpha``) of its win rate (its coalition was broadcast)
+    and its marginal salience (how far its best proposal beat the best of the
+    others, clipped at zero). While their sum stays below ``min_value`` the
+    process's interval doubles, up to ``max_interval``, which is the floor
+    that keeps any process from starving; once it is valuable again it runs
+    every tick. All processes run during the first ``warmup_ticks``; with
+    ``wake_on_workspace_change`` a backed-off process also runs on any tick
+    whose workspace differs from the previous one. Only the processes named
+    at construction are scheduled.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[ProcessName],
+        *,
+        alpha: float = 0.2,
+        min_value: float = 0.05,
+        max_interval: int = 8,
+        warmup_ticks: int = 6,
+        wake_on_workspace_change: bool = False,
+    ) -> None:
+        self.alpha = min(1.0, max(0.0, alpha))
+        self.min_value = min_value
+        self.max_interval = max(1, max_interval)
+        self.warmup_ticks = max(0, warmup_ticks)
+        self.wake_on_workspace_change = wake_on_workspace_change
+        self.stats: Dict[ProcessName, _ProcessStats] = {name: _ProcessStats() for name in names}
+
+    @classmethod
+    def from_config(cls, names: Iterable[ProcessName], config: RunConfig) -> "ProcessScheduler":
+        return cls(
+            names,
+            alpha=config.scheduler_alpha,
+            min_value=config.scheduler_min_value,
+            max_interval=config.scheduler_max_interval,
+            warmup_ticks=config.scheduler_warmup_ticks,
+            wake_on_workspace_change=config.scheduler_wake_on_workspace_change,
+        )
+
+    def plan(
+        self, tick: int, workspace_changed: bool = False
+    ) -> Dict[ProcessName, ScheduleDecision]:
+        decisions: Dict[ProcessName, ScheduleDecision] = {}
+        for name, stats in self.stats.items():
+            if tick <= self.warmup_ticks:
+                run, reason = True, "warmup"
+            elif tick >= stats.next_due:
+                run, reason = True, "due"
+            elif workspace_changed and self.wake_on_workspace_change:
+                run, reason = True, "workspace"
+            else:
+                run, reason = False, "backoff"
+            decisions[name] = ScheduleDecision(
+                run=run,
+                reason=reason,
+                interval=stats.interval,
+                win_rate=stats.win_rate,
+                marginal_salience=stats.marginal,
+            )
+        return decisions
+
+    def observe(
+        self,
+        tick: int,
+        ran: Iterable[ProcessName],
+        proposals: Mapping[ProcessName, List[Coalition]],
+        winner: str,
+    ) -> None:
+        """Update the statistics of the processes that ran on ``tick``."""
+
+        best = {
+            name: max((c.bounded_salience for c in coalitions), default=0.0)
+            for name, coalitions in proposals.items()
+        }
+        for name in ran:
+            stats = self.stats[name]
+            others = max((value for other, value in best.items() if other != name), default=0.0)
+            won = 1.0 if winner == name.value else 0.0
+            marginal = max(0.0, best.get(name, 0.0) - others)
+            stats.win_rate += self.alpha * (won - stats.win_rate)
+            stats.marginal += self.alpha * (marginal - stats.marginal)
+            if stats.win_rate + stats.marginal >= self.min_value:
+                stats.interval = 1
+            else:
+                stats.interval = min(stats.interval * 2, self.max_interval)
+            stats.next_due = tick + stats.interval
+
+
+__all__ = ["ProcessScheduler"]
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Literal, Optional, Sequence
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -60,16 +60,54 @@ class Action(BaseModel):
     confidence: float = 0.0
 
 
+@dataclass(frozen=True, slots=True)
+class WorkspaceDelta:
+    """Workspace change since the previous tick, keyed by workspace entry ID.
+
+    A keyframe lists every coalition present in ``added`` and nothing in
+    ``removed``; :func:`noema.core.workspace.workspace_states` replays a run
+    of deltas back into full workspace states.
+    """
+
+    keyframe: bool
+    added: Tuple[Tuple[int, Coalition], ...] = ()
+    removed: Tuple[int, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleDecision:
+    """Whether a process ran on a tick under adaptive scheduling, and why.
+
+    ``reason`` is ``"warmup"``, ``"workspace"`` (woken by a workspace
+    change), ``"due"`` or ``"backoff"`` (skipped); ``interval`` is its
+    current backoff interval in ticks.
+    """
+
+    run: bool
+    reason: str
+    interval: int
+    win_rate: float
+    marginal_salience: float
+
+
 @dataclass(slots=True)
 class TickTrace:
-    """Structured summary of each control loop iteration."""
+    """Structured summary of each control loop iteration.
+
+    ``workspace_state`` is only populated on keyframe ticks (every
+    ``RunConfig.workspace_keyframe_interval`` ticks); in between it is
+    ``None`` and ``workspace_delta`` carries the change. With
+    ``RunConfig.adaptive_scheduling`` ``schedule`` records which processes ran.
+    """
 
     tick: int
     broadcast: Optional[Broadcast]
-    workspace_state: List[Coalition]
+    workspace_state: Optional[Sequence[Coalition]]
     processes_considered: Dict[ProcessName, List[Coalition]]
     action: Optional[Action]
     metrics: Dict[str, float] = field(default_factory=dict)
+    workspace_delta: Optional[WorkspaceDelta] = None
+    schedule: Dict[ProcessName, ScheduleDecision] = field(default_factory=dict)
 
 
 class RunConfig(BaseModel):
@@ -81,8 +119,21 @@ class RunConfig(BaseModel):
     working_memory_decay: float = 0.15
     workflow_ticks: int = 3
     workflow_narrative_window: int = 5
-    episodic_backend: Literal["memory", "sqlite", "duckdb"] = "memory"
+    proposal_workers: int = 1
+    batch_generate: bool = False
+    metacog_window: Optional[int] = None
+    episodic_backend: Literal["memory", "sqlite", "duckdb", "ivf"] = "memory"
     episodic_path: Optional[str] = None
+    ann_nprobe: int = 8
+    ann_nlist: Optional[int] = None
+    embedding_cache_path: Optional[str] = None
+    episodic_embeddings: Literal["hash", "backend"] = "hash"
+    workspace_keyframe_interval: int = 32
+    streaming: bool = False
+    trace_buffer: int = 1024
+    trace_spill_path: Optional[str] = None
+    narrative_max_entries: Optional[int] = None
+    episodic_max_items: Optional[int] = None
     process_budgets: Dict[ProcessName, int] = Field(default_factory=lambda: {
         ProcessName.PERCEPTION: 512,
         ProcessName.PLANNER: 512,
@@ -90,6 +141,7 @@ class RunConfig(BaseModel):
         ProcessName.SELF_MODEL: 384,
         ProcessName.CRITIC: 256,
     })
+    proposal_ttl: Dict[ProcessName, int] = Field(default_factory=dict)
     process_temperature: Dict[ProcessName, float] = Field(default_factory=lambda: {
         ProcessName.PERCEPTION: 0.0,
         ProcessName.PLANNER: 0.1,
@@ -97,6 +149,12 @@ class RunConfig(BaseModel):
         ProcessName.SELF_MODEL: 0.05,
         ProcessName.CRITIC: 0.0,
     })
+    adaptive_scheduling: bool = False
+    scheduler_alpha: float = 0.2
+    scheduler_min_value: float = 0.05
+    scheduler_max_interval: int = 8
+    scheduler_warmup_ticks: int = 6
+    scheduler_wake_on_workspace_change: bool = False
     anthropomorphism: bool = False
     redaction_rules: Sequence[str] = ("ssn", "password")
 
@@ -108,5 +166,7 @@ __all__ = [
     "Percept",
     "ProcessName",
     "RunConfig",
+    "ScheduleDecision",
     "TickTrace",
+    "WorkspaceDelta",
 ]
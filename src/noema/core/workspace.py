@@ -2,31 +2,83 @@
 
 from __future__ import annotations
 
+import heapq
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .types import Broadcast, Coalition
+from .types import Broadcast, Coalition, TickTrace, WorkspaceDelta
 
 
 @dataclass
 class Workspace:
-    """Workspace maintains a bounded list of recent coalitions."""
+    """Workspace maintains a bounded set of the most salient recent coalitions.
+
+    Entries live in a min-heap keyed on ``(salience, -sequence)`` so the
+    weakest (and, among equals, the newest) coalition sits at the root and is
+    evicted in O(log k). Reads go through :meth:`state`, which returns a
+    cached immutable snapshot that is rebuilt only after the contents change.
+    Each entry's sequence number doubles as its ID in :class:`WorkspaceDelta`.
+    """
 
     capacity: int
-    _coalitions: List[Coalition] = field(default_factory=list)
+    _heap: List[Tuple[float, int, Coalition]] = field(default_factory=list)
+    _sequence: int = 0
+    _version: int = 0
+    _snapshot: Optional[Tuple[Coalition, ...]] = None
+    _added: Dict[int, Coalition] = field(default_factory=dict)
+    _removed: List[int] = field(default_factory=list)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever the workspace contents change."""
+
+        return self._version
 
     def consider(self, coalition: Coalition) -> None:
         """Insert a coalition keeping the most salient items."""
 
-        self._coalitions.append(coalition)
-        self._coalitions.sort(key=lambda c: c.bounded_salience, reverse=True)
-        if len(self._coalitions) > self.capacity:
-            self._coalitions = self._coalitions[: self.capacity]
+        if self.capacity <= 0:
+            return
+        self._sequence += 1
+        entry = (coalition.bounded_salience, -self._sequence, coalition)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            evicted = -heapq.heapreplace(self._heap, entry)[1]
+            if self._added.pop(evicted, None) is None:
+                self._removed.append(evicted)
+        else:
+            return
+        self._added[self._sequence] = coalition
+        self._version += 1
+        self._snapshot = None
+
+    def state(self) -> Tuple[Coalition, ...]:
+        """Return current coalitions, most salient first, as an immutable view."""
+
+        if self._snapshot is None:
+            ordered = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+            self._snapshot = tuple(item[2] for item in ordered)
+        return self._snapshot
 
-    def state(self) -> List[Coalition]:
-        """Return current coalitions as an immutable copy."""
+    def take_delta(self, keyframe: bool = False) -> WorkspaceDelta:
+        """Return the changes since the previous call and start a new delta."""
 
-        return list(self._coalitions)
+        if keyframe:
+            ordered = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+            delta = WorkspaceDelta(
+                keyframe=True, added=tuple((-seq, coalition) for _, seq, coalition in ordered)
+            )
+        else:
+            delta = WorkspaceDelta(
+                keyframe=False,
+                added=tuple(self._added.items()),
+                removed=tuple(self._removed),
+            )
+        self._added = {}
+        self._removed = []
+        return delta
 
     def broadcast(self, coalition: Coalition, tick: int) -> Broadcast:
         """Produce a broadcast event and ensure coalition is present."""
@@ -35,4 +87,64 @@ class Workspace:
         return Broadcast(coalition=coalition, tick=tick)
 
 
-__all__ = ["Workspace"]
+def _ordered(entries: Dict[int, Coalition]) -> Tuple[Coalition, ...]:
+    # Same order as Workspace.state(): salience descending, then oldest first.
+    ids = sorted(entries, key=lambda key: (-entries[key].bounded_salience, key))
+    return tuple(entries[key] for key in ids)
+
+
+def replay_deltas(deltas: Iterable[WorkspaceDelta]) -> Iterator[Tuple[Coalition, ...]]:
+    """Yield the full workspace state after each delta.
+
+    The first delta must be a keyframe.
+    """
+
+    entries: Optional[Dict[int, Coalition]] = None
+    for delta in deltas:
+        if delta.keyframe:
+            entries = dict(delta.added)
+        elif entries is None:
+            raise ValueError("delta stream must start with a keyframe")
+        else:
+            for key in delta.removed:
+                entries.pop(key, None)
+            entries.update(delta.added)
+        yield _ordered(entries)
+
+
+def workspace_states(traces: Iterable[TickTrace]) -> Iterator[Tuple[Coalition, ...]]:
+    """Yield the full workspace state at each trace of a run, in order."""
+
+    entries: Optional[Dict[int, Coalition]] = None
+    for trace in traces:
+        delta = trace.workspace_delta
+        if trace.workspace_state is not None:
+            entries = dict(delta.added) if delta is not None else None
+            yield tuple(trace.workspace_state)
+            continue
+        if entries is None or delta is None:
+            raise ValueError(f"tick {trace.tick} precedes the first workspace keyframe")
+        for key in delta.removed:
+            entries.pop(key, None)
+        entries.update(delta.added)
+        yield _ordered(entries)
+
+
+def workspace_at(traces: Sequence[TickTrace], index: int) -> Tuple[Coalition, ...]:
+    """Full workspace state at ``traces[index]``.
+
+    Walks back to the nearest keyframe and replays forward, so the cost is
+    bounded by the keyframe interval rather than the run length.
+    """
+
+    index = range(len(traces))[index]
+    start = index
+    while traces[start].workspace_state is None:
+        if start == 0:
+            raise ValueError(f"no workspace keyframe at or before tick {traces[index].tick}")
+        start -= 1
+    replayed = workspace_states(traces[i] for i in range(start, index + 1))
+    return deque(replayed, maxlen=1)[0]
+
+
+__all__ = ["Workspace", "replay_deltas", "workspace_at", "workspace_states"]
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 
 def brier_score(pairs: List[Tuple[float, float]]) -> float:
@@ -42,23 +43,138 @@ def wrong_at_high_conf(pairs: List[Tuple[float, float]], threshold: float = 0.8)
 
 
 @dataclass
-class MetacogTracker:
-    """Accumulates predictions for calibration metrics."""
+class CalibrationStats:
+    """Running sums that reproduce the calibration metrics in O(1) per update.
+
+    Observations can be added and removed, which lets a sliding window evict
+    its oldest entry without rescanning the rest.
+    """
+
+    bins: int = 10
+    threshold: float = 0.8
+    count: int = 0
+    squared_error: float = 0.0
+    bin_counts: List[int] = field(default_factory=list)
+    bin_predicted: List[float] = field(default_factory=list)
+    bin_actual: List[float] = field(default_factory=list)
+    high_conf: int = 0
+    high_conf_wrong: int = 0
 
-    observations: List[Tuple[float, float]] = field(default_factory=list)
+    def __post_init__(self) -> None:
+        if not self.bin_counts:
+            self.bin_counts = [0 for _ in range(self.bins)]
+            self.bin_predicted = [0.0 for _ in range(self.bins)]
+            self.bin_actual = [0.0 for _ in range(self.bins)]
 
-    def observe(self, predicted: float, actual: float) -> None:
-        self.observations.append((max(0.0, min(1.0, predicted)), max(0.0, min(1.0, actual))))
+    def add(self, predicted: float, actual: float) -> None:
+        self._update(predicted, actual, 1)
+
+    def remove(self, predicted: float, actual: float) -> None:
+        self._update(predicted, actual, -1)
+
+    def _update(self, predicted: float, actual: float, sign: int) -> None:
+        idx = min(self.bins - 1, int(predicted * self.bins))
+        self.count += sign
+        self.squared_error += sign * (predicted - actual) ** 2
+        self.bin_counts[idx] += sign
+        self.bin_predicted[idx] += sign * predicted
+        self.bin_actual[idx] += sign * actual
+        if predicted >= self.threshold:
+            self.high_conf += sign
+            if actual < 0.5:
+                self.high_conf_wrong += sign
 
     def metrics(self) -> Dict[str, float]:
+        if self.count <= 0:
+            return {"brier": 0.0, "ece": 0.0, "wrong_high_conf": 0.0}
+        ece = 0.0
+        for idx in range(self.bins):
+            count = self.bin_counts[idx]
+            if count <= 0:
+                continue
+            avg_conf = self.bin_predicted[idx] / count
+            avg_acc = self.bin_actual[idx] / count
+            ece += (count / self.count) * abs(avg_conf - avg_acc)
         return {
-            "brier": brier_score(self.observations),
-            "ece": expected_calibration_error(self.observations),
-            "wrong_high_conf": wrong_at_high_conf(self.observations),
+            "brier": max(0.0, self.squared_error) / self.count,
+            "ece": ece,
+            "wrong_high_conf": self.high_conf_wrong / max(1, self.high_conf),
         }
 
 
+@dataclass
+class MetacogTracker:
+    """Accumulates predictions for calibration metrics.
+
+    Metrics are maintained incrementally, so ``observe`` and ``metrics`` cost
+    O(1) regardless of run length. By default nothing beyond the running sums
+    is stored (constant memory). With ``window`` only the most recent
+    observations count and are kept in ``observations``; ``retain=True``
+    keeps every observation there instead, for callers that read them back.
+    Observations tagged with a ``source`` are also tracked per source, see
+    :meth:`metrics_for`.
+    """
+
+    window: Optional[int] = None
+    bins: int = 10
+    threshold: float = 0.8
+    retain: bool = False
+    _totals: CalibrationStats = field(init=False)
+    _by_source: Dict[str, CalibrationStats] = field(init=False, default_factory=dict)
+    _recent: Optional[Deque[Tuple[float, float, Optional[str]]]] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self._totals = CalibrationStats(bins=self.bins, threshold=self.threshold)
+        if self.window is not None or self.retain:
+            self._recent = deque()
+
+    @property
+    def count(self) -> int:
+        return self._totals.count
+
+    @property
+    def observations(self) -> List[Tuple[float, float]]:
+        """Observations counted by :meth:`metrics` (those inside the window, if any)."""
+
+        if self._recent is None:
+            raise RuntimeError("observations are not retained; use retain=True or a window")
+        return [(pred, actual) for pred, actual, _ in self._recent]
+
+    def observe(self, predicted: float, actual: float, source: Optional[str] = None) -> None:
+        pred = max(0.0, min(1.0, predicted))
+        act = max(0.0, min(1.0, actual))
+        self._totals.add(pred, act)
+        if source is not None:
+            stats = self._by_source.get(source)
+            if stats is None:
+                stats = CalibrationStats(bins=self.bins, threshold=self.threshold)
+                self._by_source[source] = stats
+            stats.add(pred, act)
+        if self._recent is not None:
+            self._recent.append((pred, act, source))
+            while self.window is not None and len(self._recent) > self.window:
+                old_pred, old_act, old_source = self._recent.popleft()
+                self._totals.remove(old_pred, old_act)
+                if old_source is not None:
+                    self._by_source[old_source].remove(old_pred, old_act)
+
+    def metrics(self) -> Dict[str, float]:
+        return self._totals.metrics()
+
+    def metrics_for(self, source: str) -> Dict[str, float]:
+        """Calibration metrics restricted to observations from ``source``."""
+
+        stats = self._by_source.get(source)
+        if stats is None:
+            return CalibrationStats(bins=self.bins, threshold=self.threshold).metrics()
+        return stats.metrics()
+
+    def sources(self) -> List[str]:
+        return sorted(self._by_source)
+
+
 __all__ = [
+    "CalibrationStats",
     "MetacogTracker",
     "brier_score",
     "expected_calibration_error",
@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Iterable, List
+from itertools import islice
+from typing import Iterable, List, MutableSequence, Optional
 
 
 @dataclass
 class NarrativeStream:
-    """Maintains a rolling log of textual summaries."""
+    """Maintains a rolling log of textual summaries.
+
+    With ``max_entries`` only the most recent entries are kept.
+    """
 
     redactions: Iterable[str]
-    entries: List[str] = field(default_factory=list)
+    entries: MutableSequence[str] = field(default_factory=list)
+    max_entries: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.max_entries is not None:
+            self.entries = deque(self.entries, maxlen=self.max_entries)
 
     def append(self, line: str) -> None:
         clean = line
@@ -20,7 +30,9 @@ class NarrativeStream:
         self.entries.append(clean[:400])
 
     def last(self, n: int = 5) -> List[str]:
-        return self.entries[-n:]
+        if n <= 0:
+            return []
+        return list(islice(reversed(self.entries), n))[::-1]
 
 
 __all__ = ["NarrativeStream"]
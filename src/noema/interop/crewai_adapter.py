@@ -23,5 +23,9 @@ class CrewAIAgent:
         result = self.loop.run_workflow(Percept(content=description, salience_hint=0.4))
         return {"response": result.action.model_dump(), "tick": self.loop.tick_id}
 
+    async def ahandle_task(self, description: str) -> Dict[str, Any]:
+        result = await self.loop.arun_workflow(Percept(content=description, salience_hint=0.4))
+        return {"response": result.action.model_dump(), "tick": self.loop.tick_id}
+
 
 __all__ = ["CrewAIAgent"]
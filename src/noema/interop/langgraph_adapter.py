@@ -24,6 +24,10 @@ class LangGraphAdapter:
         percept = Percept(content=content, timestamp=tick)
         self._last_result = self.loop.run_workflow(percept)
 
+    async def aingress(self, content: str, tick: int) -> None:
+        percept = Percept(content=content, timestamp=tick)
+        self._last_result = await self.loop.arun_workflow(percept)
+
     def egress(self) -> Dict[str, Any]:
         if self._last_result is None:
             action = self.loop.act()
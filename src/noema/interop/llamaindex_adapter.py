@@ -24,5 +24,12 @@ class LlamaIndexMemory:
         result = self.loop.run_workflow(Percept(content=text, salience_hint=0.5))
         return {"action": result.action.model_dump()}
 
+    async def aadd(self, text: str) -> None:
+        await self.loop.arun_workflow(Percept(content=text))
+
+    async def aquery(self, text: str) -> Dict[str, Any]:
+        result = await self.loop.arun_workflow(Percept(content=text, salience_hint=0.5))
+        return {"action": result.action.model_dump()}
+
 
 __all__ = ["LlamaIndexMemory"]
@@ -30,6 +30,10 @@ def create_app(loop: ConsciousLoop) -> FastAPI:
             metrics=metrics,
         )
 
+    @app.get("/eval")
+    def get_eval() -> dict:
+        return loop.eval().metrics
+
     @app.get("/narrative")
     def narrative(last: int = 5) -> list[str]:
         return loop.controller.narrative.last(last)
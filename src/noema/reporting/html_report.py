@@ -1,26 +1,243 @@
-"""HTML reporting for evaluation runs without external dependencies."""
+"""HTML reporting for evaluation runs without external dependencies.
+
+Reports scale to very long runs: metric curves and the broadcast timeline are
+min/max-downsampled into a bounded number of buckets while traces stream
+past, and per-tick detail is cut into fixed-size pages that the browser loads
+on demand. The index page therefore stays the same size however many ticks
+the run has.
+"""
 
 from __future__ import annotations
 
+import bisect
+import html
+import json
 from pathlib import Path
-from typing import Iterable, TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
 
 from ..core.types import TickTrace
 
 if TYPE_CHECKING:
     from ..tasks.evaluations import EvalReport
 
+PageSink = Callable[[str, str], None]
 
-def render_report(traces: Iterable[TickTrace], report: "EvalReport") -> str:
-    trace_list = list(traces)
-    metric_rows = "".join(
-        f"<tr><td>{key}</td><td>{value:.3f}</td></tr>" for key, value in report.metrics.items()
-    )
-    timeline_items = "".join(
-        f"<li>Tick {trace.tick}: {trace.broadcast.coalition.summary if trace.broadcast else 'None'}</li>"
-        for trace in trace_list
+
+class _Bucket:
+    __slots__ = ("first_tick", "last_tick", "count", "lows", "highs", "label", "labelled")
+
+    def __init__(self, tick: int, values: Dict[str, float], label: Optional[str]) -> None:
+        self.first_tick = tick
+        self.last_tick = tick
+        self.count = 1
+        self.lows = dict(values)
+        self.highs = dict(values)
+        self.label = label
+        self.labelled = int(label is not None)
+
+    def absorb(
+        self,
+        last_tick: int,
+        count: int,
+        lows: Dict[str, float],
+        highs: Dict[str, float],
+        label: Optional[str],
+        labelled: int,
+    ) -> None:
+        self.last_tick = last_tick
+        self.count += count
+        for name, value in lows.items():
+            self.lows[name] = min(self.lows.get(name, value), value)
+        for name, value in highs.items():
+            self.highs[name] = max(self.highs.get(name, value), value)
+        if self.label is None:
+            self.label = label
+        self.labelled += labelled
+
+
+class MinMaxDownsampler:
+    """Streaming min/max bucketing with at most ``max_buckets`` buckets.
+
+    Buckets start one tick wide; whenever the limit is exceeded neighbouring
+    buckets are merged pairwise and the width doubles, so memory is bounded
+    and each input point costs amortised O(1).
+    """
+
+    def __init__(self, max_buckets: int = 500) -> None:
+        self.max_buckets = max(2, max_buckets)
+        self.width = 1
+        self.buckets: List[_Bucket] = []
+
+    def add(self, tick: int, values: Dict[str, float], label: Optional[str] = None) -> None:
+        last = self.buckets[-1] if self.buckets else None
+        if last is None or last.count >= self.width:
+            self.buckets.append(_Bucket(tick, values, label))
+        else:
+            last.absorb(tick, 1, values, values, label, int(label is not None))
+        if len(self.buckets) > self.max_buckets:
+            merged: List[_Bucket] = []
+            for idx in range(0, len(self.buckets), 2):
+                head = self.buckets[idx]
+                if idx + 1 < len(self.buckets):
+                    tail = self.buckets[idx + 1]
+                    head.absorb(
+                        tail.last_tick, tail.count, tail.lows, tail.highs, tail.label, tail.labelled
+                    )
+                merged.append(head)
+            self.buckets = merged
+            self.width *= 2
+
+
+def _svg_curve(name: str, buckets: List[_Bucket], width: int = 800, height: int = 120) -> str:
+    points = [(b.lows[name], b.highs[name]) for b in buckets if name in b.lows]
+    if not points:
+        return ""
+    lo = min(low for low, _ in points)
+    hi = max(high for _, high in points)
+    span = (hi - lo) or 1.0
+    step = width / max(1, len(points) - 1)
+
+    def y(value: float) -> str:
+        return f"{height - (value - lo) / span * height:.1f}"
+
+    upper = " ".join(f"{idx * step:.1f},{y(high)}" for idx, (_, high) in enumerate(points))
+    lower = " ".join(f"{idx * step:.1f},{y(low)}" for idx, (low, _) in enumerate(points))
+    return (
+        f"<figure><figcaption>{html.escape(name)} "
+        f"<small>[{lo:.3f}, {hi:.3f}]</small></figcaption>"
+        f"<svg viewBox='0 0 {width} {height}' width='{width}' height='{height}'>"
+        f"<polyline fill='none' stroke='#36c' points='{upper}' />"
+        f"<polyline fill='none' stroke='#9bd' points='{lower}' /></svg></figure>"
     )
-    return f"""
+
+
+def _detail_row(trace: TickTrace) -> str:
+    coalition = trace.broadcast.coalition if trace.broadcast else None
+    action = trace.action
+    cells = [
+        str(trace.tick),
+        html.escape(coalition.source) if coalition else "",
+        html.escape(coalition.summary) if coalition else "None",
+        f"{coalition.confidence:.3f}" if coalition else "",
+        html.escape(f"{action.kind}: {action.payload}") if action and action.kind != "none" else "",
+    ]
+    return "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+
+
+def _page_script(index: int, rows: List[str]) -> str:
+    return f"noemaPage({index}, {json.dumps(''.join(rows))});\n"
+
+
+class ReportBuilder:
+    """Builds a report incrementally from a stream of traces.
+
+    Detail rows are grouped into pages of ``page_size`` ticks. With a
+    ``sink`` each finished page is handed over as ``(name, javascript)`` and
+    loaded by the index page on demand (``<script src>``, which also works
+    from ``file://``); without one, pages are embedded in the index.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_points: int = 500,
+        page_size: int = 500,
+        sink: Optional[PageSink] = None,
+        page_prefix: str = "",
+    ) -> None:
+        self.series = MinMaxDownsampler(max_points)
+        self.page_size = max(1, page_size)
+        self.sink = sink
+        self.page_prefix = page_prefix
+        self.ticks = 0
+        self.pages: List[tuple[int, int]] = []
+        self._page_ends: List[int] = []
+        self._rows: List[str] = []
+        self._first_tick: Optional[int] = None
+        self._inline: List[str] = []
+
+    @staticmethod
+    def page_name(index: int) -> str:
+        return f"page-{index:05d}.js"
+
+    def add(self, trace: TickTrace) -> None:
+        coalition = trace.broadcast.coalition if trace.broadcast else None
+        values = {k: float(v) for k, v in trace.metrics.items() if isinstance(v, int | float)}
+        if coalition is not None:
+            values["confidence"] = coalition.confidence
+            values["salience"] = coalition.bounded_salience
+        self.series.add(trace.tick, values, coalition.summary if coalition else None)
+        if self._first_tick is None:
+            self._first_tick = trace.tick
+        self._rows.append(_detail_row(trace))
+        self.ticks += 1
+        if len(self._rows) >= self.page_size:
+            self._flush_page(trace.tick)
+
+    def _flush_page(self, last_tick: int) -> None:
+        if not self._rows or self._first_tick is None:
+            return
+        index = len(self.pages)
+        script = _page_script(index, self._rows)
+        if self.sink is not None:
+            self.sink(self.page_name(index), script)
+        else:
+            self._inline.append(script)
+        self.pages.append((self._first_tick, last_tick))
+        self._page_ends.append(last_tick)
+        self._rows = []
+        self._first_tick = None
+
+    def _page_of(self, tick: int) -> int:
+        return min(bisect.bisect_left(self._page_ends, tick), max(0, len(self.pages) - 1))
+
+    def finish(self, report: "EvalReport") -> str:
+        """Flush the last page and return the index page HTML."""
+
+        if self._rows:
+            self._flush_page(self.series.buckets[-1].last_tick)
+        metric_rows = "".join(
+            f"<tr><td>{html.escape(key)}</td><td>{value:.3f}</td></tr>"
+            for key, value in report.metrics.items()
+        )
+        buckets = self.series.buckets
+        names = sorted({name for bucket in buckets for name in bucket.lows})
+        curves = "".join(_svg_curve(name, buckets) for name in names)
+        timeline = []
+        for bucket in buckets:
+            span = (
+                f"Tick {bucket.first_tick}"
+                if bucket.first_tick == bucket.last_tick
+                else f"Ticks {bucket.first_tick}&ndash;{bucket.last_tick}"
+            )
+            label = html.escape(bucket.label) if bucket.label is not None else "None"
+            more = f" <small>(+{bucket.labelled - 1} more)</small>" if bucket.labelled > 1 else ""
+            page = self._page_of(bucket.first_tick)
+            timeline.append(
+                f"<li><a href='#detail' onclick='showPage({page})'>{span}</a>: {label}{more}</li>"
+            )
+        pager = "".join(
+            f"<button onclick='showPage({index})'>{first}&ndash;{last}</button>"
+            for index, (first, last) in enumerate(self.pages)
+        )
+        inline = "".join(f"<script>{script}</script>" for script in self._inline)
+        note = (
+            f"<p>{self.ticks} ticks; timeline and curves downsampled to "
+            f"{len(buckets)} buckets of {self.series.width} tick(s).</p>"
+        )
+        return _TEMPLATE.format(
+            metric_rows=metric_rows,
+            note=note,
+            curves=curves,
+            timeline="".join(timeline),
+            pager=pager,
+            prefix=json.dumps(self.page_prefix),
+            inline=inline,
+            onload=" onload='showPage(0)'" if self.pages else "",
+        )
+
+
+_TEMPLATE = """
 <!doctype html>
 <html>
 <head>
@@ -31,27 +248,102 @@ body {{ font-family: sans-serif; margin: 2rem; }}
 section {{ margin-bottom: 2rem; }}
 table {{ border-collapse: collapse; }}
 th, td {{ border: 1px solid #ccc; padding: 0.5rem; }}
+figure {{ margin: 0 0 1rem 0; }}
+button {{ margin: 0 0.25rem 0.25rem 0; }}
 </style>
+<script>
+var noemaPages = {{}};
+var noemaWanted = null;
+function noemaPage(index, rows) {{
+  noemaPages[index] = rows;
+  if (noemaWanted === index) {{ renderPage(index); }}
+}}
+function renderPage(index) {{
+  document.getElementById('detail-rows').innerHTML = noemaPages[index];
+}}
+function showPage(index) {{
+  noemaWanted = index;
+  if (index in noemaPages) {{ renderPage(index); return; }}
+  var script = document.createElement('script');
+  script.src = {prefix} + 'page-' + String(index).padStart(5, '0') + '.js';
+  document.head.appendChild(script);
+}}
+</script>
+{inline}
 </head>
-<body>
+<body{onload}>
 <h1>Noema Evaluation Report</h1>
 <section>
 <h2>Metrics</h2>
 <table><tr><th>Metric</th><th>Value</th></tr>{metric_rows}</table>
 </section>
 <section>
+<h2>Metric Curves</h2>
+{note}
+{curves}
+</section>
+<section>
 <h2>Broadcast Timeline</h2>
-<ul>{timeline_items}</ul>
+<ul>{timeline}</ul>
+</section>
+<section id='detail'>
+<h2>Tick Detail</h2>
+<div>{pager}</div>
+<table><tr><th>Tick</th><th>Source</th><th>Broadcast</th><th>Confidence</th><th>Action</th></tr>
+<tbody id='detail-rows'></tbody></table>
 </section>
 </body>
 </html>
 """
 
 
-def save_report(traces: Iterable[TickTrace], report: "EvalReport", path: str | Path) -> str:
-    html = render_report(list(traces), report)
-    Path(path).write_text(html, encoding="utf-8")
+def render_report(
+    traces: Iterable[TickTrace],
+    report: "EvalReport",
+    *,
+    max_points: int = 500,
+    page_size: int = 500,
+) -> str:
+    """Self-contained report with detail pages embedded in the document.
+
+    Every detail page is held in memory and inlined, so this suits small
+    runs only; use :func:`save_report` for long ones.
+    """
+
+    builder = ReportBuilder(max_points=max_points, page_size=page_size)
+    for trace in traces:
+        builder.add(trace)
+    return builder.finish(report)
+
+
+def save_report(
+    traces: Iterable[TickTrace],
+    report: "EvalReport",
+    path: str | Path,
+    *,
+    max_points: int = 500,
+    page_size: int = 500,
+) -> str:
+    """Write a report to ``path`` with detail pages in ``<stem>_files/``.
+
+    Pages are written as soon as they fill up, so only one page of detail
+    is held in memory however long ``traces`` is.
+    """
+
+    target = Path(path)
+    pages = target.with_name(f"{target.stem}_files")
+    pages.mkdir(parents=True, exist_ok=True)
+
+    def sink(name: str, script: str) -> None:
+        (pages / name).write_text(script, encoding="utf-8")
+
+    builder = ReportBuilder(
+        max_points=max_points, page_size=page_size, sink=sink, page_prefix=f"{pages.name}/"
+    )
+    for trace in traces:
+        builder.add(trace)
+    target.write_text(builder.finish(report), encoding="utf-8")
     return str(path)
 
 
-__all__ = ["render_report", "save_report"]
+__all__ = ["MinMaxDownsampler", "ReportBuilder", "render_report", "save_report"]
@@ -2,11 +2,25 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from ..core.backends.dummy import DummyBackend
 from ..core.controller import Controller
 from ..core.processes import Process
-from ..core.types import ProcessName
+from ..core.types import ProcessName, RunConfig
+from .battery import (
+    BackendFactory,
+    BatteryResult,
+    BatteryRun,
+    MetricSummary,
+    run_one,
+    run_parallel,
+    summarise,
+)
+
+Subset = Tuple[ProcessName, ...]
 
 
 class NullProcess(Process):
@@ -14,6 +28,9 @@ class NullProcess(Process):
         super().__init__(backend=None, temperature=0.0, budget=0)
         self.name = name
 
+    def ingest(self, percept) -> None:
+        """Drop percepts so an ablated perception process stays silent."""
+
     def propose(self, workspace, memory, last_broadcast):  # type: ignore[override]
         return []
 
@@ -24,4 +41,112 @@ def apply_ablation(controller: Controller, disabled: Iterable[ProcessName]) -> N
             controller.processes[name] = NullProcess(name)
 
 
-__all__ = ["apply_ablation"]
+def _subset(names: Iterable[ProcessName]) -> Subset:
+    order = list(ProcessName)
+    return tuple(sorted(set(names), key=order.index))
+
+
+def ablation_subsets(processes: Optional[Iterable[ProcessName]] = None) -> List[Subset]:
+    """Every subset of ``processes`` (all of ``ProcessName`` by default), smallest first."""
+
+    names = _subset(ProcessName if processes is None else processes)
+    return [combo for size in range(len(names) + 1) for combo in combinations(names, size)]
+
+
+@dataclass
+class AblationRow:
+    """Metrics of one ablation and their paired per-seed deltas against the full model."""
+
+    disabled: Subset
+    metrics: Dict[str, MetricSummary]
+    deltas: Dict[str, MetricSummary]
+
+
+def run_ablation_sweep(
+    subsets: Iterable[Iterable[ProcessName]],
+    seeds: Sequence[int],
+    ticks: int,
+    *,
+    task: str = "interruption_count",
+    task_seed: Optional[int] = None,
+    workers: int = 1,
+    config: Optional[RunConfig] = None,
+    backend_factory: BackendFactory = DummyBackend,
+    on_result: Optional[Callable[[BatteryResult, int, int], None]] = None,
+) -> List[BatteryResult]:
+    """Run every ablation subset with every seed on a shared percept stream.
+
+    The full model (no process disabled) is always run first as the baseline.
+    All runs see the percept stream of ``task_seed`` (the config seed by
+    default), so differences come from the ablation and the model seed only.
+    """
+
+    grid = list(dict.fromkeys([()] + [_subset(subset) for subset in subsets]))
+    if task_seed is None:
+        task_seed = (config or RunConfig()).seed
+    specs = [
+        BatteryRun(task, seed, ticks, config, backend_factory, disabled, task_seed)
+        for disabled in grid
+        for seed in sorted(set(seeds))
+    ]
+    return run_parallel(run_one, specs, workers, on_result)
+
+
+def ablation_table(results: Sequence[BatteryResult]) -> List[AblationRow]:
+    """Summarise sweep results; deltas are ablated minus full model, paired by seed."""
+
+    by_subset: Dict[Subset, Dict[int, Dict[str, float]]] = {}
+    for result in results:
+        by_subset.setdefault(result.disabled, {})[result.seed] = result.metrics
+    baseline = by_subset.get(())
+    if baseline is None:
+        raise ValueError("ablation results must include the full model (nothing disabled)")
+    rows: List[AblationRow] = []
+    for disabled, per_seed in by_subset.items():
+        names = sorted({name for metrics in per_seed.values() for name in metrics})
+        metrics = {
+            name: summarise([m[name] for m in per_seed.values() if name in m]) for name in names
+        }
+        deltas = {
+            name: summarise(
+                [
+                    m[name] - baseline[seed][name]
+                    for seed, m in per_seed.items()
+                    if name in m and name in baseline.get(seed, {})
+                ]
+            )
+            for name in names
+        }
+        rows.append(AblationRow(disabled, metrics, deltas))
+    return rows
+
+
+def format_ablation_table(rows: Sequence[AblationRow]) -> str:
+    """Plain-text table of mean metric deltas (with 95% CI half-width) vs the full model."""
+
+    names = sorted({name for row in rows for name in row.deltas})
+    labels = [",".join(name.value for name in row.disabled) or "(full model)" for row in rows]
+    width = max([len("disabled")] + [len(label) for label in labels])
+    header = f"{'disabled':<{width}}  " + "  ".join(f"{name[:18]:>18}" for name in names)
+    lines = [header]
+    for label, row in zip(labels, rows):
+        cells = []
+        for name in names:
+            delta = row.deltas.get(name)
+            if delta is None or delta.n == 0:
+                cell = "-"
+            else:
+                cell = f"{delta.mean:+.4f}±{(delta.high - delta.low) / 2:.4f}"
+            cells.append(f"{cell:>18}")
+        lines.append(f"{label:<{width}}  " + "  ".join(cells))
+    return "\n".join(lines)
+
+
+__all__ = [
+    "AblationRow",
+    "ablation_subsets",
+    "ablation_table",
+    "apply_ablation",
+    "format_ablation_table",
+    "run_ablation_sweep",
+]
@@ -0,0 +1,206 @@
+"""Multi-seed evaluation battery spread across a process pool.
+
+Every run is independent and fully determined by its ``(task, seed)`` spec,
+so results are collected as workers finish and then put back into spec
+order: the output is identical for any number of workers.
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from statistics import NormalDist, mean, stdev
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from ..core.backends.base import LLMBackend
+from ..core.backends.dummy import DummyBackend
+from ..core.loop import ConsciousLoop
+from ..core.types import ProcessName, RunConfig
+from .microworlds import make_task
+
+BackendFactory = Callable[[int], LLMBackend]
+Spec = TypeVar("Spec")
+Result = TypeVar("Result")
+
+
+@dataclass(frozen=True)
+class BatteryRun:
+    """One independent run of ``task`` for ``ticks`` cycles with ``seed``.
+
+    ``disabled`` processes are replaced by ``NullProcess``; ``task_seed``
+    pins the percept stream independently of the model seed.
+    """
+
+    task: str
+    seed: int
+    ticks: int
+    config: Optional[RunConfig] = None
+    backend_factory: BackendFactory = DummyBackend
+    disabled: Tuple[ProcessName, ...] = ()
+    task_seed: Optional[int] = None
+
+
+@dataclass
+class BatteryResult:
+    task: str
+    seed: int
+    ticks: int
+    metrics: Dict[str, float]
+    disabled: Tuple[ProcessName, ...] = ()
+
+
+@dataclass
+class MetricSummary:
+    """Mean of one metric over seeds with a two-sided confidence interval."""
+
+    mean: float
+    low: float
+    high: float
+    n: int
+    values: List[float] = field(default_factory=list, repr=False)
+
+
+def run_one(spec: BatteryRun) -> BatteryResult:
+    """Execute a single run; top-level so it can be shipped to pool workers."""
+
+    config: RunConfig = RunConfig(**spec.config.model_dump()) if spec.config else RunConfig()
+    config.seed = spec.seed
+    loop = ConsciousLoop(spec.backend_factory(spec.seed), config)
+    try:
+        if spec.disabled:
+            from .ablations import apply_ablation
+
+            apply_ablation(loop.controller, spec.disabled)
+        task_seed = spec.seed if spec.task_seed is None else spec.task_seed
+        env = make_task(spec.task, spec.ticks, task_seed)
+        ticks = 0
+        for _ in range(spec.ticks):
+            percept = env.next_percept()
+            if percept is None:
+                break
+            result = loop.run_workflow(percept)
+            env.apply_action(result.action)
+            ticks += 1
+        # The loop's evaluator embeds through the backend, like aggregate_from_traces.
+        metrics = dict(loop.eval().metrics)
+    finally:
+        loop.close()
+    return BatteryResult(spec.task, spec.seed, ticks, metrics, spec.disabled)
+
+
+def run_parallel(
+    fn: Callable[[Spec], Result],
+    specs: Sequence[Spec],
+    workers: int = 1,
+    on_result: Optional[Callable[[Result, int, int], None]] = None,
+) -> List[Result]:
+    """Map ``fn`` over ``specs`` on a process pool, returning results in spec order.
+
+    ``on_result(result, done, total)`` is called in completion order. With
+    ``workers <= 1`` everything runs inline in this process.
+    """
+
+    total = len(specs)
+    if workers <= 1 or total <= 1:
+        inline: List[Result] = []
+        for spec in specs:
+            inline.append(fn(spec))
+            if on_result is not None:
+                on_result(inline[-1], len(inline), total)
+        return inline
+    results: Dict[int, Result] = {}
+    with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+        futures = {pool.submit(fn, spec): idx for idx, spec in enumerate(specs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result is not None:
+                on_result(result, done, total)
+    return [results[idx] for idx in range(total)]
+
+
+def run_battery(
+    tasks: Sequence[str],
+    seeds: Sequence[int],
+    ticks: int,
+    *,
+    workers: int = 1,
+    config: Optional[RunConfig] = None,
+    backend_factory: BackendFactory = DummyBackend,
+    on_result: Optional[Callable[[BatteryResult, int, int], None]] = None,
+) -> List[BatteryResult]:
+    """Run every task with every seed; results are sorted by ``(task, seed)``."""
+
+    specs = [
+        BatteryRun(task, seed, ticks, config, backend_factory)
+        for task in sorted(set(tasks))
+        for seed in sorted(set(seeds))
+    ]
+    return run_parallel(run_one, specs, workers, on_result)
+
+
+# Two-sided 95% Student-t critical values for small samples.
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def _critical(df: int, confidence: float) -> float:
+    if confidence == 0.95 and df <= len(_T95):
+        return _T95[df - 1]
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def summarise(values: Sequence[float], confidence: float = 0.95) -> MetricSummary:
+    """Mean with a t-based (normal for df > 30) confidence interval."""
+
+    data = [float(v) for v in values if not math.isnan(v)]
+    if not data:
+        return MetricSummary(math.nan, math.nan, math.nan, 0)
+    centre = mean(data)
+    if len(data) < 2:
+        return MetricSummary(centre, centre, centre, 1, data)
+    half = _critical(len(data) - 1, confidence) * stdev(data) / math.sqrt(len(data))
+    return MetricSummary(centre, centre - half, centre + half, len(data), data)
+
+
+def summarise_battery(
+    results: Sequence[BatteryResult], confidence: float = 0.95
+) -> Dict[str, Dict[str, MetricSummary]]:
+    """Per-task ``{metric: MetricSummary}`` across seeds."""
+
+    grouped: Dict[str, Dict[str, List[float]]] = {}
+    for result in results:
+        per_task = grouped.setdefault(result.task, {})
+        for name, value in result.metrics.items():
+            per_task.setdefault(name, []).append(value)
+    return {
+        task: {name: summarise(values, confidence) for name, values in sorted(metrics.items())}
+        for task, metrics in grouped.items()
+    }
+
+
+def format_summary(summary: Dict[str, Dict[str, MetricSummary]]) -> str:
+    lines: List[str] = []
+    for task, metrics in summary.items():
+        lines.append(f"{task}:")
+        for name, stats in metrics.items():
+            interval = f"[{stats.low:8.4f}, {stats.high:8.4f}]"
+            lines.append(f"  {name:<24} {stats.mean:8.4f}  {interval}  n={stats.n}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "BatteryResult",
+    "BatteryRun",
+    "MetricSummary",
+    "format_summary",
+    "run_battery",
+    "run_one",
+    "run_parallel",
+    "summarise",
+    "summarise_battery",
+]
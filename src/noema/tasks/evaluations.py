@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
+import heapq
 from statistics import mean
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Sequence, Set
 
+import numpy as np
 from pydantic import BaseModel
 
 from ..core.backends.base import LLMBackend
+from ..core.backends.dummy import DummyBackend
+from ..core.embeddings import EmbeddingService
 from ..core.types import TickTrace
 from ..instruments.metacog import MetacogTracker
 from ..reporting.html_report import render_report
@@ -17,6 +22,23 @@ class EvalReport(BaseModel):
     metrics: Dict[str, float]
     notes: str = ""
 
+
+_EVALUATION_DEFAULT: Optional[EmbeddingService] = None
+
+
+def evaluation_embeddings() -> EmbeddingService:
+    """Process-wide service used to score runs whose backend cannot embed.
+
+    It embeds with :class:`DummyBackend` vectors, so narrative coherence
+    without a backend keeps the values earlier releases reported.
+    """
+
+    global _EVALUATION_DEFAULT
+    if _EVALUATION_DEFAULT is None:
+        _EVALUATION_DEFAULT = EmbeddingService(DummyBackend())
+    return _EVALUATION_DEFAULT
+
+
 def run_interruption_recovery(traces: Iterable[TickTrace]) -> float:
     gap_lengths: List[int] = []
     last_interrupt_tick: int | None = None
@@ -65,48 +87,168 @@ def run_calibration_metrics(traces: Iterable[TickTrace]) -> Dict[str, float]:
     return metrics
 
 
-def run_narrative_coherence(traces: Iterable[TickTrace], backend: LLMBackend | None = None) -> float:
+def run_narrative_coherence(
+    traces: Iterable[TickTrace],
+    backend: LLMBackend | None = None,
+    embeddings: EmbeddingService | None = None,
+) -> float:
     texts = [trace.broadcast.coalition.full_text for trace in traces if trace.broadcast]
     if len(texts) < 2:
         return 1.0
-    if backend is None:
-        from ..core.backends.dummy import DummyBackend
-
-        backend = DummyBackend()
-    embeddings = backend.embed(texts)
-    if not embeddings:
-        return 0.0
-    sims = []
-    for i in range(1, len(embeddings)):
-        prev = embeddings[i - 1]
-        cur = embeddings[i]
-        sims.append(_cosine(prev, cur))
-    if not sims:
+    if embeddings is None:
+        embeddings = EmbeddingService(backend) if backend is not None else evaluation_embeddings()
+    vectors = embeddings.embed(texts)
+    if not vectors.size:
         return 0.0
-    avg = float(mean(sims))
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = np.inf
+    units = vectors / norms[:, None]
+    sims = np.einsum("ij,ij->i", units[:-1], units[1:])
+    avg = float(sims.mean())
     return max(0.0, min(1.0, (avg + 1.0) / 2.0))
 
 
-def _cosine(a: List[float], b: List[float]) -> float:
-    import math
+class _DistinctCounter:
+    """Distinct-value counter in bounded memory.
 
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    Counts exactly while at most ``capacity`` distinct values have been seen;
+    beyond that it keeps the ``capacity`` smallest 64-bit hashes and returns
+    the k-minimum-values estimate.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = max(2, capacity)
+        self._heap: List[int] = []
+        self._members: Set[int] = set()
+        self._saturated = False
+
+    def add(self, value: object) -> None:
+        digest = hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        if hashed in self._members:
+            return
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, -hashed)
+            self._members.add(hashed)
+            return
+        self._saturated = True
+        if hashed < -self._heap[0]:
+            evicted = -heapq.heapreplace(self._heap, -hashed)
+            self._members.discard(evicted)
+            self._members.add(hashed)
 
+    def count(self) -> float:
+        if not self._saturated:
+            return float(len(self._heap))
+        return (self.capacity - 1) / (-self._heap[0] / 2**64)
 
-def aggregate_from_traces(traces: List[TickTrace], backend: LLMBackend | None = None) -> EvalReport:
-    metrics = {
-        "interruption_recovery": run_interruption_recovery(traces),
-        "self_reference": run_self_reference_stability(traces),
-        "wm_span": run_working_memory_span(traces),
-    }
-    metrics.update(run_calibration_metrics(traces))
-    metrics["narrative_coherence"] = run_narrative_coherence(traces, backend=backend)
-    return EvalReport(metrics=metrics, notes="Derived from in-run telemetry")
+
+class IncrementalEvaluator:
+    """Running interruption recovery, self-reference, WM span, calibration and coherence.
+
+    :meth:`observe` folds one trace into fixed-size state, so a loop can keep
+    evaluating an arbitrarily long run without retaining its traces and
+    :meth:`report` is O(1). Results match the ``run_*`` functions up to
+    floating point summation order (and the distinct-payload estimate once
+    more than ``distinct_capacity`` unique ``say`` payloads occur).
+    """
+
+    def __init__(
+        self,
+        embeddings: EmbeddingService | None = None,
+        distinct_capacity: int = 4096,
+    ) -> None:
+        self.embeddings = embeddings or evaluation_embeddings()
+        self.ticks = 0
+        self._interrupt_tick: Optional[int] = None
+        self._gap_total = 0
+        self._gap_count = 0
+        self._first_self: Optional[str] = None
+        self._self_total = 0
+        self._self_stable = 0
+        self._say_total = 0
+        self._say_payloads = _DistinctCounter(distinct_capacity)
+        self._calibration = MetacogTracker(retain=False)
+        self._previous: Optional[np.ndarray] = None
+        self._similarity_total = 0.0
+        self._similarity_count = 0
+
+    def observe(self, trace: TickTrace) -> None:
+        self.ticks += 1
+        if trace.action and trace.action.kind == "say":
+            self._say_total += 1
+            self._say_payloads.add(trace.action.payload)
+        if not trace.broadcast:
+            return
+        coalition = trace.broadcast.coalition
+        if "interruption" in coalition.full_text.lower():
+            self._interrupt_tick = trace.tick
+        elif self._interrupt_tick is not None:
+            self._gap_total += trace.tick - self._interrupt_tick
+            self._gap_count += 1
+            self._interrupt_tick = None
+        if coalition.source == "self_model":
+            if self._first_self is None:
+                self._first_self = coalition.summary
+            self._self_total += 1
+            self._self_stable += coalition.summary == self._first_self
+        self._calibration.observe(coalition.confidence, trace.metrics.get("actual", 1.0))
+        vector = self.embeddings.embed_one(coalition.full_text)
+        norm = float(np.linalg.norm(vector))
+        unit = vector / norm if norm else vector
+        if self._previous is not None:
+            self._similarity_total += float(unit @ self._previous)
+            self._similarity_count += 1
+        self._previous = unit
+
+    def observe_many(self, traces: Sequence[TickTrace]) -> None:
+        """Observe several traces, embedding their broadcasts in one batch."""
+
+        texts = [trace.broadcast.coalition.full_text for trace in traces if trace.broadcast]
+        if texts:
+            self.embeddings.embed(texts)
+        for trace in traces:
+            self.observe(trace)
+
+    def report(self) -> EvalReport:
+        metrics = {
+            "interruption_recovery": self._gap_total / self._gap_count if self._gap_count else 0.0,
+            "self_reference": self._self_stable / self._self_total if self._self_total else 1.0,
+            "wm_span": self._say_payloads.count() / self._say_total if self._say_total else 0.0,
+        }
+        metrics.update(self._calibration.metrics())
+        if self._similarity_count:
+            avg = self._similarity_total / self._similarity_count
+            metrics["narrative_coherence"] = max(0.0, min(1.0, (avg + 1.0) / 2.0))
+        else:
+            metrics["narrative_coherence"] = 1.0
+        return EvalReport(metrics=metrics, notes="Derived from in-run telemetry")
+
+
+def aggregate_from_traces(
+    traces: Iterable[TickTrace],
+    backend: LLMBackend | None = None,
+    embeddings: EmbeddingService | None = None,
+    chunk_size: int = 1024,
+) -> EvalReport:
+    """Evaluate a run in one pass with :class:`IncrementalEvaluator`.
+
+    Broadcast texts are embedded ``chunk_size`` at a time ahead of the
+    evaluator, so a backend sees a few batched calls rather than one per
+    tick, and texts already embedded by the loop come from the service cache.
+    """
+
+    if embeddings is None:
+        embeddings = EmbeddingService(backend) if backend is not None else evaluation_embeddings()
+    evaluator = IncrementalEvaluator(embeddings)
+    chunk: List[TickTrace] = []
+    for trace in traces:
+        chunk.append(trace)
+        if len(chunk) >= chunk_size:
+            evaluator.observe_many(chunk)
+            chunk = []
+    evaluator.observe_many(chunk)
+    return evaluator.report()
 
 
 def render_html_report(traces: List[TickTrace], report: EvalReport) -> str:
@@ -115,7 +257,9 @@ def render_html_report(traces: List[TickTrace], report: EvalReport) -> str:
 
 __all__ = [
     "EvalReport",
+    "IncrementalEvaluator",
     "aggregate_from_traces",
+    "evaluation_embeddings",
     "render_html_report",
     "run_calibration_metrics",
     "run_interruption_recovery",
@@ -85,8 +85,39 @@ class ChangeBlindnessTask:
     def apply_action(self, action: Action) -> None:
         pass
 
+    @classmethod
+    def generate(
+        cls, length: int, seed: int = 13, change_rate: float = 0.25
+    ) -> "ChangeBlindnessTask":
+        """Scene sequence where a random subset of scenes is subtly altered."""
+
+        rng = random.Random(seed)
+        scenes = []
+        for idx in range(length):
+            base = f"Scene {chr(ord('A') + idx % 4)}"
+            scenes.append(base + "*" if rng.random() < change_rate else base)
+        return cls(scenes=scenes, seed=seed)
+
+
+TASK_NAMES = ("interruption_count", "nback", "change_blindness")
+
+
+def make_task(name: str, length: int, seed: int):
+    """Build a task by name with its stimulus stream drawn from ``seed``."""
+
+    key = name.lower()
+    if key in {"interruption", "interruption_count"}:
+        return InterruptionCountingTask(length=length, interruption_rate=0.3, seed=seed)
+    if key in {"nback", "wm"}:
+        return NBackTask(n=2, length=length, seed=seed)
+    if key in {"change", "change_blindness"}:
+        return ChangeBlindnessTask.generate(length, seed=seed)
+    raise ValueError(f"Unknown task {name}")
+
 
 __all__ = [
+    "TASK_NAMES",
+    "make_task",
     "InterruptionCountingTask",
     "NBackTask",
     "ChangeBlindnessTask",
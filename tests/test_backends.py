@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from noema.core.backends.cache import CachingBackend
+from noema.core.backends.dummy import DummyBackend
+from noema.core.loop import ConsciousLoop
+from noema.core.types import Percept, RunConfig
+
+
+def test_cache_persists_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "responses.sqlite"
+    first = CachingBackend(DummyBackend(seed=1), path)
+    expected = first.generate("hello", system="sys", temperature=0.1, max_tokens=32)
+    assert first.generate("hello", system="sys", temperature=0.1, max_tokens=32) == expected
+    assert first.stats() == {"cache_hits": 1.0, "cache_misses": 1.0}
+    first.close()
+
+    second = CachingBackend(DummyBackend(seed=1), path, memory_items=0)
+    assert second.generate("hello", system="sys", temperature=0.1, max_tokens=32) == expected
+    assert second.hits == 1 and second.misses == 0
+    second.generate("hello", system="sys", temperature=0.2, max_tokens=32)
+    assert second.misses == 1
+
+
+def test_cache_file_is_shared_without_holding_locks(tmp_path: Path) -> None:
+    path = tmp_path / "shared.sqlite"
+    first = CachingBackend(DummyBackend(seed=1), path, memory_items=0)
+    second = CachingBackend(DummyBackend(seed=1), path, memory_items=0)
+    first.generate("hello")
+    assert second.generate("hello") == first.generate("hello")
+    assert not first._conn.in_transaction and not second._conn.in_transaction
+    second.generate("only second")
+    assert first.generate("only second") and first.hits == 2
+    first.close()
+    second.close()
+
+
+def test_cache_evicts_by_age_and_size(tmp_path: Path) -> None:
+    expiring = CachingBackend(DummyBackend(), tmp_path / "age.sqlite", max_age=-1.0)
+    expiring.generate("a")
+    expiring.generate("a")
+    assert expiring.hits == 0 and expiring.misses == 2
+
+    bounded = CachingBackend(DummyBackend(), tmp_path / "size.sqlite", max_entries=5)
+    for idx in range(20):
+        bounded.generate(f"prompt {idx}")
+    bounded.prune()
+    assert bounded._rows <= 5
+
+
+def test_cache_counters_reach_trace_metrics() -> None:
+    config = RunConfig(seed=3)
+    loop = ConsciousLoop(CachingBackend(DummyBackend(seed=config.seed)), config)
+    loop.run_workflow(Percept(content="hello", timestamp=0))
+    trace = loop.traces[-1]
+    assert trace.metrics["cache_misses"] >= 1.0
+    assert "cache_hits" in trace.metrics
+
+
+def test_recorded_bundle_replays_without_the_model(tmp_path) -> None:
+    from noema.artifacts.bundles import read_recording, replay
+    from noema.core.backends.recording import (
+        RecordingBackend,
+        ReplayBackend,
+        ReplayDivergenceError,
+    )
+
+    def run(backend, texts, bundle=None):
+        loop = ConsciousLoop(backend, RunConfig(seed=2))
+        if bundle is not None:
+            loop.open_bundle(bundle, segment_ticks=4)
+        for idx, text in enumerate(texts):
+            loop.run_workflow(Percept(content=text, timestamp=idx, salience_hint=0.4))
+        summaries = [t.broadcast.coalition.summary for t in loop.traces if t.broadcast]
+        loop.close()
+        return summaries
+
+    path = tmp_path / "run.run.noema"
+    recorder = RecordingBackend(DummyBackend(seed=2))
+    expected = run(recorder, ["alpha", "beta", "gamma"], bundle=path)
+    calls = read_recording(path)
+    assert len(calls) == recorder.recorded > 0 and recorder.calls == []
+    assert [call["seq"] for call in calls] == list(range(len(calls)))
+    assert replay(path)["manifest"]["recorded_calls"] == len(calls)
+
+    strict = ReplayBackend.from_bundle(path)
+    assert run(strict, ["alpha", "beta", "gamma"]) == expected
+    assert strict.replayed == len(calls) and strict.remaining == 0
+
+    with pytest.raises(ReplayDivergenceError):
+        run(ReplayBackend(calls), ["alpha", "delta"])
+
+    live = RecordingBackend(DummyBackend(seed=2))
+    fallthrough = ReplayBackend(calls, live=live, strict=False)
+    run(fallthrough, ["alpha", "delta"])
+    assert fallthrough.live_calls == live.recorded > 0
+    assert fallthrough.replayed > 0
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from noema.core.backends.dummy import DummyBackend
+from noema.core.embeddings import default_embeddings
 from noema.core.loop import ConsciousLoop
 from noema.core.types import Percept, RunConfig
 from noema.tasks.evaluations import aggregate_from_traces
@@ -23,3 +24,71 @@ def test_evaluation_metrics_are_bounded() -> None:
     }
     for value in report.metrics.values():
         assert 0.0 <= value <= 5.0
+
+
+def test_battery_results_do_not_depend_on_worker_count() -> None:
+    from noema.tasks.battery import run_battery, summarise_battery
+
+    progress = []
+    serial = run_battery(["nback", "interruption_count"], [2, 1], ticks=6, workers=1)
+    parallel = run_battery(
+        ["interruption_count", "nback"],
+        [1, 2],
+        ticks=6,
+        workers=2,
+        on_result=lambda result, done, total: progress.append((done, total)),
+    )
+    assert [(r.task, r.seed) for r in serial] == [
+        ("interruption_count", 1),
+        ("interruption_count", 2),
+        ("nback", 1),
+        ("nback", 2),
+    ]
+    assert [r.metrics for r in serial] == [r.metrics for r in parallel]
+    assert sorted(progress) == [(done, 4) for done in range(1, 5)]
+
+    summary = summarise_battery(serial)["nback"]["brier"]
+    assert summary.n == 2
+    assert summary.low <= summary.mean <= summary.high
+
+
+def test_battery_evaluates_with_backend_embeddings() -> None:
+    from noema.tasks.battery import BatteryRun, run_one
+    from noema.tasks.microworlds import make_task
+
+    result = run_one(BatteryRun("nback", 3, 6))
+    loop = ConsciousLoop(DummyBackend(seed=3), RunConfig(seed=3))
+    env = make_task("nback", 6, 3)
+    while (percept := env.next_percept()) is not None:
+        env.apply_action(loop.run_workflow(percept).action)
+    expected = aggregate_from_traces(loop.traces, DummyBackend(seed=3)).metrics
+    assert result.metrics["narrative_coherence"] == expected["narrative_coherence"]
+    # Without a backend, scoring falls back to DummyBackend vectors as before.
+    assert aggregate_from_traces(loop.traces).metrics == expected
+    hashed = aggregate_from_traces(loop.traces, embeddings=default_embeddings()).metrics
+    assert hashed != expected
+
+
+def test_ablation_sweep_compares_subsets_against_full_model() -> None:
+    from noema.core.types import ProcessName
+    from noema.tasks.ablations import (
+        ablation_subsets,
+        ablation_table,
+        format_ablation_table,
+        run_ablation_sweep,
+    )
+
+    assert len(ablation_subsets()) == 2 ** len(ProcessName)
+    subsets = ablation_subsets([ProcessName.CRITIC, ProcessName.REFLECTOR])
+    assert subsets[0] == () and len(subsets) == 4
+
+    serial = run_ablation_sweep(subsets, [1, 2], ticks=5, workers=1)
+    parallel = run_ablation_sweep(subsets, [1, 2], ticks=5, workers=3)
+    assert [(r.disabled, r.seed, r.metrics) for r in serial] == [
+        (r.disabled, r.seed, r.metrics) for r in parallel
+    ]
+
+    rows = ablation_table(serial)
+    assert [row.disabled for row in rows] == subsets
+    assert all(delta.mean == 0.0 for delta in rows[0].deltas.values())
+    assert "(full model)" in format_ablation_table(rows)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import zipfile
+
+import pytest
+
+from noema.artifacts.bundles import recover_bundle, replay
+from noema.core.backends.dummy import DummyBackend
+from noema.core.loop import ConsciousLoop
+from noema.core.types import Percept, RunConfig
+
+
+def _loop(seed: int = 3) -> ConsciousLoop:
+    config = RunConfig(seed=seed)
+    return ConsciousLoop(DummyBackend(seed=config.seed), config)
+
+
+def _run(loop: ConsciousLoop, ticks: int) -> None:
+    for tick in range(ticks):
+        loop.ingest(Percept(content=f"stimulus {tick}", timestamp=tick, salience_hint=0.4))
+        loop.tick()
+
+
+def test_bundle_writer_appends_segments_while_running(tmp_path) -> None:
+    path = tmp_path / "run.noema"
+    loop = _loop()
+    writer = loop.open_bundle(path, segment_ticks=4)
+    _run(loop, 10)
+    assert [segment["count"] for segment in writer.segments] == [4, 4]
+    loop.close()
+
+    data = replay(path)
+    assert [item["tick"] for item in data["traces"]] == list(range(1, 11))
+    assert data["manifest"]["ticks"] == 10
+    assert [segment["first_tick"] for segment in data["manifest"]["segments"]] == [1, 5, 9]
+    with zipfile.ZipFile(path) as archive:
+        assert "report.html" in archive.namelist()
+
+
+def test_recover_bundle_up_to_last_complete_segment(tmp_path) -> None:
+    path = tmp_path / "run.noema"
+    loop = _loop()
+    loop.open_bundle(path, segment_ticks=4)
+    _run(loop, 10)
+    # Simulate a crash: take the bytes on disk without closing the writer,
+    # then tear the file in the middle of the second segment.
+    crashed = path.read_bytes()
+    (tmp_path / "crashed.noema").write_bytes(crashed)
+    (tmp_path / "torn.noema").write_bytes(crashed[: len(crashed) - 20])
+
+    recovered = replay(recover_bundle(tmp_path / "crashed.noema"))
+    assert recovered["manifest"]["recovered"] is True
+    assert [item["tick"] for item in recovered["traces"]] == list(range(1, 9))
+    assert recovered["config"]["seed"] == 3
+
+    torn = replay(recover_bundle(tmp_path / "torn.noema", tmp_path / "out.noema"))
+    assert [item["tick"] for item in torn["traces"]] == [1, 2, 3, 4]
+    loop.close()
+
+
+def test_replay_reads_legacy_traces_json(tmp_path) -> None:
+    path = tmp_path / "legacy.noema"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({"run_id": "old", "seed": 1}))
+        archive.writestr("config.json", json.dumps({"seed": 1}))
+        archive.writestr("traces.json", json.dumps([{"tick": 1}, {"tick": 2}]))
+    assert [item["tick"] for item in replay(path)["traces"]] == [1, 2]
+
+
+def test_bundle_reader_random_access_and_ranges(tmp_path) -> None:
+    from noema.artifacts.bundles import BundleReader
+
+    path = tmp_path / "run.noema"
+    loop = _loop()
+    loop.open_bundle(path, segment_ticks=8)
+    _run(loop, 30)
+    loop.close()
+
+    with BundleReader(path, cache_segments=1) as bundle:
+        assert len(bundle) == 30
+        assert (bundle.first_tick, bundle.last_tick) == (1, 30)
+        assert bundle[30]["tick"] == 30
+        assert bundle[9]["tick"] == 9
+        assert [item["tick"] for item in bundle.ticks(7, 19)] == list(range(7, 19))
+        assert [item["tick"] for item in bundle.ticks(29)] == [29, 30]
+        assert [item["tick"] for item in bundle] == list(range(1, 31))
+        assert len(bundle._cache) == 1
+        with pytest.raises(KeyError):
+            bundle[31]
+
+
+def test_columnar_segments_round_trip_traces_and_metrics(tmp_path) -> None:
+    import numpy as np
+
+    from noema.artifacts.bundles import FORMAT_VERSION, read_metrics
+    from noema.artifacts.traces import serialise_trace
+
+    path = tmp_path / "run.noema"
+    loop = _loop()
+    loop.open_bundle(path, segment_ticks=6)
+    _run(loop, 15)
+    expected = [serialise_trace(trace) for trace in loop.traces]
+    loop.close()
+
+    data = replay(path)
+    assert data["manifest"]["format_version"] == FORMAT_VERSION
+    assert all(segment["columns"] for segment in data["manifest"]["segments"])
+    assert data["traces"] == json.loads(json.dumps(expected))
+
+    series = read_metrics(path)
+    assert series["tick"].tolist() == list(range(1, 16))
+    brier = [item["metrics"]["brier"] for item in expected]
+    assert np.allclose(series["brier"], brier)
+    confidences = [item["broadcast"]["confidence"] for item in expected]
+    assert series["confidence"].tolist() == confidences
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+
+import pytest
+
 from noema.core.backends.dummy import DummyBackend
 from noema.core.loop import ConsciousLoop, WorkflowResult
 from noema.core.types import Percept, RunConfig
+from noema.core.workspace import workspace_at, workspace_states
 
 
 def _run_loop(seed: int) -> list[str]:
@@ -51,3 +56,422 @@ def test_run_workflow_consumes_pending_percepts() -> None:
     assert len(result.percepts) == 2
     assert loop.pending_percepts() == []
     assert len(result.traces) >= 2
+
+
+def test_concurrent_and_batched_proposals_match_serial() -> None:
+    def run(workers: int, batch: bool = False) -> list[tuple]:
+        config = RunConfig(seed=9, proposal_workers=workers, batch_generate=batch)
+        loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+        for tick in range(6):
+            loop.ingest(Percept(content=f"stimulus {tick}", timestamp=tick, salience_hint=0.4))
+            loop.tick()
+        loop.close()
+        return [
+            (
+                trace.broadcast.coalition.summary if trace.broadcast else None,
+                [c.summary for c in state],
+                {
+                    name: [c.summary for c in items]
+                    for name, items in trace.processes_considered.items()
+                },
+                list(trace.processes_considered),
+            )
+            for trace, state in zip(loop.traces, workspace_states(loop.traces))
+        ]
+
+    serial = run(1)
+    assert run(4) == serial
+    assert run(1, batch=True) == serial
+
+
+def test_arun_workflow_matches_sync() -> None:
+    def summaries(result) -> list[str]:
+        return [broadcast.coalition.summary for broadcast in result.broadcasts()]
+
+    config = RunConfig(seed=6, workflow_ticks=2)
+    sync_loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+    async_loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+
+    async def drive() -> list[str]:
+        collected: list[str] = []
+        for idx in range(4):
+            result = await async_loop.arun_workflow(Percept(content=f"msg {idx}", timestamp=idx))
+            collected.extend(summaries(result))
+        return collected
+
+    expected: list[str] = []
+    for idx in range(4):
+        result = sync_loop.run_workflow(Percept(content=f"msg {idx}", timestamp=idx))
+        expected.extend(summaries(result))
+    assert asyncio.run(drive()) == expected
+    assert async_loop.tick_id == sync_loop.tick_id
+
+
+def test_concurrent_arun_workflow_calls_are_serialised() -> None:
+    config = RunConfig(seed=6, workflow_ticks=3)
+    loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+
+    async def drive():
+        return await asyncio.gather(
+            *(loop.arun_workflow(Percept(content=f"msg {idx}", timestamp=idx)) for idx in range(4))
+        )
+
+    results = asyncio.run(drive())
+    ticks = [[trace.tick for trace in result.traces] for result in results]
+    assert sorted(ticks) == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]]
+    assert sorted(result.percepts[0].content for result in results) == [
+        f"msg {idx}" for idx in range(4)
+    ]
+    assert all(len(result.percepts) == 1 for result in results)
+
+
+def test_workspace_matches_sorted_reference() -> None:
+    import random
+
+    from noema.core.types import Coalition
+    from noema.core.workspace import Workspace
+
+    rng = random.Random(1)
+    workspace = Workspace(capacity=5)
+    reference: list[Coalition] = []
+    for idx in range(200):
+        coalition = Coalition(
+            summary=f"c{idx}",
+            full_text=f"c{idx}",
+            salience=rng.choice([0.1, 0.4, 0.4, 0.9, 1.2, 2.0]),
+            source="test",
+            confidence=0.5,
+        )
+        version = workspace.version
+        snapshot = workspace.state()
+        reference.append(coalition)
+        reference.sort(key=lambda c: c.bounded_salience, reverse=True)
+        reference = reference[:5]
+        workspace.consider(coalition)
+        assert [c.summary for c in workspace.state()] == [c.summary for c in reference]
+        if workspace.version == version:
+            assert workspace.state() is snapshot
+
+
+def test_vectorised_attention_matches_scalar_reference() -> None:
+    import hashlib
+    import math
+    import random
+
+    from noema.core.attention import Attention
+    from noema.core.embeddings import hash_embedding
+    from noema.core.types import Coalition
+
+    def cosine(a: list[float], b: list[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b)))
+
+    def reference(candidates: list[Coalition], ws: list[Coalition], seed: int) -> Coalition:
+        scored = []
+        for coalition in candidates:
+            novelty = 1.0
+            if ws:
+                vector = hash_embedding(coalition.summary)
+                sims = [cosine(vector, hash_embedding(c.summary)) for c in ws]
+                novelty = max(0.1, 1.0 - sum(sims) / len(sims))
+            scored.append((coalition.bounded_salience * novelty, coalition))
+
+        def key(item: tuple[float, Coalition]) -> float:
+            digest = hashlib.md5((item[1].summary + str(seed)).encode("utf-8")).digest()
+            return item[0] + int.from_bytes(digest[:4], "big") / 2**32 * 1e-3
+
+        scored.sort(key=key, reverse=True)
+        return scored[0][1]
+
+    rng = random.Random(4)
+    attention = Attention(seed=4)
+
+    def make(idx: int) -> Coalition:
+        return Coalition(
+            summary=f"item {rng.randint(0, 30)}",
+            full_text=str(idx),
+            salience=rng.uniform(0.0, 1.6),
+            source="test",
+            confidence=0.5,
+        )
+
+    for idx in range(100):
+        candidates = [make(idx) for _ in range(rng.randint(1, 6))]
+        ws = [make(idx) for _ in range(rng.randint(0, 7))]
+        assert attention.select(candidates, tuple(ws)) is reference(candidates, ws, 4)
+
+
+def test_dummy_backend_winners_match_hash_attention_baseline() -> None:
+    import hashlib
+
+    from noema.tasks.microworlds import InterruptionCountingTask
+
+    loop = ConsciousLoop(DummyBackend(seed=11), RunConfig(seed=11))
+    task = InterruptionCountingTask(length=60, interruption_rate=0.3, seed=11)
+    winners = []
+    while (percept := task.next_percept()) is not None:
+        loop.ingest(percept)
+        broadcast = loop.tick().broadcast
+        winners.append(
+            f"{broadcast.coalition.source}:{broadcast.coalition.summary}" if broadcast else "-"
+        )
+    assert loop.controller.attention.embeddings is not loop.controller.eval_embeddings
+    assert winners[:3] == [
+        "planner:Plan: Next step towards Maintain coherent dialogue via initial step",
+        "self_model:Self: Noema Agent",
+        "perception:Count 2",
+    ]
+    digest = hashlib.sha256("\n".join(winners).encode()).hexdigest()
+    assert digest == "c75f3c23cc17487688e875704d85abd1f08f2cec20306e09489d3a8281322bc4"
+
+    backend = DummyBackend(seed=11)
+    opted_in = ConsciousLoop(backend, RunConfig(seed=11, episodic_embeddings="backend"))
+    assert opted_in.controller.episodic.embeddings.backend is backend
+    assert opted_in.controller.attention.embeddings.backend is None
+
+
+def test_streaming_mode_bounds_memory_and_matches_full_eval(tmp_path) -> None:
+    import math
+
+    from noema.artifacts.traces import deserialise_trace, read_spill, serialise_trace
+    from noema.tasks.evaluations import (
+        aggregate_from_traces,
+        run_calibration_metrics,
+        run_interruption_recovery,
+        run_narrative_coherence,
+        run_self_reference_stability,
+        run_working_memory_span,
+    )
+    from noema.tasks.microworlds import InterruptionCountingTask
+
+    def run(config: RunConfig) -> ConsciousLoop:
+        loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+        task = InterruptionCountingTask(length=60, interruption_rate=0.3, seed=1)
+        while (percept := task.next_percept()) is not None:
+            loop.ingest(percept)
+            loop.tick()
+        return loop
+
+    spill = tmp_path / "traces.jsonl"
+    full = run(RunConfig(seed=4))
+    streamed = run(
+        RunConfig(
+            seed=4,
+            streaming=True,
+            trace_buffer=8,
+            trace_spill_path=str(spill),
+            episodic_max_items=16,
+        )
+    )
+    assert len(streamed.traces) == 8
+    assert len(streamed.controller.narrative.entries) == 8
+    assert len(streamed.controller.episodic) == 16
+    assert streamed.controller.metacog._recent is None
+    assert streamed.evaluator._calibration._recent is None
+    assert streamed.evaluator._calibration.count == 60
+    expected = {
+        "interruption_recovery": run_interruption_recovery(full.traces),
+        "self_reference": run_self_reference_stability(full.traces),
+        "wm_span": run_working_memory_span(full.traces),
+        "narrative_coherence": run_narrative_coherence(full.traces, full.backend),
+        **run_calibration_metrics(full.traces),
+    }
+    assert full.eval().metrics == aggregate_from_traces(full.traces, full.backend).metrics
+    actual = streamed.eval().metrics
+    assert expected.keys() == actual.keys()
+    for key, value in expected.items():
+        assert math.isclose(value, actual[key], rel_tol=1e-9, abs_tol=1e-12), key
+
+    streamed.close()
+    spilled = list(read_spill(spill))
+    assert [item["tick"] for item in spilled] == [trace.tick for trace in full.traces]
+    restored = [deserialise_trace(item) for item in spilled]
+    assert [serialise_trace(trace) for trace in restored] == spilled
+    assert [serialise_trace(trace) for trace in full.traces] == spilled
+
+
+def test_workspace_deltas_rebuild_full_states() -> None:
+    import json
+
+    from noema.artifacts.traces import serialise_trace, serialised_workspace_states
+
+    def run(interval: int) -> ConsciousLoop:
+        config = RunConfig(seed=5, workspace_capacity=4, workspace_keyframe_interval=interval)
+        loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+        for tick in range(40):
+            loop.ingest(Percept(content=f"stimulus {tick % 7}", salience_hint=(tick % 5) / 4))
+            loop.tick()
+        return loop
+
+    def dump(state) -> list[dict]:
+        return [c.model_dump() for c in state]
+
+    full = run(1)
+    delta = run(10)
+    expected = [dump(trace.workspace_state) for trace in full.traces]
+    assert all(trace.workspace_delta.keyframe for trace in full.traces)
+    assert [trace.workspace_state is not None for trace in delta.traces] == [
+        idx % 10 == 0 for idx in range(40)
+    ]
+    assert [dump(state) for state in workspace_states(delta.traces)] == expected
+    assert dump(workspace_at(delta.traces, 37)) == expected[37]
+    assert dump(workspace_at(delta.traces, -1)) == expected[-1]
+
+    serialised = [serialise_trace(trace) for trace in delta.traces]
+    rebuilt = serialised_workspace_states(json.loads(json.dumps(serialised)))
+    assert [dump(state) for state in rebuilt] == expected
+    full_deltas = [serialise_trace(trace)["workspace_delta"] for trace in full.traces]
+    full_size = len(json.dumps(full_deltas))
+    delta_size = len(json.dumps([item["workspace_delta"] for item in serialised]))
+    assert delta_size * 2 < full_size
+
+
+def _drive(loop, env, ticks: int) -> None:
+    for _ in range(ticks):
+        percept = env.next_percept()
+        if percept is None:
+            break
+        result = loop.run_workflow(percept)
+        env.apply_action(result.action)
+
+
+def _summaries(traces):
+    return [
+        (trace.tick, trace.broadcast.coalition.summary if trace.broadcast else None, trace.metrics)
+        for trace in traces
+    ]
+
+
+def test_checkpoint_restore_and_fork_continue_identically(tmp_path) -> None:
+    from noema.artifacts.checkpoints import fork_loop
+    from noema.tasks.microworlds import NBackTask
+
+    config = RunConfig(seed=4)
+    loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+    env = NBackTask(n=2, length=20, seed=4)
+    _drive(loop, env, 8)
+    path = loop.checkpoint(tmp_path / "warm.ckpt", task=env)
+    forked, forked_env = fork_loop(loop, env)
+    episodes = len(loop.controller.episodic)
+
+    _drive(loop, env, 8)
+    expected = _summaries(loop.traces)
+    assert len(forked.controller.episodic) == episodes
+    assert forked.tick_id == 8 * config.workflow_ticks
+
+    restored, restored_env = ConsciousLoop.restore(path, DummyBackend(seed=config.seed))
+    assert restored_env.index == 8
+    for branch, branch_env in ((restored, restored_env), (forked, forked_env)):
+        _drive(branch, branch_env, 8)
+        assert _summaries(branch.traces) == expected
+        assert branch.eval().metrics == loop.eval().metrics
+        branch.close()
+    loop.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+def test_checkpoint_snapshots_disk_episodic_store(tmp_path, backend) -> None:
+    from noema.tasks.microworlds import NBackTask
+
+    live_path = tmp_path / f"episodes.{backend}"
+    config = RunConfig(seed=5, episodic_backend=backend, episodic_path=str(live_path))
+    loop = ConsciousLoop(DummyBackend(seed=config.seed), config)
+    env = NBackTask(n=2, length=20, seed=5)
+    _drive(loop, env, 4)
+    episodes = len(loop.controller.episodic)
+    path = loop.checkpoint(tmp_path / "disk.ckpt", task=env)
+    _drive(loop, env, 4)
+    assert len(loop.controller.episodic) > episodes
+
+    restored, _ = ConsciousLoop.restore(path, DummyBackend(seed=config.seed))
+    store = restored.controller.episodic
+    assert str(store.path) != str(live_path)
+    assert restored.config.episodic_path == str(store.path)
+    assert len(store) == episodes
+    restored.close()
+    loop.close()
+
+
+def test_episodic_fork_is_copy_on_write(tmp_path) -> None:
+    from noema.core.memory import InMemoryEpisodic, SqliteEpisodic
+    from noema.core.types import Coalition
+
+    def coalition(text: str) -> Coalition:
+        return Coalition(summary=text, full_text=text, salience=0.5, source="t", confidence=0.5)
+
+    store = InMemoryEpisodic()
+    for idx in range(4):
+        store.add(coalition(f"episode {idx}"))
+    fork = store.fork()
+    assert fork._matrix._data is store._matrix._data
+    fork.add(coalition("only in fork"))
+    assert fork._matrix._data is not store._matrix._data
+    assert len(store) == 4 and len(fork) == 5
+    assert store.search("only in fork", limit=5)[0][0] != "only in fork"
+    assert fork.search("only in fork", limit=1)[0][0] == "only in fork"
+
+    sqlite_store = SqliteEpisodic(tmp_path / "episodes.sqlite")
+    with pytest.raises(NotImplementedError):
+        sqlite_store.fork()
+    sqlite_store.close()
+
+
+def test_proposal_memo_skips_unchanged_inputs_within_ttl() -> None:
+    from noema.core.backends.recording import RecordingBackend
+    from noema.core.types import ProcessName
+    from noema.tasks.microworlds import NBackTask
+
+    def run(ttl):
+        config = RunConfig(seed=7)
+        config.proposal_ttl = ttl
+        backend = RecordingBackend(DummyBackend(seed=7))
+        loop = ConsciousLoop(backend, config)
+        _drive(loop, NBackTask(n=2, length=12), 12)
+        return backend, loop
+
+    fresh_backend, fresh = run({})
+    memo_backend, memo = run({ProcessName.SELF_MODEL: 3, ProcessName.PLANNER: 3})
+    assert [t.broadcast.coalition.summary for t in memo.traces] == [
+        t.broadcast.coalition.summary for t in fresh.traces
+    ]
+    reused = [trace.metrics["proposals_reused"] for trace in memo.traces]
+    assert sum(reused) == memo.controller.memo.reused > 0
+    assert memo_backend.recorded == fresh_backend.recorded - sum(reused)
+    assert all("proposals_reused" not in trace.metrics for trace in fresh.traces)
+
+    # A TTL of one tick means an entry can never be reused.
+    _, expired = run({ProcessName.SELF_MODEL: 1, ProcessName.PLANNER: 1})
+    assert expired.controller.memo.reused == 0
+
+
+def test_adaptive_scheduler_backs_off_losing_processes_with_a_floor() -> None:
+    from noema.artifacts.traces import serialise_trace
+    from noema.core.types import ProcessName
+    from noema.tasks.microworlds import InterruptionCountingTask
+
+    config = RunConfig(seed=7, adaptive_scheduling=True, scheduler_max_interval=4)
+    loop = ConsciousLoop(DummyBackend(seed=7), config)
+    _drive(loop, InterruptionCountingTask(length=30, seed=7), 30)
+
+    traces = list(loop.traces)
+    generative = {ProcessName.PLANNER, ProcessName.REFLECTOR, ProcessName.SELF_MODEL}
+    assert all(set(trace.schedule) == generative for trace in traces)
+    assert all(ProcessName.CRITIC in t.processes_considered for t in traces)
+    assert all(d.reason == "warmup" for t in traces[:6] for d in t.schedule.values())
+    skipped = [t for t in traces if not t.schedule[ProcessName.REFLECTOR].run]
+    assert skipped and all(not t.processes_considered[ProcessName.REFLECTOR] for t in skipped)
+    assert all(t.schedule[ProcessName.REFLECTOR].reason == "backoff" for t in skipped)
+    for name in generative:
+        ran = [t.tick for t in traces if t.schedule[name].run]
+        assert max(b - a for a, b in zip(ran, ran[1:])) <= config.scheduler_max_interval
+
+    data = serialise_trace(skipped[0])
+    assert data["schedule"]["reflector"]["run"] is False
+    loop.close()
+
+    config.scheduler_wake_on_workspace_change = True
+    woken = ConsciousLoop(DummyBackend(seed=7), config)
+    _drive(woken, InterruptionCountingTask(length=30, seed=7), 30)
+    reasons = [d.reason for t in woken.traces for d in t.schedule.values()]
+    assert "workspace" in reasons and "backoff" in reasons
+    woken.close()
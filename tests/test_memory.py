@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import math
+
+from noema.core.embeddings import hash_embedding
+from noema.core.memory import InMemoryEpisodic
+from noema.core.types import Coalition
+
+
+def _coalition(text: str) -> Coalition:
+    return Coalition(summary=text[:20], full_text=text, salience=0.5, source="test", confidence=0.5)
+
+
+def _brute_force(texts: list[str], query: str, limit: int) -> list[str]:
+    def cosine(a: list[float], b: list[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b)))
+
+    query_vec = hash_embedding(query)
+    scored = [(cosine(query_vec, hash_embedding(text)), text) for text in texts]
+    return [text for _, text in sorted(scored, key=lambda item: item[0], reverse=True)[:limit]]
+
+
+def test_in_memory_search_matches_brute_force() -> None:
+    store = InMemoryEpisodic()
+    texts = [f"episode {idx}" for idx in range(300)]
+    for text in texts:
+        store.add(_coalition(text))
+    queries = ["episode 3", "something else", "episode 299"]
+    batched = store.search_many(queries, limit=7)
+    for query, results in zip(queries, batched):
+        assert [text for text, _ in results] == _brute_force(texts, query, 7)
+        single = store.search(query, limit=7)
+        assert [text for text, _ in single] == [text for text, _ in results]
+        assert all(abs(a - b) < 1e-5 for (_, a), (_, b) in zip(single, results))
+        scores = [score for _, score in results]
+        assert scores == sorted(scores, reverse=True)
+    assert store.search("episode 3", limit=1)[0][0] == "episode 3"
+    assert len(store.search("x", limit=1000)) == 300
+    assert InMemoryEpisodic().search("anything") == []
+
+
+def test_ivf_store_recall_and_persistence(tmp_path) -> None:
+    from noema.core.memory import IVFEpisodic
+
+    path = tmp_path / "episodes.npz"
+    exact = InMemoryEpisodic()
+    approx = IVFEpisodic(path, nprobe=64, nlist=16, min_train_size=200)
+    for idx in range(500):
+        exact.add(_coalition(f"episode {idx}"))
+        approx.add(_coalition(f"episode {idx}"))
+    assert approx.index.is_trained
+    queries = [f"episode {idx}" for idx in range(0, 500, 50)]
+    def texts(batch: list[list[tuple[str, float]]]) -> list[list[str]]:
+        return [[text for text, _ in results] for results in batch]
+
+    assert texts(approx.search_many(queries, 5)) == texts(exact.search_many(queries, 5))
+
+    approx.close()
+    reloaded = IVFEpisodic(path, nprobe=64, nlist=16, min_train_size=200)
+    assert len(reloaded) == 500
+    assert reloaded.index.is_trained
+    assert texts([reloaded.search("episode 250", 3)]) == texts([approx.search("episode 250", 3)])
+
+
+def test_sqlite_store_migrates_json_and_caches(tmp_path) -> None:
+    import json
+    import sqlite3
+
+    from noema.core.memory import SqliteEpisodic
+
+    path = tmp_path / "episodes.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE episodes (text TEXT NOT NULL, embedding BLOB NOT NULL)")
+    legacy.execute(
+        "INSERT INTO episodes VALUES (?, ?)", ("legacy", json.dumps(hash_embedding("legacy")))
+    )
+    legacy.commit()
+    legacy.close()
+
+    store = SqliteEpisodic(path, commit_every=1000, commit_interval=3600)
+    assert store.search("legacy", 1)[0][0] == "legacy"
+    for idx in range(10):
+        store.add(_coalition(f"episode {idx}"))
+    assert store.search("episode 4", 1)[0][0] == "episode 4"
+    store.close()
+
+    check = sqlite3.connect(path)
+    assert check.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    kinds = {row[0] for row in check.execute("SELECT typeof(embedding) FROM episodes")}
+    assert kinds == {"blob"}
+    check.close()
+    reopened = SqliteEpisodic(path)
+    assert len(reopened) == 11
+    assert reopened.search("episode 9", 1)[0][0] == "episode 9"
+    reopened.close()
+
+
+def test_sqlite_store_commits_on_exit_and_collection(tmp_path) -> None:
+    import gc
+
+    from noema.core.memory import SqliteEpisodic
+
+    path = tmp_path / "episodes.db"
+    with SqliteEpisodic(path, commit_every=1000, commit_interval=3600) as store:
+        store.add(_coalition("inside context"))
+    store = SqliteEpisodic(path, commit_every=1000, commit_interval=3600)
+    store.add(_coalition("never closed"))
+    del store
+    gc.collect()
+    reopened = SqliteEpisodic(path)
+    assert sorted(reopened._texts) == ["inside context", "never closed"]
+    reopened.close()
+    reopened.close()
+
+
+def test_duckdb_store_searches_in_engine(tmp_path) -> None:
+    import pytest
+
+    pytest.importorskip("duckdb")
+    from noema.core.memory import DuckDBEpisodic, SqliteEpisodic
+
+    legacy_path = tmp_path / "episodes.duckdb"
+    legacy = SqliteEpisodic(legacy_path)
+    legacy.add(_coalition("from sqlite"))
+    legacy.close()
+
+    store = DuckDBEpisodic(legacy_path, batch_size=16)
+    reference = InMemoryEpisodic()
+    reference.add(_coalition("from sqlite"))
+    for idx in range(100):
+        store.add(_coalition(f"episode {idx % 40}"))
+        reference.add(_coalition(f"episode {idx % 40}"))
+    assert len(store) == 101
+    queries = ["episode 3", "from sqlite"]
+    batched = store.search_many(queries, 4)
+    for query, results in zip(queries, batched):
+        expected = [text for text, _ in reference.search(query, 4)]
+        assert [text for text, _ in results] == expected
+        assert [text for text, _ in store.search(query, 4)] == expected
+    assert store.text_frequencies(1)[0][1] == 3
+    store.close()
+    with DuckDBEpisodic(legacy_path, batch_size=1000) as reopened:
+        assert len(reopened) == 101
+        reopened.add(_coalition("buffered at exit"))
+    with DuckDBEpisodic(legacy_path) as reopened:
+        assert len(reopened) == 102
+
+
+def test_hash_embeddings_are_stable_across_processes() -> None:
+    import os
+    import subprocess
+    import sys
+
+    script = "from noema.core.embeddings import hash_embedding; print(hash_embedding('noema')[:3])"
+    outputs = set()
+    for salt in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=salt)
+        result = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        )
+        outputs.add(result.stdout.strip())
+    assert outputs == {str(hash_embedding("noema")[:3])}
+
+
+def test_embedding_service_batches_chunks_and_caches(tmp_path) -> None:
+    from noema.core.embeddings import EmbeddingService
+
+    class CountingBackend:
+        name = "counting"
+        model = "unit"
+
+        def __init__(self) -> None:
+            self.calls: list[list[str]] = []
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            self.calls.append(list(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+
+    backend = CountingBackend()
+    service = EmbeddingService(backend, tmp_path / "emb.sqlite", batch_size=2, max_chars=4)
+    vectors = service.embed(["ab", "abcdef", "ab"])
+    # "abcdef" splits into "abcd" + "ef"; the duplicate "ab" is embedded once.
+    assert backend.calls == [["ab", "abcd"], ["ef"]]
+    assert vectors[0].tolist() == vectors[2].tolist() == [2.0, 1.0]
+    assert vectors[1].tolist() == [(4 * 4 + 2 * 2) / 6, 1.0]
+    service.close()
+
+    reopened = EmbeddingService(CountingBackend(), tmp_path / "emb.sqlite")
+    assert reopened.embed(["abcdef"]).tolist() == [vectors[1].tolist()]
+    assert reopened.backend.calls == []
+    reopened.close()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from noema.instruments.metacog import (
     MetacogTracker,
     brier_score,
@@ -21,3 +23,43 @@ def test_tracker_accumulates() -> None:
     metrics = tracker.metrics()
     assert set(metrics.keys()) == {"brier", "ece", "wrong_high_conf"}
     assert metrics["wrong_high_conf"] == wrong_at_high_conf([(0.9, 1.0), (0.2, 0.0)])
+
+
+def test_incremental_tracker_matches_batch_metrics() -> None:
+    import random
+
+    rng = random.Random(0)
+    pairs = [(rng.random(), float(rng.random() > 0.4)) for _ in range(500)]
+    tracker = MetacogTracker(retain=True)
+    for pred, actual in pairs:
+        tracker.observe(pred, actual)
+    metrics = tracker.metrics()
+    assert metrics["brier"] == brier_score(pairs)
+    assert abs(metrics["ece"] - expected_calibration_error(pairs)) < 1e-12
+    assert metrics["wrong_high_conf"] == wrong_at_high_conf(pairs)
+    assert tracker.count == 500
+    assert tracker.observations == pairs
+    unretained = MetacogTracker()
+    unretained.observe(0.5, 1.0)
+    assert unretained.count == 1
+    with pytest.raises(RuntimeError):
+        _ = unretained.observations
+
+
+def test_sliding_window_and_per_source() -> None:
+    tracker = MetacogTracker(window=3)
+    observed = [
+        (0.9, 0.0, "planner"),
+        (0.2, 0.0, "critic"),
+        (0.85, 1.0, "planner"),
+        (0.6, 1.0, "critic"),
+    ]
+    for pred, actual, source in observed:
+        tracker.observe(pred, actual, source=source)
+    recent = [(pred, actual) for pred, actual, _ in observed[-3:]]
+    assert tracker.observations == recent
+    metrics = tracker.metrics()
+    assert abs(metrics["brier"] - brier_score(recent)) < 1e-12
+    assert metrics["wrong_high_conf"] == wrong_at_high_conf(recent)
+    assert tracker.metrics_for("planner")["wrong_high_conf"] == 0.0
+    assert tracker.sources() == ["critic", "planner"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from noema.core.types import Action, Broadcast, Coalition, TickTrace
+from noema.reporting.html_report import MinMaxDownsampler, render_report, save_report
+from noema.tasks.evaluations import EvalReport
+
+
+def _traces(count: int) -> list[TickTrace]:
+    traces = []
+    for tick in range(1, count + 1):
+        coalition = Coalition(
+            summary=f"<b>summary {tick}</b>",
+            full_text=f"text {tick}",
+            salience=0.5,
+            source="planner",
+            confidence=(tick % 10) / 10,
+        )
+        traces.append(
+            TickTrace(
+                tick=tick,
+                broadcast=Broadcast(coalition=coalition, tick=tick),
+                workspace_state=(),
+                processes_considered={},
+                action=Action(kind="say", payload=f"step {tick}", confidence=0.5),
+                metrics={"brier": tick / count},
+            )
+        )
+    return traces
+
+
+def test_downsampler_keeps_extremes_in_bounded_buckets() -> None:
+    sampler = MinMaxDownsampler(max_buckets=16)
+    for tick in range(1, 1001):
+        sampler.add(tick, {"value": float(tick % 97)})
+    assert len(sampler.buckets) <= 16
+    assert sum(bucket.count for bucket in sampler.buckets) == 1000
+    assert min(bucket.lows["value"] for bucket in sampler.buckets) == 0.0
+    assert max(bucket.highs["value"] for bucket in sampler.buckets) == 96.0
+
+
+def test_report_index_size_does_not_grow_with_ticks(tmp_path) -> None:
+    report = EvalReport(metrics={"brier": 0.1})
+    small = save_report(_traces(2_000), report, tmp_path / "small.html", page_size=250)
+    large = save_report(_traces(20_000), report, tmp_path / "large.html", page_size=250)
+    small_size = Path(small).stat().st_size
+    large_size = Path(large).stat().st_size
+    assert large_size < small_size * 1.5
+    pages = sorted((tmp_path / "large_files").iterdir())
+    assert len(pages) == 80
+    assert "summary 20000" in pages[-1].read_text()
+    assert small.endswith("small.html") and large.endswith("large.html")
+
+
+def test_inline_report_escapes_and_embeds_pages() -> None:
+    html = render_report(_traces(30), EvalReport(metrics={"brier": 0.1}), page_size=10)
+    assert "<b>summary" not in html
+    assert "&lt;b&gt;summary 1&lt;/b&gt;" in html
+    assert html.count("noemaPage(") == 4  # three pages plus the loader function
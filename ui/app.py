@@ -10,6 +10,7 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 
 from noema.core.loop import ConsciousLoop
+from noema.core.types import Percept
 
 
 BASE = Path(__file__).parent
@@ -31,10 +32,19 @@ def build_app(loop: ConsciousLoop) -> FastAPI:
             "metrics": loop.controller.metacog.metrics(),
         }
 
+    @app.get("/api/run/eval")
+    async def evaluation() -> dict:
+        return loop.eval().metrics
+
     @app.get("/api/run/narrative")
     async def narrative(limit: int = 10) -> List[str]:
         return loop.controller.narrative.last(limit)
 
+    @app.post("/api/run/step")
+    async def step(content: str, salience: float = 0.4) -> dict:
+        result = await loop.arun_workflow(Percept(content=content, salience_hint=salience))
+        return {"tick": loop.tick_id, "action": result.action.model_dump()}
+
     @app.get("/api/run/traces")
     async def traces() -> list[dict]:
         payload = []